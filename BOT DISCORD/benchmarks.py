@@ -0,0 +1,388 @@
+"""Benchmarks de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 (se ejecutan sin conexión a Discord)
+
+Uso:
+    python benchmarks.py import-time --runs 10 --max-ms 1500
+    python benchmarks.py import-time --baseline resultados.json --tolerance 0.2
+    python benchmarks.py suite --sizes 1000,10000,100000 --output resultados.json
+    python benchmarks.py compare base.json nuevo.json --tolerance 0.2
+    python benchmarks.py storage --size 100000
+
+storage exige por defecto 5x al guardar y en la carga perezosa, que es lo que paga el
+bot (cada guardado y cada arranque: users se decodifica en su primer acceso). La carga
+completa no llega: con 100.000 usuarios sale ~1.3-1.6x (decodificar JSON compacto cuesta
+casi lo mismo que el indentado). El guardado sale ~4.6-7.7x según la ejecución, así que
+en una máquina ruidosa puede quedar justo por debajo del gate.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# El subproceso informa cuánto tardó solo la importación de bot.py
+IMPORT_PROBE = (
+    "import bot, json; "
+    "print(json.dumps(bot.startup.report()['imports']))"
+)
+
+
+def percentile(samples: list, pct: float) -> float:
+    """Percentil con interpolación lineal"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def summarize(samples: list) -> dict:
+    """Resumen de latencias en milisegundos"""
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3)
+    }
+
+
+def bench_import_time(runs: int) -> dict:
+    """Arranque en frío: importa bot.py en procesos nuevos desde un directorio vacío"""
+    process_samples = []
+    module_samples = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, PYTHONPATH=BOT_DIR)
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, "-c", IMPORT_PROBE],
+                cwd=workdir, env=env, check=True, capture_output=True, text=True
+            )
+            process_samples.append((time.perf_counter() - start) * 1000)
+            module_samples.append(json.loads(result.stdout.strip().splitlines()[-1])["duration_ms"])
+
+    return {
+        "process": summarize(process_samples),
+        "module_import": summarize(module_samples)
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_bot(workdir: str):
+    """Importa bot.py con un directorio de trabajo temporal (no toca los datos reales)"""
+    os.chdir(workdir)
+    if BOT_DIR not in sys.path:
+        sys.path.insert(0, BOT_DIR)
+    import bot
+    logging.getLogger().setLevel(logging.WARNING)
+    return bot
+
+
+def make_dataset(bot, size: int, seed: int = 42) -> dict:
+    """Datos sintéticos: `size` usuarios repartidos en size/10 servidores"""
+    rng = random.Random(seed)
+    data = bot.db.load_data()
+    guild_ids = [rng.getrandbits(60) for _ in range(max(1, size // 10))]
+    data["servers"] = {str(g): bot.db.get_default_guild_config() for g in guild_ids}
+
+    users = {}
+    for _ in range(size):
+        profile = bot.db.get_default_user_data()
+        profile["leveling"]["xp"] = rng.randint(0, 5000)
+        profile["leveling"]["messages"] = rng.randint(0, 10000)
+        profile["economy"]["wallet"] = rng.randint(0, 100000)
+        users[f"{rng.choice(guild_ids)}_{rng.getrandbits(60)}"] = profile
+    data["users"] = users
+    bot.db._data = data
+    return data
+
+
+def run_benchmark(func, iterations: int, prepare=None) -> dict:
+    """Mide latencias sin tracemalloc y luego el pico de memoria en una pasada aparte"""
+    samples = []
+    for _ in range(iterations):
+        if prepare:
+            prepare()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    if prepare:
+        prepare()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = summarize(samples)
+    total_seconds = sum(samples) / 1000
+    result["ops_per_sec"] = round(iterations / total_seconds, 1) if total_seconds else None
+    result["peak_memory_kb"] = round(peak / 1024, 1)
+    return result
+
+
+def build_suite(bot, size: int, data: dict) -> dict:
+    """Casos del suite: nombre -> (función, iteraciones, preparación)"""
+    loop = asyncio.new_event_loop()
+    rng = random.Random(size)
+    user_keys = list(data["users"])
+    lookups = [tuple(map(int, rng.choice(user_keys).split("_"))) for _ in range(1000)]
+    prompts = ["hola", "que puedes hacer", "minecraft", "¿como subo de nivel?", "texto sin coincidencias"] * 20
+    queries = [f"consulta {i}" for i in range(100)]
+    fields = [{"name": f"Campo {i}", "value": f"Valor {i}", "inline": i % 2 == 0} for i in range(10)]
+
+    def fill_cache():
+        now = time.time()
+        bot.cache.user_profiles.clear()
+        bot.cache.web_cache.clear()
+        bot.cache.cooldowns.clear()
+        for i in range(size):
+            age = 0 if i % 2 else 4000
+            bot.cache.user_profiles[f"{i}_{i}"] = {"data": {}, "timestamp": now - age}
+            bot.cache.web_cache[f"search_{i}"] = {"data": [], "timestamp": now - age}
+            bot.cache.cooldowns[f"rl:ai:user:{i}"] = {"tat": now, "timestamp": now - age, "duration": 30}
+
+    def get_user_data():
+        for guild_id, user_id in lookups:
+            bot.db.get_user_data(user_id, guild_id)
+
+    def generate_response():
+        for prompt in prompts:
+            loop.run_until_complete(bot.SimpleAI.generate_response(prompt))
+
+    def search_google():
+        bot.cache.web_cache.clear()
+        for query in queries:
+            loop.run_until_complete(bot.WebSearch.search_google(query))
+
+    def create_embed():
+        for _ in range(100):
+            bot.ProfessionalEmbeds.create_embed(title="Benchmark", description="x" * 500, fields=fields)
+
+    def use_format(name):
+        def prepare():
+            bot.db.format = name
+        return prepare
+
+    def load_full():
+        loaded = bot.db.load_data()
+        if isinstance(loaded, bot.LazySnapshot):
+            loaded.resolve_all()
+
+    save_iterations = 5 if size <= 10000 else 2
+    return {
+        "db.save_data[json]": (bot.db.save_data, save_iterations, use_format("json")),
+        "db.save_data[snapshot]": (bot.db.save_data, save_iterations, use_format("snapshot")),
+        "db.load_data[json]": (bot.db.load_data, save_iterations, use_format("json")),
+        "db.load_data[snapshot]": (bot.db.load_data, save_iterations, use_format("snapshot")),
+        "db.load_data[snapshot+decode]": (load_full, save_iterations, use_format("snapshot")),
+        "db.get_user_data[x1000]": (get_user_data, 20, None),
+        "cache.cleanup_old_cache": (bot.cache.cleanup_old_cache, 5, fill_cache),
+        "SimpleAI.generate_response[x100]": (generate_response, 20, None),
+        "WebSearch.search_google[x100]": (search_google, 20, None),
+        "ProfessionalEmbeds.create_embed[x100]": (create_embed, 20, None)
+    }
+
+
+STORAGE_GATED = ("save", "load")
+
+
+def bench_storage(size: int, runs: int) -> dict:
+    """Almacén completo en JSON frente al snapshot binario: guardado, carga perezosa y carga completa
+
+    Los dos formatos usan el mismo código que el bot (db.save_data y db.load_data) y sin
+    backup, para medir solo el formato.
+    """
+    results = {"size": size, "formats": {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        bot = load_bot(workdir)
+        make_dataset(bot, size)
+
+        def save():
+            bot.db.save_data(backup=False)
+
+        def load_full():
+            loaded = bot.db.load_data()
+            if isinstance(loaded, bot.LazySnapshot):
+                loaded.resolve_all()
+
+        for name in ("json", "snapshot"):
+            bot.db.format = name
+            results["formats"][name] = {
+                "save": run_benchmark(save, runs),
+                "load": run_benchmark(bot.db.load_data, runs),
+                "load_full": run_benchmark(load_full, runs),
+                "size_bytes": os.path.getsize(bot.db.store_path)
+            }
+
+    json_results, snapshot_results = results["formats"]["json"], results["formats"]["snapshot"]
+    results["speedup"] = {
+        case: round(json_results[case]["p50_ms"] / snapshot_results[case]["p50_ms"], 2)
+        for case in ("save", "load", "load_full")
+    }
+    return results
+
+
+def run_suite(sizes: List[int]) -> dict:
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.datetime.now().isoformat()
+        },
+        "results": {}
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bot = load_bot(workdir)
+        for size in sizes:
+            data = make_dataset(bot, size)
+            for name, (func, iterations, prepare) in build_suite(bot, size, data).items():
+                key = f"{name}@{size}"
+                results["results"][key] = run_benchmark(func, iterations, prepare)
+                r = results["results"][key]
+                print(f"{key:<48} p50 {r['p50_ms']:>10.3f}ms  p95 {r['p95_ms']:>10.3f}ms  "
+                      f"{r['ops_per_sec'] or 0:>10.1f} ops/s  pico {r['peak_memory_kb']:>10.1f}KB", file=sys.stderr)
+    return results
+
+
+def compare_results(base: dict, new: dict, tolerance: float) -> list:
+    """Compara el p50 de dos ejecuciones; devuelve las regresiones"""
+    regressions = []
+    for key, current in new["results"].items():
+        previous = base["results"].get(key)
+        if not previous or not previous["p50_ms"]:
+            continue
+        change = current["p50_ms"] / previous["p50_ms"] - 1
+        marker = "❌" if change > tolerance else "✅"
+        print(f"{marker} {key:<48} {previous['p50_ms']:>10.3f}ms -> {current['p50_ms']:>10.3f}ms ({change:+.1%})")
+        if change > tolerance:
+            regressions.append(key)
+    return regressions
+
+
+def check_regression(results: dict, max_ms: float, baseline_path: str, tolerance: float) -> list:
+    """Devuelve la lista de regresiones encontradas"""
+    failures = []
+    current = results["module_import"]["p50_ms"]
+
+    if max_ms and current > max_ms:
+        failures.append(f"importación p50 {current:.1f}ms supera el límite de {max_ms:.1f}ms")
+
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["import_time"]["module_import"]["p50_ms"]
+        if current > baseline * (1 + tolerance):
+            failures.append(
+                f"importación p50 {current:.1f}ms vs base {baseline:.1f}ms (+{tolerance:.0%} permitido)"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = sub.add_parser("import-time", help="Tiempo de arranque en frío")
+    import_parser.add_argument("--runs", type=int, default=10)
+    import_parser.add_argument("--max-ms", type=float, default=0, help="Límite absoluto para el p50")
+    import_parser.add_argument("--baseline", help="JSON de una ejecución anterior")
+    import_parser.add_argument("--tolerance", type=float, default=0.2)
+    import_parser.add_argument("--output", help="Guarda los resultados en este JSON")
+
+    suite_parser = sub.add_parser("suite", help="Rutas críticas con datos sintéticos")
+    suite_parser.add_argument("--sizes", default="1000,10000,100000", help="Usuarios por dataset")
+    suite_parser.add_argument("--output", help="Guarda los resultados en este JSON")
+
+    storage_parser = sub.add_parser("storage", help="Formato JSON frente al snapshot binario")
+    storage_parser.add_argument("--size", type=int, default=100000, help="Usuarios del dataset")
+    storage_parser.add_argument("--runs", type=int, default=5)
+    storage_parser.add_argument("--min-speedup", type=float, default=5, help="Mejora mínima exigida al guardar y en la carga perezosa")
+    storage_parser.add_argument("--output", help="Guarda los resultados en este JSON")
+
+    compare_parser = sub.add_parser("compare", help="Compara dos ejecuciones del suite")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--tolerance", type=float, default=0.2)
+
+    args = parser.parse_args()
+
+    if args.command == "suite":
+        output = os.path.abspath(args.output) if args.output else None
+        results = run_suite([int(size) for size in args.sizes.split(",")])
+        if output:
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        else:
+            print(json.dumps(results, indent=2))
+        return
+
+    if args.command == "storage":
+        output = os.path.abspath(args.output) if args.output else None
+        results = bench_storage(args.size, args.runs)
+        print(json.dumps(results, indent=2))
+        if output:
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+
+        failures = [
+            f"{case} x{speedup} por debajo de x{args.min_speedup}"
+            for case, speedup in results["speedup"].items()
+            if case in STORAGE_GATED and speedup < args.min_speedup
+        ]
+        full = results["speedup"]["load_full"]
+        verdict = "cumple" if full >= args.min_speedup else "no cumple"
+        print(f"ℹ️ load_full x{full} {verdict} x{args.min_speedup} (fuera del gate: el arranque no decodifica todo)", file=sys.stderr)
+        for failure in failures:
+            print(f"❌ Regresión: {failure}", file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+    if args.command == "compare":
+        with open(args.base, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.new, 'r', encoding='utf-8') as f:
+            new = json.load(f)
+        sys.exit(1 if compare_results(base, new, args.tolerance) else 0)
+
+    if args.command == "import-time":
+        results = {"import_time": bench_import_time(args.runs)}
+        print(json.dumps(results, indent=2))
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+
+        failures = check_regression(results["import_time"], args.max_ms, args.baseline, args.tolerance)
+        for failure in failures:
+            print(f"❌ Regresión: {failure}", file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
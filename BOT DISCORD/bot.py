@@ -1,3 +1,6 @@
+import time
+IMPORT_STARTED_AT = time.perf_counter()
+
 import discord
 from discord.ext import commands, tasks
 import asyncio
@@ -13,12 +16,38 @@ import typing
 from typing import Optional, List, Dict, Union, Any
 from discord import app_commands
 import itertools
+import hashlib
+import string
+import html
+import sqlite3
 import logging
+import logging.handlers
+import queue
+import gzip
+import shutil
+import atexit
 import traceback
-from collections import defaultdict, Counter
+import signal
+import concurrent.futures
+import multiprocessing
+import heapq
+import hmac
+import copy
+import types
+import email.utils
+import struct
+import zlib
+import mmap
+from collections import defaultdict, Counter, deque
 import re
-import time
 from aiohttp import web
+try:
+    import ijson  # Lectura en streaming de los archivos antiguos (sin él se lee el archivo entero)
+    if ijson.backend != "yajl2_c":
+        # El backend en Python puro es ~15x más lento que json y no ahorra memoria: mejor raw_decode
+        ijson = None
+except ImportError:
+    ijson = None
 import threading
 
 
@@ -33,6 +62,7 @@ class BotConfig:
     SUPPORT_SERVER = "https://discord.gg/honducraft"
     WEBSITE = "https://honducraft.com"
     MINECRAFT_IP = "honducraft.sdlf.fun"
+    PREFIXES = ['!', 'hc ', 'HC ', 'honducraft ', 'Honducraft ', '.', 'ℌ ']
     
     # Colores profesionales con morado como principal
     COLORS = {
@@ -50,29 +80,418 @@ class BotConfig:
         "red": 0xED4245,
         "purple": 0x9B59B6
     }
+    
+    # Límites de uso por comando: [usos, segundos] por usuario, canal y servidor
+    # (cada servidor puede sobrescribirlos en servers[guild]["rate_limits"])
+    RATE_LIMITS = {
+        "default": {"user": [5, 30], "channel": [15, 30], "guild": [40, 60]},
+        "ai": {"user": [3, 30], "channel": [10, 30], "guild": [30, 60]},
+        "search": {"user": [3, 30], "channel": [10, 30], "guild": [30, 60]}
+    }
+    
+    # Umbrales de automoderación
+    AUTOMOD = {
+        "spam_messages": 5,      # mensajes permitidos...
+        "spam_window": 5,        # ...en esta ventana de segundos
+        "spam_timeout": 5,       # minutos de aislamiento por spam
+        "raid_joins": 10,        # entradas permitidas...
+        "raid_window": 10,       # ...en esta ventana de segundos
+        "raid_duration": 300     # segundos que dura el modo anti-raid
+    }
+    
+    # Sharding: "none", "auto" (AutoShardedBot) o rangos por proceso con SHARD_IDS="0-3" y SHARD_COUNT=8
+    SHARDING = os.getenv("HONDUCRAFT_SHARDING", "none").lower()
+    
+    # Pool de trabajos pesados: procesos para CPU puro, hilos para trabajo que libera el GIL
+    # (WORKER_PROCESSES=0 ejecuta todo en hilos; sin WORKER_START_METHOD se usa forkserver o spawn,
+    # y los trabajos de proceso viven en módulos sin efectos al importarse, nunca en bot.py)
+    WORKERS = {
+        "processes": int(os.getenv("WORKER_PROCESSES", "2")),
+        "threads": int(os.getenv("WORKER_THREADS", "4")),
+        "max_pending": int(os.getenv("WORKER_MAX_PENDING", "32")),  # por tipo, antes de rechazar
+        "start_method": os.getenv("WORKER_START_METHOD") or None
+    }
+    
+    # Segundos que se esperan para agrupar avisos al mismo canal en un solo mensaje
+    OUTBOUND_WINDOW = float(os.getenv("OUTBOUND_WINDOW", "1.5"))
+    
+    # Cambios de roles (reacciones, entradas, niveles) enviados a la API por segundo
+    ROLE_QUEUE_RATE = int(os.getenv("ROLE_QUEUE_RATE", "5"))
+    
+    # Formato del almacén: "json" (honducraft_pro.json) o "snapshot" (binario por secciones, honducraft_pro.snap)
+    DATA_FORMAT = os.getenv("DATA_FORMAT", "json").lower()
+    
+    # Perfil de memoria en ejecución: lean, standard o full
+    RUNTIME_PROFILE = os.getenv("HONDUCRAFT_PROFILE", "standard")
+    
+    # Intents que necesita cada módulo del bot
+    MODULE_INTENTS = {
+        "core": ["guilds"],
+        "prefix_commands": ["guild_messages", "dm_messages", "message_content"],
+        "automod": ["guild_messages", "message_content"],
+        "anti_raid": ["members"],
+        "reaction_roles": ["guild_reactions"],
+        "presence_tracking": ["presences"]
+    }
+    
+    RUNTIME_PROFILES = {
+        "lean": {
+            "base_intents": "none",
+            "modules": ["core", "prefix_commands", "automod", "reaction_roles"],
+            "member_cache": "none",
+            "chunk_guilds_at_startup": False,
+            "max_messages": None
+        },
+        "standard": {
+            "base_intents": "none",
+            "modules": ["core", "prefix_commands", "automod", "anti_raid", "reaction_roles"],
+            "member_cache": "none",
+            "chunk_guilds_at_startup": False,
+            "max_messages": 250
+        },
+        "full": {
+            "base_intents": "default",
+            "modules": list(MODULE_INTENTS),
+            "member_cache": "all",
+            "chunk_guilds_at_startup": True,
+            "max_messages": 1000
+        }
+    }
 
 # Configuración de logging profesional
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(name)s: %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.FileHandler('honducraft.log', encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+class JsonLogFormatter(logging.Formatter):
+    """Formato JSON por línea con campos estructurados"""
+    
+    FIELDS = ("command", "guild", "user", "latency_ms")
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for field in self.FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class TextLogFormatter(logging.Formatter):
+    """Formato de texto; los campos estructurados van al final de la línea (clave=valor)"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = " ".join(
+            f"{field}={getattr(record, field)}"
+            for field in JsonLogFormatter.FIELDS if getattr(record, field, None) is not None
+        )
+        return f"{line} | {fields}" if fields else line
+
+class RepeatLimitFilter(logging.Filter):
+    """Limita avisos y errores repetidos para que un error en bucle no llene el disco"""
+    
+    def __init__(self, max_repeats: int = 5, window: float = 60.0, min_level: int = logging.WARNING):
+        super().__init__()
+        self.max_repeats = max_repeats
+        self.window = window
+        self.min_level = min_level
+        self.counters = {}
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level:
+            return True
+        
+        key = (record.name, record.levelno, record.getMessage())
+        now = time.monotonic()
+        started, count, suppressed = self.counters.get(key, (now, 0, 0))
+        
+        if now - started > self.window:
+            if suppressed:
+                record.msg = f"{record.getMessage()} (se omitieron {suppressed} repeticiones)"
+                record.args = None
+            started, count, suppressed = now, 0, 0
+        
+        count += 1
+        if count > self.max_repeats:
+            self.counters[key] = (started, count, suppressed + 1)
+            return False
+        
+        self.counters[key] = (started, count, suppressed)
+        # Evita que el dict crezca sin límite con mensajes únicos
+        if len(self.counters) > 1000:
+            self.counters = {k: v for k, v in self.counters.items() if now - v[0] <= self.window}
+        return True
+
+def gzip_rotator(source: str, dest: str):
+    """Comprime el archivo rotado"""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """Logging fuera del event loop: QueueHandler -> QueueListener -> archivo rotado + consola"""
+    log_file = os.getenv("LOG_FILE", "honducraft.log")
+    rotation = os.getenv("LOG_ROTATION", "size")
+    backups = int(os.getenv("LOG_BACKUPS", "7"))
+    
+    if rotation == "time":
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_file, when="midnight", backupCount=backups, encoding='utf-8'
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024))),
+            backupCount=backups, encoding='utf-8'
+        )
+    file_handler.rotator = gzip_rotator
+    file_handler.namer = lambda name: f"{name}.gz"
+    
+    if os.getenv("LOG_FORMAT", "text") == "json":
+        formatter = JsonLogFormatter()
+    else:
+        formatter = TextLogFormatter(
+            '%(asctime)s | %(levelname)s | %(name)s: %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RepeatLimitFilter())
+    
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.handlers = [queue_handler]
+    
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+log_listener = setup_logging()
 
 logger = logging.getLogger('ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱')
 
-# Configuración de intents avanzada
-intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-intents.presences = True
+def get_rss_mb() -> float:
+    """Memoria residente actual del proceso en MB"""
+    try:
+        with open('/proc/self/status', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def atomic_write_json(path: str, data, **dump_kwargs):
+    """Escribe JSON en un temporal y lo reemplaza de forma atómica"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def build_runtime_profile(name: str) -> dict:
+    """Construye intents y caches de discord.py según el perfil elegido"""
+    if name not in BotConfig.RUNTIME_PROFILES:
+        logger.warning(f"Perfil '{name}' desconocido, usando 'standard'")
+        name = "standard"
+    profile = BotConfig.RUNTIME_PROFILES[name]
+    
+    intents = discord.Intents.default() if profile["base_intents"] == "default" else discord.Intents.none()
+    for module in profile["modules"]:
+        for intent in BotConfig.MODULE_INTENTS[module]:
+            setattr(intents, intent, True)
+    
+    if profile["member_cache"] == "all":
+        member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+    else:
+        member_cache_flags = discord.MemberCacheFlags.none()
+    
+    return {
+        "name": name,
+        "intents": intents,
+        "member_cache_flags": member_cache_flags,
+        "chunk_guilds_at_startup": profile["chunk_guilds_at_startup"] and intents.members,
+        "max_messages": profile["max_messages"]
+    }
+
+# Configuración de intents según el perfil de memoria
+runtime_profile = build_runtime_profile(BotConfig.RUNTIME_PROFILE)
+
+def parse_shard_ids(value: str) -> List[int]:
+    """Convierte rangos tipo "0-3,6" en [0, 1, 2, 3, 6]"""
+    shard_ids = set()
+    for part in value.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            shard_ids.update(range(int(start), int(end) + 1))
+        else:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+def shard_for_guild(guild_id: int, shard_count: int) -> int:
+    """Fórmula de Discord para saber qué shard atiende un servidor"""
+    return (int(guild_id) >> 22) % shard_count
+
+def build_shard_settings() -> dict:
+    """Lee la configuración de sharding del entorno"""
+    mode = BotConfig.SHARDING
+    shard_ids = parse_shard_ids(os.getenv("SHARD_IDS", ""))
+    shard_count = int(os.getenv("SHARD_COUNT", "0")) or None
+    
+    if shard_ids:
+        if not shard_count:
+            raise ValueError("SHARD_IDS requiere SHARD_COUNT")
+        if shard_ids[-1] >= shard_count:
+            raise ValueError(f"SHARD_IDS fuera de rango para SHARD_COUNT={shard_count}")
+        mode = "range"
+    elif mode not in ("none", "auto"):
+        logger.warning(f"Modo de sharding '{mode}' desconocido, usando 'none'")
+        mode = "none"
+    
+    return {
+        "mode": mode,
+        "shard_count": shard_count if mode != "none" else None,
+        "shard_ids": shard_ids or None,
+        # Cada proceso con un rango de shards guarda sus servidores en su propio archivo
+        "partition": f"shards-{shard_ids[0]}-{shard_ids[-1]}" if shard_ids else None
+    }
+
+shard_settings = build_shard_settings()
+
+class StartupManager:
+    """Arranque por etapas con tiempos y banderas de disponibilidad"""
+    
+    def __init__(self):
+        self.stages = {}
+        self.events = defaultdict(asyncio.Event)
+        self.tasks = []
+    
+    def begin(self, name: str, started_at: float = None):
+        self.stages[name] = {
+            "started": started_at or time.perf_counter(),
+            "duration": None,
+            "ready": False,
+            "error": None
+        }
+    
+    def finish(self, name: str, error: str = None):
+        stage = self.stages[name]
+        stage["duration"] = time.perf_counter() - stage["started"]
+        stage["ready"] = error is None
+        stage["error"] = error
+        # El evento marca "terminada" (aunque falle) para que nadie se quede esperando;
+        # si quedó utilizable lo dice stage["ready"]
+        self.events[name].set()
+        if error:
+            logger.error(f"❌ Etapa '{name}' falló tras {stage['duration']:.2f}s: {error}")
+        else:
+            logger.info(f"⏱️ Etapa '{name}' lista en {stage['duration']:.2f}s")
+    
+    def is_ready(self, name: str) -> bool:
+        """True solo si la etapa terminó sin error"""
+        stage = self.stages.get(name)
+        return bool(stage and stage["ready"])
+    
+    async def wait_ready(self, name: str, timeout: float = None) -> bool:
+        """Espera a que la etapa termine; devuelve si quedó utilizable"""
+        try:
+            await asyncio.wait_for(self.events[name].wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.is_ready(name)
+    
+    def failed(self, name: str) -> Optional[str]:
+        """Error con el que terminó la etapa (None si no falló o no ha terminado)"""
+        stage = self.stages.get(name)
+        return stage["error"] if stage else None
+    
+    async def run_stage(self, name: str, coro_func):
+        """Ejecuta una etapa de calentamiento en segundo plano"""
+        self.begin(name)
+        try:
+            await coro_func()
+        except Exception as e:
+            self.finish(name, error=str(e))
+        else:
+            self.finish(name)
+    
+    def report(self) -> dict:
+        """Tiempos por etapa en milisegundos, relativos al inicio del proceso"""
+        return {
+            name: {
+                "ready": stage["ready"],
+                "offset_ms": round((stage["started"] - IMPORT_STARTED_AT) * 1000, 1),
+                "duration_ms": round(stage["duration"] * 1000, 1) if stage["duration"] is not None else None,
+                "error": stage["error"]
+            }
+            for name, stage in self.stages.items()
+        }
+
+startup = StartupManager()
+
+class HonducraftTree(app_commands.CommandTree):
+    """Árbol de comandos slash que espera a que la base de datos esté lista"""
+    
+    async def _call(self, interaction: discord.Interaction):
+        # Cuenta los comandos en curso para poder drenarlos al apagar
+        lifecycle.command_started()
+        try:
+            await super()._call(interaction)
+        finally:
+            lifecycle.command_finished()
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if lifecycle.shutting_down:
+            locale = i18n.locale_for(interaction.guild_id) if startup.is_ready("database") else i18n.for_interaction(interaction)
+            await interaction.response.send_message(
+                embed=Embeds.warning(i18n.t("startup.restarting_title", locale), i18n.t("startup.restarting", locale)),
+                ephemeral=True
+            )
+            return False
+        if startup.is_ready("database") or await startup.wait_ready("database", timeout=2):
+            return True
+        # Sin base de datos no hay idioma del servidor: se usa el del cliente de Discord
+        locale = i18n.for_interaction(interaction)
+        if startup.failed("database"):
+            await interaction.response.send_message(
+                embed=Embeds.error(i18n.t("startup.db_failed_title", locale), i18n.t("startup.db_failed", locale)),
+                ephemeral=True
+            )
+            return False
+        await interaction.response.send_message(
+            embed=Embeds.warning(i18n.t("startup.starting_title", locale), i18n.t("startup.starting", locale)),
+            ephemeral=True
+        )
+        return False
+
+def get_prefix(bot, message: discord.Message) -> List[str]:
+    """Prefijos globales más el prefijo propio del servidor"""
+    return prefix_dispatcher.get_prefixes(message.guild.id if message.guild else None)
+
+bot_class = commands.Bot if shard_settings["mode"] == "none" else commands.AutoShardedBot
+shard_kwargs = {}
+if shard_settings["mode"] != "none":
+    shard_kwargs = {"shard_count": shard_settings["shard_count"], "shard_ids": shard_settings["shard_ids"]}
 
-bot = commands.Bot(
-    command_prefix=['!', 'hc ', 'HC ', 'honducraft ', 'Honducraft ', '.', 'ℌ '],
-    intents=intents,
+bot = bot_class(
+    **shard_kwargs,
+    command_prefix=get_prefix,
+    tree_cls=HonducraftTree,
+    intents=runtime_profile["intents"],
+    member_cache_flags=runtime_profile["member_cache_flags"],
+    chunk_guilds_at_startup=runtime_profile["chunk_guilds_at_startup"],
+    max_messages=runtime_profile["max_messages"],
     help_command=None,
     case_insensitive=True,
     strip_after_prefix=True,
@@ -94,7 +513,7 @@ class AdvancedCache:
     def __init__(self):
         self.user_profiles = {}
         self.guild_configs = {}
-        self.message_cache = defaultdict(list)
+        self.message_cache = defaultdict(lambda: deque(maxlen=BotConfig.AUTOMOD["spam_messages"]))
         self.cooldowns = {}
         self.last_cleanup = time.time()
         self.web_cache = {}
@@ -126,6 +545,24 @@ class AdvancedCache:
                 return self.web_cache[url]['data']
         return None
     
+    def save_to_disk(self, path: str):
+        """Persiste la cache web y los límites de uso activos"""
+        atomic_write_json(path, {"web_cache": self.web_cache, "cooldowns": self.cooldowns}, ensure_ascii=False)
+    
+    def load_from_disk(self, path: str):
+        """Recupera la cache persistida en el último apagado"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as e:
+            logger.warning(f"Cache persistida ilegible, se ignora: {e}")
+            return
+        self.web_cache.update(saved.get("web_cache", {}))
+        self.cooldowns.update(saved.get("cooldowns", {}))
+        self.cleanup_old_cache()
+    
     def cleanup_old_cache(self):
         """Limpia cache antiguo"""
         current_time = time.time()
@@ -134,11 +571,13 @@ class AdvancedCache:
             k: v for k, v in self.user_profiles.items() 
             if current_time - v['timestamp'] < 300
         }
-        # Limpiar cooldowns expirados
-        self.cooldowns = {
-            k: v for k, v in self.cooldowns.items() 
-            if current_time - v['timestamp'] < v['duration']
-        }
+        # Limpiar cooldowns expirados (en el mismo dict: el limitador lo comparte)
+        for key in [k for k, v in self.cooldowns.items() if current_time - v['timestamp'] >= v['duration']]:
+            del self.cooldowns[key]
+        # Limpiar ventanas de spam inactivas
+        spam_window = BotConfig.AUTOMOD["spam_window"]
+        for key in [k for k, v in self.message_cache.items() if not v or current_time - v[-1] > spam_window]:
+            del self.message_cache[key]
         # Limpiar cache web antiguo
         self.web_cache = {
             k: v for k, v in self.web_cache.items()
@@ -147,6 +586,392 @@ class AdvancedCache:
 
 cache = AdvancedCache()
 
+class RateLimiter:
+    """Limitador GCRA por usuario, canal y servidor"""
+    
+    BUCKET_TYPES = {
+        "user": commands.BucketType.user,
+        "channel": commands.BucketType.channel,
+        "guild": commands.BucketType.guild
+    }
+    # Margen para el redondeo de per / rate (3 usos en 10 s no debe negar el tercero)
+    EPSILON = 1e-6
+    
+    def __init__(self, store: dict):
+        # Se guarda en cache.cooldowns: una entrada por clave activa,
+        # cleanup_old_cache la elimina cuando su cubeta vuelve a estar llena
+        self.store = store
+    
+    def get_budgets(self, command: str, guild_id: Optional[int]) -> dict:
+        """Obtiene los límites del comando, con los del servidor encima"""
+        budgets = dict(BotConfig.RATE_LIMITS.get(command, BotConfig.RATE_LIMITS["default"]))
+        if guild_id:
+            overrides = guild_configs.get(guild_id).get("rate_limits", {}).get(command, {})
+            budgets.update(overrides)
+        return budgets
+    
+    def hit(self, command: str, user_id: int, channel_id: Optional[int], guild_id: Optional[int]):
+        """Registra un uso; devuelve (segundos de espera, scope, límite) o None si se permite"""
+        now = time.time()
+        targets = {"user": user_id, "channel": channel_id, "guild": guild_id}
+        pending = []
+        denied = None
+        
+        for scope, (rate, per) in self.get_budgets(command, guild_id).items():
+            target_id = targets.get(scope)
+            if target_id is None or rate <= 0:
+                continue
+            
+            key = f"rl:{command}:{scope}:{target_id}"
+            entry = self.store.get(key)
+            interval = per / rate
+            tat = max(entry['tat'], now) if entry else now
+            new_tat = tat + interval
+            retry_after = new_tat - per - now
+            
+            if retry_after > self.EPSILON:
+                if not denied or retry_after > denied[0]:
+                    denied = (retry_after, scope, (rate, per))
+            else:
+                pending.append((key, new_tat))
+        
+        if denied:
+            return denied
+        
+        # Solo se consume cuando todos los scopes lo permiten
+        for key, new_tat in pending:
+            self.store[key] = {
+                'tat': new_tat,
+                'timestamp': now,
+                'duration': new_tat - now
+            }
+        return None
+
+rate_limiter = RateLimiter(cache.cooldowns)
+
+class PrefixDispatcher:
+    """Filtro previo de prefijos con tabla por primer carácter"""
+    
+    def __init__(self, prefixes: List[str]):
+        self.static_prefixes = list(prefixes)
+        self.static_table = self.build_table(self.static_prefixes)
+        self.guild_tables = {}
+    
+    @staticmethod
+    def build_table(prefixes: List[str]) -> Dict[str, tuple]:
+        """Agrupa los prefijos por su primer carácter (los más largos primero)"""
+        table = defaultdict(list)
+        for prefix in prefixes:
+            if prefix:
+                table[prefix[0]].append(prefix)
+        return {char: tuple(sorted(group, key=len, reverse=True)) for char, group in table.items()}
+    
+    def get_guild_entry(self, guild_id: Optional[int]):
+        """Prefijos y tabla del servidor, reconstruidos solo cuando cambia su configuración"""
+        if guild_id is None:
+            return self.static_prefixes, self.static_table
+        
+        entry = self.guild_tables.get(guild_id)
+        if entry:
+            return entry
+        
+        guild_prefix = guild_configs.get(guild_id).get("prefix")
+        prefixes = list(self.static_prefixes)
+        if guild_prefix and guild_prefix not in prefixes:
+            prefixes.append(guild_prefix)
+        prefixes.sort(key=len, reverse=True)
+        entry = self.guild_tables[guild_id] = (prefixes, self.build_table(prefixes))
+        return entry
+    
+    def invalidate(self, guild_id: Optional[int], snapshot=None):
+        """Suscriptor de guild_configs: descarta la tabla del servidor que cambió"""
+        if guild_id is None:
+            self.guild_tables.clear()
+        else:
+            self.guild_tables.pop(guild_id, None)
+    
+    def get_prefixes(self, guild_id: Optional[int]) -> List[str]:
+        return self.get_guild_entry(guild_id)[0]
+    
+    def match(self, content: str, guild_id: Optional[int]) -> Optional[str]:
+        """Devuelve el prefijo con el que empieza el mensaje, en una sola pasada"""
+        if not content:
+            return None
+        candidates = self.get_guild_entry(guild_id)[1].get(content[0])
+        if not candidates:
+            return None
+        for prefix in candidates:
+            if content.startswith(prefix):
+                return prefix
+        return None
+
+prefix_dispatcher = PrefixDispatcher(BotConfig.PREFIXES)
+
+class ShardMonitor:
+    """Métricas de salud por shard"""
+    
+    def __init__(self):
+        self.shards = {}
+        self.loop_lag = 0.0
+        self.max_loop_lag = 0.0
+    
+    def record(self, shard_id: Optional[int], status: str):
+        """Registra un cambio de estado del shard"""
+        shard = self.shards.setdefault(shard_id or 0, {
+            "status": "starting",
+            "since": time.time(),
+            "connects": 0,
+            "disconnects": 0,
+            "resumes": 0
+        })
+        shard["status"] = status
+        shard["since"] = time.time()
+        if status in ("connected", "disconnected", "resumed"):
+            counter = {"connected": "connects", "disconnected": "disconnects", "resumed": "resumes"}[status]
+            shard[counter] += 1
+    
+    def record_loop_lag(self, lag: float):
+        """Media móvil del retraso del event loop"""
+        self.loop_lag = lag if not self.loop_lag else self.loop_lag * 0.8 + lag * 0.2
+        self.max_loop_lag = max(self.max_loop_lag, lag)
+    
+    def snapshot(self) -> List[dict]:
+        """Estado actual de cada shard con su latencia"""
+        latencies = dict(getattr(bot, "latencies", [(0, bot.latency)]))
+        guild_counts = Counter(g.shard_id or 0 for g in bot.guilds)
+        result = []
+        for shard_id in sorted(set(latencies) | set(self.shards)):
+            info = self.shards.get(shard_id, {})
+            latency = latencies.get(shard_id)
+            result.append({
+                "shard_id": shard_id,
+                "status": info.get("status", "unknown"),
+                "latency_ms": round(latency * 1000) if latency and math.isfinite(latency) else None,
+                "guilds": guild_counts.get(shard_id, 0),
+                "disconnects": info.get("disconnects", 0),
+                "resumes": info.get("resumes", 0)
+            })
+        return result
+
+shard_monitor = ShardMonitor()
+
+class CommandSyncManager:
+    """Sincroniza el árbol de comandos slash solo cuando cambia"""
+    
+    def __init__(self, state_file: str = 'data/command_tree.json'):
+        self.state_file = state_file
+        # Servidores de desarrollo: reciben los comandos al instante (DEV_GUILD_IDS="123,456")
+        self.dev_guild_ids = [int(g) for g in os.getenv("DEV_GUILD_IDS", "").split(",") if g.strip()]
+    
+    def load_state(self) -> dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
+    def save_state(self, state: dict):
+        try:
+            atomic_write_json(self.state_file, state, indent=2)
+        except OSError as e:
+            logger.error(f"Error guardando estado de sincronización: {e}")
+    
+    def compute_hash(self, guild: Optional[discord.abc.Snowflake] = None) -> str:
+        """Hash estable del árbol de comandos local"""
+        payload = sorted(
+            (command.to_dict() for command in bot.tree.get_commands(guild=guild)),
+            key=lambda c: (c.get("type", 1), c["name"])
+        )
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    async def sync(self, force: bool = False) -> Dict[str, int]:
+        """Sincroniza global y servidores de desarrollo; devuelve los comandos enviados"""
+        # Con varios procesos de shards, solo el que tiene el shard 0 sincroniza (y escribe state_file)
+        if shard_settings["shard_ids"] and 0 not in shard_settings["shard_ids"]:
+            return {}
+        
+        state = self.load_state()
+        results = {}
+        targets = [("global", None)]
+        for guild_id in self.dev_guild_ids:
+            guild = discord.Object(id=guild_id)
+            bot.tree.copy_global_to(guild=guild)
+            targets.append((f"guild:{guild_id}", guild))
+        
+        for key, guild in targets:
+            tree_hash = self.compute_hash(guild)
+            if not force and state.get(key) == tree_hash:
+                logger.info(f"⏭️ Comandos slash sin cambios ({key}), se omite la sincronización")
+                continue
+            try:
+                synced = await bot.tree.sync(guild=guild)
+                state[key] = tree_hash
+                results[key] = len(synced)
+                print(f"✅ {len(synced)} comandos slash sincronizados ({key})")
+            except Exception as e:
+                print(f"❌ Error sincronizando comandos slash ({key}): {e}")
+        
+        if results:
+            self.save_state(state)
+        return results
+
+command_sync = CommandSyncManager()
+
+def rate_limited(command_name: str = None):
+    """Decorador de límites de uso para comandos slash y tradicionales"""
+    
+    def check_limit(target, is_interaction: bool):
+        name = command_name or (target.command.qualified_name if target.command else "default")
+        user = target.user if is_interaction else target.author
+        channel_id = target.channel.id if target.channel else None
+        guild_id = target.guild.id if target.guild else None
+        
+        denied = rate_limiter.hit(name, user.id, channel_id, guild_id)
+        if not denied:
+            return True
+        
+        retry_after, scope, (rate, per) = denied
+        cooldown = commands.Cooldown(rate, per)
+        if is_interaction:
+            raise app_commands.CommandOnCooldown(cooldown, retry_after)
+        raise commands.CommandOnCooldown(cooldown, retry_after, RateLimiter.BUCKET_TYPES[scope])
+    
+    def decorator(func):
+        func = commands.check(lambda ctx: check_limit(ctx, False))(func)
+        func = app_commands.check(lambda interaction: check_limit(interaction, True))(func)
+        return func
+    
+    return decorator
+
+# =============================================
+# POOL DE TRABAJOS PESADOS
+# =============================================
+
+class WorkerPoolBusy(Exception):
+    """La cola del pool está llena: el trabajo se rechaza en vez de encolarse"""
+
+def worker_job(kind: str = "process", timeout: float = 10):
+    """Marca una función síncrona y pura como trabajo del pool ("process" o "thread")"""
+    if kind not in WorkerPool.KINDS:
+        raise ValueError(f"Tipo de pool desconocido: {kind}")
+    
+    def decorator(func):
+        # Con forkserver/spawn cada hijo importa el módulo del trabajo: desde bot.py montaría
+        # en cada proceso otro bot, otra base de datos y otro logging sobre honducraft.log
+        if kind == "process" and func.__module__ == __name__:
+            raise ValueError(f"{func.__qualname__}: los trabajos de proceso no pueden vivir en bot.py")
+        func.job_kind = kind
+        func.job_timeout = timeout
+        return func
+    
+    return decorator
+
+def init_worker_process():
+    """Cada proceso hijo necesita su propia semilla (fork copia el estado de random)"""
+    random.seed()
+
+class WorkerPool:
+    """Ejecuta trabajo pesado fuera del event loop con límite de cola y timeouts"""
+    
+    KINDS = ("process", "thread")
+    
+    def __init__(self, processes: int, threads: int, max_pending: int, start_method: str = None):
+        self.sizes = {"process": processes, "thread": threads}
+        self.max_pending = max_pending
+        # fork copiaría un proceso con hilos (logging, SQLite, aiohttp) y puede dejar locks tomados
+        self.start_method = start_method or (
+            "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        self.executors = {}
+        self.pending = Counter()
+        self.peak_pending = Counter()
+        self.stats = defaultdict(Counter)
+        self.durations = defaultdict(lambda: deque(maxlen=500))
+        self.closed = False
+    
+    def get_executor(self, kind: str) -> concurrent.futures.Executor:
+        """Crea el ejecutor al primer uso (no se lanzan procesos si nadie los usa)"""
+        executor = self.executors.get(kind)
+        if executor is None:
+            if kind == "process":
+                executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.sizes["process"], mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=init_worker_process
+                )
+            else:
+                executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.sizes["thread"], thread_name_prefix="honducraft-worker"
+                )
+            self.executors[kind] = executor
+        return executor
+    
+    async def submit(self, func, *args, timeout: float = None):
+        """Ejecuta un trabajo marcado con @worker_job y devuelve su resultado"""
+        kind = getattr(func, "job_kind", None)
+        if kind is None:
+            raise TypeError(f"{func.__qualname__} no está marcado con @worker_job")
+        if kind == "process" and self.sizes["process"] <= 0:
+            kind = "thread"
+        timeout = timeout or func.job_timeout
+        
+        # Contrapresión: con la cola llena se rechaza al momento en vez de acumular
+        if self.closed or self.pending[kind] >= self.max_pending:
+            self.stats[kind]["rejected"] += 1
+            raise WorkerPoolBusy(f"Pool de {kind} saturado ({self.pending[kind]} trabajos pendientes)")
+        
+        started = time.perf_counter()
+        future = self.get_executor(kind).submit(func, *args)
+        self.pending[kind] += 1
+        self.peak_pending[kind] = max(self.peak_pending[kind], self.pending[kind])
+        self.stats[kind]["submitted"] += 1
+        
+        # El contador baja cuando el trabajo termina de verdad, aunque el comando ya expiró
+        result = asyncio.wrap_future(future)
+        result.add_done_callback(lambda done: self.job_done(kind, done, started))
+        try:
+            return await asyncio.wait_for(asyncio.shield(result), timeout)
+        except asyncio.TimeoutError:
+            self.stats[kind]["timeouts"] += 1
+            future.cancel()
+            logger.warning(f"⏱️ Trabajo {func.__qualname__} superó {timeout}s en el pool de {kind}")
+            raise
+    
+    def job_done(self, kind: str, future: asyncio.Future, started: float):
+        self.pending[kind] -= 1
+        if future.cancelled():
+            self.stats[kind]["cancelled"] += 1
+        elif future.exception():
+            self.stats[kind]["failed"] += 1
+        else:
+            self.stats[kind]["completed"] += 1
+            self.durations[kind].append((time.perf_counter() - started) * 1000)
+    
+    def snapshot(self) -> dict:
+        """Métricas por tipo: pendientes, profundidad de cola y latencias"""
+        result = {}
+        for kind in self.KINDS:
+            samples = sorted(self.durations[kind])
+            result[kind] = {
+                "workers": self.sizes[kind],
+                "pending": self.pending[kind],
+                "queue_depth": max(0, self.pending[kind] - self.sizes[kind]),
+                "peak_pending": self.peak_pending[kind],
+                "p50_ms": round(samples[len(samples) // 2], 1) if samples else None,
+                "p95_ms": round(samples[int(len(samples) * 0.95)], 1) if samples else None,
+                **self.stats[kind]
+            }
+        return result
+    
+    def shutdown(self):
+        """Cancela lo que sigue en cola sin esperar a los trabajos en curso"""
+        self.closed = True
+        for executor in self.executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.executors.clear()
+
+workers = WorkerPool(**BotConfig.WORKERS)
+
 # =============================================
 # SISTEMA DE IA SIMULADA SIN API
 # =============================================
@@ -154,70 +979,38 @@ cache = AdvancedCache()
 class SimpleAI:
     """Sistema de IA simulada sin usar APIs externas"""
     
+    # Índice de conocimiento por idioma: [(palabra clave, plantilla)] en orden de prioridad
+    knowledge = {}
+    
+    @classmethod
+    def build_index(cls, locale: str = None) -> list:
+        """Precompila el índice de conocimiento de un idioma una sola vez (catálogo ai.knowledge)"""
+        locale = i18n.resolve(locale)
+        cls.knowledge[locale] = i18n.section("ai.knowledge.", locale)
+        return cls.knowledge[locale]
+    
     @staticmethod
-    async def generate_response(prompt: str, context: str = "") -> str:
+    async def generate_response(prompt: str, context: str = "", locale: str = None) -> str:
         """Genera respuestas inteligentes basadas en patrones"""
-        
+        # Unas pocas búsquedas de subcadenas: cualquier pool costaría más que la búsqueda
+        return SimpleAI.match_response(prompt, i18n.resolve(locale))
+    
+    @staticmethod
+    def match_response(prompt: str, locale: str = None) -> str:
+        """Búsqueda de la respuesta (síncrona)"""
+        locale = i18n.resolve(locale)
         prompt_lower = prompt.lower()
         
-        # Respuestas para saludos
-        greetings = {
-            "hola": "¡Hola! Soy ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱, tu asistente avanzado. ¿En qué puedo ayudarte hoy? 🤖",
-            "hi": "Hello! I'm ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱, your advanced assistant. How can I help you today? 🤖",
-            "hello": "Hey there! I'm ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 bot, ready to assist you! 💫",
-            "buenos dias": "¡Buenos días! ☀️ Espero que tengas un día maravilloso. ¿En qué puedo ayudarte?",
-            "buenas tardes": "¡Buenas tardes! 🌇 ¿Cómo va tu día? Estoy aquí para lo que necesites.",
-            "buenas noches": "¡Buenas noches! 🌙 Espero que hayas tenido un gran día. ¿Neitas ayuda con algo?"
-        }
-        
-        for greeting, response in greetings.items():
-            if greeting in prompt_lower:
-                return response
-        
-        # Respuestas sobre el bot
-        bot_questions = {
-            "quien eres": "Soy ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱, un bot avanzado con sistemas de niveles, economía, Minecraft, programación y mucho más! 🚀",
-            "what are you": "I'm ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱, an advanced bot with leveling systems, economy, Minecraft integration, programming tools and much more! 🚀",
-            "que puedes hacer": "Puedo ayudarte con: 🎮 Minecraft, 💻 Programación, 🏆 Niveles, 💰 Economía, 🛡️ Moderación, 🔍 Búsquedas web y mucho más! Usa `/hc` para ver todos mis comandos.",
-            "what can you do": "I can help you with: 🎮 Minecraft, 💻 Programming, 🏆 Leveling, 💰 Economy, 🛡️ Moderation, 🔍 Web searches and much more! Use `/hc` to see all my commands."
-        }
-        
-        for question, response in bot_questions.items():
-            if question in prompt_lower:
-                return response
-        
-        # Respuestas técnicas
-        tech_responses = {
-            "programacion": "¡Me encanta la programación! 💻 Puedo ayudarte con:\n• Formatear código\n• Información de lenguajes\n• Ejemplos de código\n• Solución de errores simples\nUsa `/code` para empezar!",
-            "minecraft": f"¡Minecraft! 🎮 Nuestro servidor es: `{BotConfig.MINECRAFT_IP}`\nPuedo mostrarte el estado, ayudar a vincular tu cuenta y más. Usa `/mcstatus` para ver el estado actual!",
-            "nivel": "¡El sistema de niveles es increíble! 🏆 Gana XP enviando mensajes y sube de nivel. Cada nivel te da más prestigio y recompensas. Usa `/level` para ver tu progreso!",
-            "economia": "¡Sistema económico activo! 💰 Gana monedas diarias, trabaja y compra items. Usa `/daily` para tu recompensa diaria y `/work` para ganar más!",
-            "comandos": "¡Tengo muchos comandos! 🔧 Usa `/hc` para ver la lista completa de todos mis sistemas y funciones disponibles."
-        }
-        
-        for tech, response in tech_responses.items():
-            if tech in prompt_lower:
-                return response
+        for keyword, response in SimpleAI.knowledge.get(locale) or SimpleAI.build_index(locale):
+            if keyword in prompt_lower:
+                return response.safe_substitute(ip=BotConfig.MINECRAFT_IP)
         
         # Respuestas inteligentes generales
         if "?" in prompt:
-            responses = [
-                f"Basándome en tu pregunta sobre '{prompt}', te recomiendo usar nuestros sistemas especializados. ¿Has probado usar `/hc` para explorar todas las opciones? 🔍",
-                f"Interesante pregunta. Como IA de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱, puedo ayudarte mejor con comandos específicos. ¿Qué te parece si usas `/hc` para ver todas mis funciones? 🤔",
-                f"¡Buena pregunta! Para darte la mejor respuesta, ¿podrías ser más específico? Mientras tanto, te invito a explorar mis comandos con `/hc` 🚀",
-                f"Como sistema ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱, tengo varias formas de ayudarte. ¿Has considerado usar nuestros comandos de búsqueda con `/search`? 🔎"
-            ]
-            return random.choice(responses)
+            return i18n.t("ai.questions", locale, prompt=prompt)
         
         # Respuesta por defecto
-        default_responses = [
-            "¡Interesante! Como ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱, puedo ayudarte de muchas formas. ¿Por qué no pruebas `/hc` para ver todo lo que puedo hacer? 🌟",
-            "¡Entendido! 🤖 Para darte la mejor asistencia, te recomiendo usar mis comandos especializados. Escribe `/hc` para descubrir todas mis funciones!",
-            "¡Gracias por tu mensaje! 💫 Como bot avanzado ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱, tengo muchos sistemas para ayudarte. Usa `/hc` para explorarlos todos!",
-            "¡Hola! Soy ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱, tu asistente multifunción. 🚀 Escribe `/hc` para ver la increíble lista de cosas que puedo hacer por ti!"
-        ]
-        
-        return random.choice(default_responses)
+        return i18n.t("ai.defaults", locale)
 
 # =============================================
 # SISTEMA DE BÚSQUEDA WEB SIN API
@@ -235,6 +1028,16 @@ class WebSearch:
         if cached:
             return cached
         
+        results = WebSearch.build_results(query, max_results)
+        
+        # Guardar en cache
+        cache.set_web_data(f"search_{query}", results)
+        
+        return results
+    
+    @staticmethod
+    def build_results(query: str, max_results: int) -> List[Dict]:
+        """Genera los resultados (síncrona; plantillas fijas, se ejecuta en línea)"""
         # Simulación de resultados de búsqueda
         results = []
         
@@ -290,26 +1093,22 @@ class WebSearch:
             ]
         
         # Limitar resultados
-        results = results[:max_results]
-        
-        # Guardar en cache
-        cache.set_web_data(f"search_{query}", results)
-        
-        return results
+        return results[:max_results]
     
     @staticmethod
     async def get_weather(city: str) -> Dict:
         """Obtiene información del clima (simulada)"""
         
         # Ciudades comunes con clima predefinido
+        # condition es la clave del catálogo weather.conditions
         weather_data = {
-            "madrid": {"temp": 22, "condition": "Soleado", "humidity": 45},
-            "barcelona": {"temp": 24, "condition": "Parcialmente nublado", "humidity": 60},
-            "london": {"temp": 15, "condition": "Lluvioso", "humidity": 80},
-            "new york": {"temp": 18, "condition": "Nublado", "humidity": 65},
-            "tokyo": {"temp": 20, "condition": "Despejado", "humidity": 55},
-            "mexico": {"temp": 25, "condition": "Soleado", "humidity": 40},
-            "paris": {"temp": 17, "condition": "Lluvioso", "humidity": 75}
+            "madrid": {"temp": 22, "condition": "sunny", "humidity": 45},
+            "barcelona": {"temp": 24, "condition": "partly_cloudy", "humidity": 60},
+            "london": {"temp": 15, "condition": "rainy", "humidity": 80},
+            "new york": {"temp": 18, "condition": "cloudy", "humidity": 65},
+            "tokyo": {"temp": 20, "condition": "clear", "humidity": 55},
+            "mexico": {"temp": 25, "condition": "sunny", "humidity": 40},
+            "paris": {"temp": 17, "condition": "rainy", "humidity": 75}
         }
         
         city_lower = city.lower()
@@ -319,64 +1118,605 @@ class WebSearch:
             # Datos aleatorios para ciudades no especificadas
             return {
                 "temp": random.randint(10, 30),
-                "condition": random.choice(["Soleado", "Parcialmente nublado", "Nublado", "Lluvioso"]),
+                "condition": random.choice(["sunny", "partly_cloudy", "cloudy", "rainy"]),
                 "humidity": random.randint(30, 85)
             }
 
 # =============================================
-# BASE DE DATOS MEGA AVANZADA
+# MIGRACIÓN DE DATOS ANTIGUOS
 # =============================================
 
-class ProfessionalDatabase:
-    """Sistema de base de datos profesional"""
+class DataMigrator:
+    """Detecta la versión de un archivo de datos y lo lleva al esquema actual
     
-    def __init__(self):
-        self.file_path = 'honducraft_pro.json'
-        self.backup_dir = 'backups/'
-        self.cache = {}
-        self.setup_directories()
+    Versiones conocidas:
+    - 1.0.0: data.json (warns, mutes, tickets, config)
+    - 2.0.0: honducraft_data.json (user_profiles, server_config, reaction_roles, economy)
+    - 3.0.0: honducraft_ultra.json (añade auto_roles y moderation_settings)
+    - 4.0.0: honducraft_pro.json (metadata, servers, users, config y automod globales)
+    - 5.0.0: esquema actual (la configuración global pasa a "settings")
+    """
     
-    def setup_directories(self):
-        """Crea directorios necesarios"""
-        os.makedirs(self.backup_dir, exist_ok=True)
-        os.makedirs('logs/', exist_ok=True)
-        os.makedirs('data/transcripts/', exist_ok=True)
+    LEGACY_FILES = ("data.json", "honducraft_data.json", "honducraft_ultra.json")
+    COLLECTIONS = ("warns", "mutes", "tickets", "reaction_roles", "economy", "settings")
+    UPGRADES = {
+        "1.0.0": ("2.0.0", "upgrade_v1"),
+        "2.0.0": ("3.0.0", "upgrade_v2"),
+        "3.0.0": ("4.0.0", "upgrade_v3"),
+        "4.0.0": ("5.0.0", "upgrade_v4"),
+    }
     
-    def load_data(self):
-        """Carga datos con estructura avanzada"""
-        default_data = {
-            "metadata": {
-                "version": BotConfig.VERSION,
-                "created_at": datetime.datetime.now().isoformat(),
-                "last_backup": None,
-                "total_servers": 0,
-                "total_users": 0,
-                "uptime": 0
-            },
-            "servers": {},
-            "users": {},
-            "statistics": {
-                "commands_used": 0,
-                "messages_processed": 0,
-                "tickets_created": 0,
-                "mod_actions": 0,
-                "warns_issued": 0,
-                "ai_interactions": 0,
-                "searches_performed": 0
-            }
-        }
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+    
+    def iter_sections(self, path: str):
+        """Recorre las secciones de primer nivel sin construir el documento dos veces"""
+        if ijson:
+            try:
+                with open(path, 'rb') as f:
+                    yield from ijson.kvitems(f, '', use_float=True)
+            except ijson.JSONError as e:
+                raise ValueError(f"{path}: {e}") from e
+            return
         
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
-                return self.deep_merge(default_data, loaded_data)
-        except FileNotFoundError:
-            return default_data
-        except json.JSONDecodeError as e:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        decoder = json.JSONDecoder()
+        skip = self.WHITESPACE.match
+        
+        pos = skip(text, 0).end()
+        if text[pos:pos + 1] != '{':
+            raise json.JSONDecodeError("Se esperaba un objeto JSON", text, pos)
+        pos = skip(text, pos + 1).end()
+        if text[pos:pos + 1] == '}':
+            return
+        
+        while True:
+            if text[pos:pos + 1] != '"':
+                raise json.JSONDecodeError("Se esperaba una clave", text, pos)
+            key, pos = decoder.raw_decode(text, pos)
+            pos = skip(text, pos).end()
+            if text[pos:pos + 1] != ':':
+                raise json.JSONDecodeError("Se esperaba ':'", text, pos)
+            value, pos = decoder.raw_decode(text, skip(text, pos + 1).end())
+            yield key, value
+            
+            pos = skip(text, pos).end()
+            delimiter = text[pos:pos + 1]
+            if delimiter == '}':
+                break
+            if delimiter != ',':
+                raise json.JSONDecodeError("Se esperaba ',' o '}'", text, pos)
+            pos = skip(text, pos + 1).end()
+        
+        if skip(text, pos + 1).end() != len(text):
+            raise json.JSONDecodeError("Datos extra después del objeto", text, pos + 1)
+    
+    def read(self, path: str) -> dict:
+        """Lee un archivo antiguo por secciones (el almacén actual se carga con json.load)"""
+        return dict(self.iter_sections(path))
+    
+    def detect_version(self, doc: dict) -> str:
+        metadata = doc.get("metadata")
+        if isinstance(metadata, dict) and metadata.get("version"):
+            return str(metadata["version"])
+        if "servers" in doc or "users" in doc:
+            return "4.0.0"
+        if "auto_roles" in doc or "moderation_settings" in doc:
+            return "3.0.0"
+        if "user_profiles" in doc or "server_config" in doc:
+            return "2.0.0"
+        return "1.0.0"
+    
+    def upgrade(self, doc: dict):
+        """Aplica la cadena de actualizaciones; devuelve (documento, versiones recorridas)"""
+        version = self.detect_version(doc)
+        chain = [version]
+        while version != BotConfig.VERSION:
+            if version not in self.UPGRADES:
+                logger.warning(f"⚠️ Versión de datos desconocida {version}, se carga sin cambios")
+                return doc, chain
+            version, step = self.UPGRADES[version]
+            doc = getattr(self, step)(doc)
+            chain.append(version)
+        doc.setdefault("metadata", {})["version"] = version
+        return doc, chain
+    
+    def upgrade_v1(self, doc: dict) -> dict:
+        """1.0.0 -> 2.0.0: la configuración global pasa a settings"""
+        if "config" in doc:
+            doc.setdefault("settings", {})["config"] = doc.pop("config")
+        for section in ("user_profiles", "server_config", "reaction_roles", "economy", "statistics"):
+            doc.setdefault(section, {})
+        return doc
+    
+    def upgrade_v2(self, doc: dict) -> dict:
+        """2.0.0 -> 3.0.0: roles automáticos y ajustes de moderación"""
+        doc.setdefault("auto_roles", {"on_join": [], "reaction_roles": {}})
+        doc.setdefault("moderation_settings", {})
+        return doc
+    
+    def upgrade_v3(self, doc: dict) -> dict:
+        """3.0.0 -> 4.0.0: configuración y perfiles por servidor"""
+        servers = doc.setdefault("servers", {})
+        for guild_key, config in doc.pop("server_config", {}).items():
+            self.fill_missing(servers.setdefault(str(guild_key), {}), config)
+        
+        # Solo los perfiles con clave "<servidor>_<usuario>" tienen sitio en users
+        users = doc.setdefault("users", {})
+        profiles = doc.pop("user_profiles", {})
+        for user_key in [key for key in profiles if "_" in str(key)]:
+            self.fill_missing(users.setdefault(str(user_key), {}), profiles.pop(user_key))
+        if profiles:
+            doc["user_profiles"] = profiles
+        
+        auto_roles = doc.get("auto_roles", {})
+        self.fill_missing(doc.setdefault("reaction_roles", {}), auto_roles.pop("reaction_roles", {}))
+        self.fill_missing(doc.setdefault("automod", {}), doc.pop("moderation_settings", {}))
+        return doc
+    
+    def upgrade_v4(self, doc: dict) -> dict:
+        """4.0.0 -> 5.0.0: config y automod globales pasan a settings"""
+        settings = doc.setdefault("settings", {})
+        for section in ("config", "automod"):
+            if section in doc:
+                self.fill_missing(settings.setdefault(section, {}), doc.pop(section))
+        for section in self.COLLECTIONS:
+            doc.setdefault(section, {})
+        return doc
+    
+    def fill_missing(self, base: dict, incoming: dict, apply: bool = True) -> int:
+        """Copia solo las claves que faltan (lo actual nunca se sobrescribe); devuelve cuántas"""
+        added = 0
+        for key, value in incoming.items():
+            if key not in base:
+                added += 1
+                if apply:
+                    base[key] = copy.deepcopy(value)
+            elif isinstance(value, dict) and isinstance(base[key], dict):
+                added += self.fill_missing(base[key], value, apply)
+        return added
+    
+    def merge(self, data: dict, doc: dict, apply: bool = True, owns_guild=None) -> dict:
+        """Fusión idempotente de un documento ya actualizado; devuelve conteos por sección
+        
+        Los registros existentes ganan, y los contadores de estadísticas toman el máximo,
+        así que repetir la migración no duplica nada.
+        """
+        sections = {}
+        for section, incoming in doc.items():
+            if section == "metadata" or not incoming:
+                continue
+            if not isinstance(incoming, dict):
+                if section not in data and apply:
+                    data[section] = copy.deepcopy(incoming)
+                continue
+            
+            target = data.get(section)
+            if target is None:
+                target = {}
+                if apply:
+                    data[section] = target
+            counts = sections[section] = {"records": 0, "new": 0, "updated": 0}
+            
+            for key, value in incoming.items():
+                if value in (None, {}, []):
+                    continue
+                if owns_guild and section in ("servers", "users") and not owns_guild(str(key).split("_", 1)[0]):
+                    continue
+                counts["records"] += 1
+                if section == "statistics":
+                    if isinstance(value, (int, float)) and value > target.get(key, 0):
+                        counts["updated"] += 1
+                        if apply:
+                            target[key] = value
+                elif key not in target:
+                    counts["new"] += 1
+                    if apply:
+                        target[key] = copy.deepcopy(value)
+                elif isinstance(value, dict) and isinstance(target[key], dict):
+                    if self.fill_missing(target[key], value, apply):
+                        counts["updated"] += 1
+            if not counts["records"]:
+                del sections[section]
+        return sections
+    
+    def fingerprint(self, path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def migrate(self, data: dict, sources, dry_run: bool = False, owns_guild=None) -> dict:
+        """Fusiona los archivos antiguos en `data` y devuelve el informe (dry_run no modifica nada)"""
+        ledger = data.get("metadata", {}).get("migrations", {})
+        report = {"dry_run": dry_run, "streaming": "ijson" if ijson else "raw_decode", "sources": []}
+        started = time.perf_counter()
+        
+        for path in sources:
+            name = os.path.basename(path)
+            entry = {"file": name}
+            report["sources"].append(entry)
+            if not os.path.exists(path):
+                entry["status"] = "no existe"
+                continue
+            
+            entry["bytes"] = os.path.getsize(path)
+            digest = self.fingerprint(path)
+            if ledger.get(name, {}).get("sha256") == digest:
+                entry["status"] = "ya migrado"
+                continue
+            
+            try:
+                start = time.perf_counter()
+                doc = self.read(path)
+                entry["parse_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                
+                start = time.perf_counter()
+                doc, chain = self.upgrade(doc)
+                entry["versions"] = chain
+                entry["upgrade_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                
+                start = time.perf_counter()
+                entry["sections"] = self.merge(data, doc, apply=not dry_run, owns_guild=owns_guild)
+                entry["merge_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            except (OSError, ValueError) as e:
+                entry["status"] = f"error: {e}"
+                logger.error(f"❌ No se pudo migrar {name}: {e}")
+                continue
+            
+            entry["status"] = "simulado" if dry_run else "migrado"
+            if not dry_run:
+                data.setdefault("metadata", {}).setdefault("migrations", {})[name] = {
+                    "sha256": digest,
+                    "from_version": chain[0],
+                    "migrated_at": datetime.datetime.now().isoformat(),
+                    "records": {section: counts["new"] for section, counts in entry["sections"].items()}
+                }
+                logger.info(f"📦 {name} migrado ({chain[0]} → {chain[-1]})")
+        
+        report["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return report
+
+migrator = DataMigrator()
+
+# =============================================
+# SNAPSHOT BINARIO DEL ALMACÉN
+# =============================================
+
+class SnapshotError(ValueError):
+    """Snapshot dañado: cabecera, índice o checksum inválidos"""
+
+class LazySnapshot(dict):
+    """Almacén leído de un snapshot: cada sección se descomprime en su primer acceso
+    
+    Las secciones que nunca se leen se vuelven a guardar tal cual, sin decodificarlas.
+    """
+    
+    def __init__(self, mm: mmap.mmap, sections: dict):
+        super().__init__(dict.fromkeys(sections))
+        self.mm = mm
+        self.pending = sections
+        self.lock = threading.Lock()
+    
+    def resolve(self, name: str):
+        with self.lock:
+            if name not in self.pending:
+                return dict.__getitem__(self, name)
+            block, raw_length, _ = self.pending.pop(name)
+            value = json.loads(zlib.decompress(block, bufsize=raw_length))
+            block.release()
+            dict.__setitem__(self, name, value)
+            if not self.pending:
+                self.mm.close()
+            return value
+    
+    def resolve_all(self):
+        for name in list(self.pending):
+            self.resolve(name)
+        return self
+    
+    def discard(self, name: str):
+        with self.lock:
+            entry = self.pending.pop(name, None)
+            if entry:
+                entry[0].release()
+                if not self.pending:
+                    self.mm.close()
+    
+    def __getitem__(self, name):
+        if name in self.pending:
+            return self.resolve(name)
+        return dict.__getitem__(self, name)
+    
+    def get(self, name, default=None):
+        if name in self.pending:
+            return self.resolve(name)
+        return dict.get(self, name, default)
+    
+    def setdefault(self, name, default=None):
+        if name in self.pending:
+            return self.resolve(name)
+        return dict.setdefault(self, name, default)
+    
+    def pop(self, name, *default):
+        if name in self.pending:
+            self.resolve(name)
+        return dict.pop(self, name, *default)
+    
+    def __setitem__(self, name, value):
+        self.discard(name)
+        dict.__setitem__(self, name, value)
+    
+    def __delitem__(self, name):
+        self.discard(name)
+        dict.__delitem__(self, name)
+    
+    def items(self):
+        return dict.items(self.resolve_all())
+    
+    def values(self):
+        return dict.values(self.resolve_all())
+    
+    def copy(self):
+        return dict(self.items())
+    
+    def __reduce_ex__(self, protocol):
+        return dict, (self.copy(),)
+
+class SnapshotCodec:
+    """Formato binario del almacén: una sección comprimida por tabla con su CRC32
+    
+    Cabecera (MAGIC, versión, nº de secciones), índice con nombre, offset, longitud
+    comprimida, longitud original y CRC32 de cada sección, y luego los bloques zlib
+    (JSON compacto dentro, así que cualquier sección se puede exportar sin pérdidas).
+    """
+    
+    MAGIC = b"HCSNAP\r\n"
+    VERSION = 1
+    HEADER = struct.Struct("<8sHH")
+    NAME = struct.Struct("<H")
+    ENTRY = struct.Struct("<QQQI")
+    LEVEL = 1
+    
+    def encode_section(self, value) -> tuple:
+        raw = json.dumps(value, separators=(',', ':'), default=str).encode('utf-8')
+        block = zlib.compress(raw, self.LEVEL)
+        return block, len(raw), zlib.crc32(block)
+    
+    def encode(self, data: dict, pending: dict = None) -> bytes:
+        """Serializa el almacén; las secciones sin leer (las de un LazySnapshot o `pending`) se copian tal cual"""
+        pending = getattr(data, "pending", {}) if pending is None else pending
+        blocks = []
+        for name in list(data.keys()):
+            entry = pending.get(name)
+            blocks.append((name.encode('utf-8'), *(entry if entry else self.encode_section(data[name]))))
+        
+        offset = self.HEADER.size + sum(self.NAME.size + len(name) + self.ENTRY.size for name, *_ in blocks)
+        index = [self.HEADER.pack(self.MAGIC, self.VERSION, len(blocks))]
+        for name, block, raw_length, crc in blocks:
+            index.append(self.NAME.pack(len(name)) + name)
+            index.append(self.ENTRY.pack(offset, len(block), raw_length, crc))
+            offset += len(block)
+        return b"".join(index + [block for _, block, _, _ in blocks])
+    
+    def open(self, path: str) -> LazySnapshot:
+        """Mapea el archivo en memoria, valida índice y checksums y devuelve las secciones sin decodificar"""
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        sections = {}
+        try:
+            magic, version, count = self.HEADER.unpack_from(mm, 0)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise SnapshotError(f"{path}: no es un snapshot v{self.VERSION}")
+            
+            pos = self.HEADER.size
+            for _ in range(count):
+                (name_length,) = self.NAME.unpack_from(mm, pos)
+                pos += self.NAME.size
+                name = bytes(view[pos:pos + name_length]).decode('utf-8')
+                pos += name_length
+                offset, length, raw_length, crc = self.ENTRY.unpack_from(mm, pos)
+                pos += self.ENTRY.size
+                
+                if offset + length > len(mm):
+                    raise SnapshotError(f"{path}: sección '{name}' truncada")
+                block = view[offset:offset + length]
+                if zlib.crc32(block) != crc:
+                    block.release()
+                    raise SnapshotError(f"{path}: checksum inválido en la sección '{name}'")
+                sections[name] = (block, raw_length, crc)
+        except (struct.error, UnicodeDecodeError, SnapshotError) as e:
+            for block, _, _ in sections.values():
+                block.release()
+            view.release()
+            mm.close()
+            raise e if isinstance(e, SnapshotError) else SnapshotError(f"{path}: índice dañado ({e})") from e
+        
+        view.release()
+        return LazySnapshot(mm, sections)
+
+snapshot_codec = SnapshotCodec()
+
+def atomic_write_bytes(path: str, payload: bytes):
+    """Escribe bytes en un temporal y lo reemplaza de forma atómica"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+# =============================================
+# BASE DE DATOS MEGA AVANZADA
+# =============================================
+
+class ProfessionalDatabase:
+    """Sistema de base de datos profesional"""
+    
+    FLUSH_INTERVAL = 30
+    # Secciones con un registro por servidor: cada partición se queda solo con los suyos
+    GUILD_SECTIONS = ("servers", "users", "warns", "mutes", "tickets")
+    # Lo que lee el arranque (configuración, roles y sanciones); con snapshot, users sigue
+    # sin decodificar hasta su primer acceso
+    STARTUP_SECTIONS = ("metadata", "settings", "servers", "auto_roles", "warns", "mutes", "statistics")
+    
+    def __init__(self, shard_settings: dict = None):
+        self.shard_settings = shard_settings or {"partition": None}
+        self.partition = self.shard_settings["partition"]
+        self.shared_file_path = 'honducraft_pro.json'
+        if self.partition:
+            self.file_path = f'honducraft_pro.{self.partition}.json'
+            self.backup_dir = f'backups/{self.partition}/'
+        else:
+            self.file_path = self.shared_file_path
+            self.backup_dir = 'backups/'
+        self.format = BotConfig.DATA_FORMAT if BotConfig.DATA_FORMAT in ("json", "snapshot") else "json"
+        self.snapshot_path = f"{os.path.splitext(self.file_path)[0]}.snap"
+        self.cache = {}
+        # Cambios pendientes de guardar (se agrupan y los guarda flush cada FLUSH_INTERVAL)
+        self.dirty = False
+        self.last_flush = time.time()
+        # La carga puede empezar en un hilo (warm_database) y en el loop a la vez: solo carga uno
+        self.load_lock = threading.RLock()
+        # flush y save_data_auto guardan desde hilos: nunca dos escrituras a la vez
+        self.save_lock = threading.Lock()
+        self.setup_directories()
+    
+    def owns_guild(self, guild_id) -> bool:
+        """Indica si el servidor pertenece a los shards de este proceso"""
+        if not self.partition:
+            return True
+        shard = shard_for_guild(guild_id, self.shard_settings["shard_count"])
+        return shard in self.shard_settings["shard_ids"]
+    
+    def owns_key(self, section: str, key: str, value) -> bool:
+        """Indica si un registro de una sección por servidor pertenece a esta partición"""
+        if section == "users":
+            key = key.split("_", 1)[0]
+        elif section == "tickets":
+            # Los tickets van por canal; el servidor está en el propio registro
+            key = str(value.get("guild_id", "")) if isinstance(value, dict) else ""
+            if not key:
+                return True
+        return key.isdigit() and self.owns_guild(key)
+    
+    def seed_partition(self, default_data: dict) -> dict:
+        """Crea el archivo de la partición desde el compartido, ya migrado
+        
+        Las secciones por servidor se quedan con los servidores de sus shards; las globales
+        (settings, auto_roles...) se copian enteras. Las estadísticas empiezan de cero para
+        no contarlas dos veces entre particiones.
+        """
+        try:
+            with open(self.shared_file_path, 'r', encoding='utf-8') as f:
+                shared = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return default_data
+        if not isinstance(shared, dict):
+            return default_data
+        
+        shared, versions = migrator.upgrade(shared)
+        for section, value in shared.items():
+            if section == "statistics":
+                continue
+            if section == "metadata":
+                if "migrations" in value:
+                    default_data["metadata"]["migrations"] = value["migrations"]
+                continue
+            if section in self.GUILD_SECTIONS and isinstance(value, dict):
+                value = {k: v for k, v in value.items() if self.owns_key(section, str(k), v)}
+            default_data[section] = value
+        
+        if len(versions) > 1:
+            logger.info(f"⬆️ {self.shared_file_path} actualizado para la partición: {' → '.join(versions)}")
+        logger.info(
+            f"📦 Partición {self.partition} creada: {len(default_data['servers'])} servidores, "
+            f"{len(default_data['users'])} usuarios"
+        )
+        return default_data
+    
+    @property
+    def store_path(self) -> str:
+        """Archivo principal del almacén según el formato elegido"""
+        return self.snapshot_path if self.format == "snapshot" else self.file_path
+    
+    def setup_directories(self):
+        """Crea directorios necesarios"""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        os.makedirs('logs/', exist_ok=True)
+        os.makedirs('data/transcripts/', exist_ok=True)
+    
+    def load_data(self):
+        """Carga datos con estructura avanzada"""
+        default_data = {
+            "metadata": {
+                "version": BotConfig.VERSION,
+                "created_at": datetime.datetime.now().isoformat(),
+                "last_backup": None,
+                "total_servers": 0,
+                "total_users": 0,
+                "uptime": 0
+            },
+            "servers": {},
+            "users": {},
+            "warns": {},
+            "mutes": {},
+            "statistics": {
+                "commands_used": 0,
+                "messages_processed": 0,
+                "tickets_created": 0,
+                "mod_actions": 0,
+                "warns_issued": 0,
+                "ai_interactions": 0,
+                "searches_performed": 0,
+                "roles_assigned": 0
+            }
+        }
+        
+        if self.format == "snapshot" and os.path.exists(self.snapshot_path):
+            try:
+                loaded_data = snapshot_codec.open(self.snapshot_path)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error cargando snapshot: {e}")
+                self.create_backup("corrupted_recovery")
+                return default_data
+            # Solo se completan las secciones pequeñas; users y servers siguen sin decodificar
+            for key, value in default_data.items():
+                if key not in loaded_data:
+                    loaded_data[key] = value
+                elif value:
+                    loaded_data[key] = self.deep_merge(value, loaded_data[key])
+            return loaded_data
+        
+        # Sin snapshot todavía: se lee el JSON y el próximo guardado crea el snapshot
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                loaded_data = json.load(f)
+            if not isinstance(loaded_data, dict):
+                raise ValueError(f"{self.file_path}: se esperaba un objeto JSON")
+            loaded_data, versions = migrator.upgrade(loaded_data)
+            if len(versions) > 1:
+                logger.info(f"⬆️ {self.file_path} actualizado: {' → '.join(versions)}")
+            return self.deep_merge(default_data, loaded_data)
+        except FileNotFoundError:
+            if self.partition:
+                return self.seed_partition(default_data)
+            return default_data
+        except ValueError as e:
             logger.error(f"Error cargando datos: {e}")
             self.create_backup("corrupted_recovery")
             return default_data
     
+    def resolve(self, *names):
+        """Decodifica ya esas secciones del snapshot (para hacerlo en un hilo y no en el loop)"""
+        data = self.data
+        if isinstance(data, LazySnapshot):
+            for name in names:
+                if name in data.pending:
+                    data.resolve(name)
+    
     def deep_merge(self, base: dict, update: dict) -> dict:
         """Fusión profunda de diccionarios"""
         for key, value in update.items():
@@ -386,30 +1726,92 @@ class ProfessionalDatabase:
                 base[key] = value
         return base
     
-    def save_data(self):
-        """Guarda datos con optimizaciones"""
-        try:
-            self.create_backup("auto_save")
-            
-            self.data["metadata"]["last_updated"] = datetime.datetime.now().isoformat()
-            
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False, default=str)
-            
-            self.clean_old_backups()
-            
-        except Exception as e:
-            logger.error(f"Error guardando datos: {e}")
-            self.emergency_save()
+    def copy_sections(self) -> tuple:
+        """Copia superficial de cada sección para guardarla desde un hilo
+        
+        Se hace en el loop, así el hilo serializa diccionarios a los que el loop ya no añade
+        ni quita claves. Las secciones del snapshot sin leer se copian como bloques comprimidos.
+        """
+        data = self.data
+        pending = {name: (bytes(block), raw_length, crc) for name, (block, raw_length, crc) in getattr(data, "pending", {}).items()}
+        sections = {name: None if name in pending else copy.copy(dict.__getitem__(data, name)) for name in list(dict.keys(data))}
+        return sections, pending
+    
+    def save_data(self, backup: bool = True, sections: tuple = None) -> bool:
+        """Guarda datos con optimizaciones (se puede llamar desde un hilo); indica si se guardó
+        
+        Desde un hilo conviene pasar `sections` (copy_sections, tomada en el loop).
+        """
+        with self.save_lock:
+            # Se limpia antes de escribir para no perder lo que se marque durante la escritura,
+            # y se restaura si falla: dirty solo queda limpio si el archivo se reemplazó
+            self.dirty = False
+            try:
+                data, pending = sections if sections else (self.data, None)
+                if backup:
+                    self.create_backup("auto_save", data)
+                
+                self.data["metadata"]["last_updated"] = datetime.datetime.now().isoformat()
+                if data is not self.data:
+                    data["metadata"] = dict(self.data["metadata"])
+                
+                if self.format == "snapshot":
+                    atomic_write_bytes(self.snapshot_path, snapshot_codec.encode(data, pending))
+                else:
+                    atomic_write_json(self.file_path, data, indent=2, ensure_ascii=False, default=str)
+                
+                if backup:
+                    self.clean_old_backups()
+                return True
+                
+            except RuntimeError as e:
+                # El loop agregó o quitó claves de un registro mientras se serializaba en el hilo
+                self.dirty = True
+                logger.warning(f"⚠️ Los datos cambiaron durante el guardado, se reintenta en el próximo flush: {e}")
+            except Exception as e:
+                self.dirty = True
+                logger.error(f"Error guardando datos: {e}")
+                self.emergency_save()
+            return False
+    
+    async def flush(self, force: bool = False):
+        """Guarda los cambios pendientes en un hilo, como mucho una vez cada FLUSH_INTERVAL segundos
+        
+        Sin backup: los backups siguen a ritmo de save_data_auto (cada 15 minutos).
+        """
+        if self.dirty and (force or time.time() - self.last_flush >= self.FLUSH_INTERVAL):
+            self.last_flush = time.time()
+            # Si falla, dirty sigue activo y se reintenta en el próximo flush (nunca en el loop)
+            await asyncio.to_thread(self.save_data, False, self.copy_sections())
     
-    def create_backup(self, reason: str = "manual"):
-        """Crea backup"""
+    def export_json(self, path: str = None) -> str:
+        """Exporta el almacén con la estructura JSON de siempre (honducraft_pro.json)"""
+        path = path or self.file_path
+        atomic_write_json(path, self.data, indent=2, ensure_ascii=False, default=str)
+        return path
+    
+    def create_backup(self, reason: str = "manual", data: dict = None):
+        """Crea backup (de `data` si se pasa una copia de copy_sections)"""
         try:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_file = f"{self.backup_dir}backup_{timestamp}_{reason}.json"
             
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            if self.format == "snapshot":
+                # El snapshot anterior ya es un backup comprimido y verificado: basta con copiarlo
+                if not os.path.exists(self.snapshot_path):
+                    return False
+                shutil.copyfile(self.snapshot_path, f"{self.backup_dir}backup_{timestamp}_{reason}.snap")
+                if '_data' not in self.__dict__:
+                    # Recuperación durante la carga: todavía no hay datos en memoria
+                    return True
+            else:
+                backup_file = f"{self.backup_dir}backup_{timestamp}_{reason}.json"
+                if '_data' not in self.__dict__:
+                    # Recuperación durante la carga: se guarda el archivo tal cual estaba
+                    if not os.path.exists(self.file_path):
+                        return False
+                    shutil.copyfile(self.file_path, backup_file)
+                    return True
+                atomic_write_json(backup_file, self.data if data is None else data, indent=2, ensure_ascii=False, default=str)
             
             self.data["metadata"]["last_backup"] = timestamp
             return True
@@ -422,7 +1824,7 @@ class ProfessionalDatabase:
         try:
             backups = []
             for file in os.listdir(self.backup_dir):
-                if file.startswith("backup_") and file.endswith(".json"):
+                if file.startswith("backup_") and file.endswith((".json", ".snap")):
                     backups.append(file)
             
             backups.sort(reverse=True)
@@ -436,23 +1838,21 @@ class ProfessionalDatabase:
     def emergency_save(self):
         """Guardado de emergencia"""
         try:
-            temp_file = f"{self.file_path}.emergency"
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f)
+            atomic_write_json(f"{self.file_path}.emergency", self.data, default=str)
         except Exception as e:
             logger.error(f"❌ Error en guardado de emergencia: {e}")
     
     def get_guild_config(self, guild_id: int) -> dict:
-        """Obtiene configuración del servidor"""
+        """Configuración guardada del servidor (mutable; para leer usa guild_configs.get)"""
         guild_key = str(guild_id)
         if guild_key not in self.data["servers"]:
             self.data["servers"][guild_key] = self.get_default_guild_config()
-            self.save_data()
+            self.dirty = True
         return self.data["servers"][guild_key]
     
     def get_default_guild_config(self) -> dict:
         """Configuración por defecto"""
-        return {
+        config = {
             "prefix": "!",
             "language": "es",
             "modules": {
@@ -462,23 +1862,59 @@ class ProfessionalDatabase:
                 "minecraft": True,
                 "programming": True,
                 "ai": True,
-                "search": True
+                "search": True,
+                "automod": True
+            },
+            "automod": {
+                "enabled": True,
+                "anti_spam": True,
+                "anti_raid": True,
+                "anti_invites": True,
+                "anti_links": False,
+                "max_warns": 3,
+                "warn_expiry_days": 30,
+                "warn_mute_minutes": 60,
+                "filter_words": [],
+                "whitelisted_links": [],
+                "whitelisted_roles": [],
+                "ignored_channels": []
+            },
+            "channels": {
+                "mod_logs": None,
+                "tickets_category": None
+            },
+            "roles": {
+                "auto_roles": [],
+                "level_roles": {},
+                "muted": None
+            },
+            "tickets": {
+                "enabled": True,
+                "support_roles": [],
+                "transcript_format": "jsonl",
+                "categories": {
+                    "support": {"emoji": "💼", "name": "Soporte"},
+                    "report": {"emoji": "🚨", "name": "Reporte"},
+                    "suggestion": {"emoji": "💡", "name": "Sugerencia"}
+                }
             }
         }
+        # El automod global de versiones anteriores (la migración lo deja en settings.automod,
+        # p. ej. max_warns de moderation_settings) sirve de valor por defecto
+        legacy = self.data.get("settings", {}).get("automod", {})
+        config["automod"].update({key: value for key, value in legacy.items() if key in config["automod"]})
+        return config
     
     def update_guild_config(self, guild_id: int, updates: dict):
-        """Actualiza configuración del servidor"""
-        guild_key = str(guild_id)
-        current_config = self.get_guild_config(guild_id)
-        self.data["servers"][guild_key] = self.deep_merge(current_config, updates)
-        self.save_data()
+        """Actualiza configuración del servidor (versiona y avisa a los suscriptores)"""
+        return guild_configs.update(guild_id, updates)
     
     def get_user_data(self, user_id: int, guild_id: int) -> dict:
         """Obtiene datos de usuario"""
         user_key = f"{guild_id}_{user_id}"
         if user_key not in self.data["users"]:
             self.data["users"][user_key] = self.get_default_user_data()
-            self.save_data()
+            self.dirty = True
         return self.data["users"][user_key]
     
     def get_default_user_data(self) -> dict:
@@ -507,17 +1943,249 @@ class ProfessionalDatabase:
         user_key = f"{guild_id}_{user_id}"
         current_data = self.get_user_data(user_id, guild_id)
         self.data["users"][user_key] = self.deep_merge(current_data, updates)
-        self.save_data()
+        self.dirty = True
     
     def __getattr__(self, name):
         if name == "data":
-            if not hasattr(self, '_data'):
-                self._data = self.load_data()
+            with self.load_lock:
+                if '_data' not in self.__dict__:
+                    self._data = self.load_data()
             return self._data
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
 # Instancia global de la base de datos
-db = ProfessionalDatabase()
+db = ProfessionalDatabase(shard_settings)
+
+def freeze_config(value):
+    """Copia inmutable: dict -> MappingProxyType, list -> tuple"""
+    if isinstance(value, dict):
+        return types.MappingProxyType({key: freeze_config(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_config(item) for item in value)
+    return value
+
+class GuildConfigStore:
+    """Configuración por servidor con versiones, instantáneas inmutables y avisos de cambio
+    
+    La configuración efectiva es la guardada en la base de datos más las sobrescrituras
+    del archivo editable (clave "*" para todos los servidores o el ID del servidor),
+    que se recarga en caliente al cambiar su fecha de modificación.
+    """
+    
+    def __init__(self, database: ProfessionalDatabase, override_file: str):
+        self.db = database
+        self.override_file = override_file
+        self.override_mtime = None
+        self.overrides = {}
+        self.versions = Counter()
+        self.snapshots = {}
+        self.subscribers = []
+    
+    def subscribe(self, callback):
+        """callback(guild_id, snapshot) tras cada cambio; guild_id None significa todos"""
+        self.subscribers.append(callback)
+        return callback
+    
+    def notify(self, guild_id: Optional[int], snapshot):
+        for callback in self.subscribers:
+            try:
+                callback(guild_id, snapshot)
+            except Exception as e:
+                logger.error(f"Error notificando cambio de configuración ({guild_id}): {e}")
+    
+    def get(self, guild_id) -> types.MappingProxyType:
+        """Instantánea inmutable de la configuración efectiva (no escribe nada a disco)"""
+        key = str(guild_id)
+        snapshot = self.snapshots.get(key)
+        if snapshot is None:
+            stored = self.db.data["servers"].get(key)
+            effective = copy.deepcopy(stored) if stored else self.db.get_default_guild_config()
+            for layer in (self.overrides.get("*"), self.overrides.get(key)):
+                if layer:
+                    self.db.deep_merge(effective, copy.deepcopy(layer))
+            snapshot = self.snapshots[key] = freeze_config(effective)
+        return snapshot
+    
+    def version(self, guild_id) -> int:
+        return self.versions[str(guild_id)]
+    
+    def update(self, guild_id, updates: dict) -> types.MappingProxyType:
+        """Fusiona cambios en la configuración guardada; se escriben a disco en el próximo db.flush"""
+        self.db.deep_merge(self.db.get_guild_config(guild_id), copy.deepcopy(updates))
+        self.db.dirty = True
+        return self.changed(str(guild_id))
+    
+    def changed(self, key: str) -> types.MappingProxyType:
+        self.versions[key] += 1
+        self.snapshots.pop(key, None)
+        snapshot = self.get(key)
+        self.notify(int(key), snapshot)
+        return snapshot
+    
+    @staticmethod
+    def clean_rate_limits(rate_limits, source: str) -> dict:
+        """Deja solo límites válidos: scope conocido y [usos, segundos] positivos"""
+        clean = {}
+        if not isinstance(rate_limits, dict):
+            logger.warning(f"⚠️ {source}: rate_limits debe ser un objeto, se ignora")
+            return clean
+        for command, budgets in rate_limits.items():
+            if not isinstance(budgets, dict):
+                logger.warning(f"⚠️ {source}: rate_limits.{command} debe ser un objeto, se ignora")
+                continue
+            for scope, budget in budgets.items():
+                if (
+                    scope in RateLimiter.BUCKET_TYPES and isinstance(budget, list) and len(budget) == 2
+                    and all(isinstance(n, (int, float)) and not isinstance(n, bool) and n > 0 for n in budget)
+                ):
+                    clean.setdefault(command, {})[scope] = budget
+                else:
+                    logger.warning(f"⚠️ {source}: límite {command}.{scope}={budget!r} inválido, se ignora")
+        return clean
+    
+    def load_overrides(self) -> bool:
+        """Recarga el archivo editable si cambió; un JSON inválido conserva lo anterior"""
+        try:
+            mtime = os.stat(self.override_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self.override_mtime:
+            return False
+        
+        overrides = {}
+        if mtime is not None:
+            try:
+                with open(self.override_file, 'r', encoding='utf-8') as f:
+                    overrides = json.load(f)
+                if not isinstance(overrides, dict):
+                    raise ValueError("debe ser un objeto JSON {\"<guild_id>\" | \"*\": {...}}")
+            except (OSError, ValueError) as e:
+                logger.error(f"❌ {self.override_file} inválido, se mantiene la configuración anterior: {e}")
+                self.override_mtime = mtime
+                return False
+        
+        overrides = {str(key): value for key, value in overrides.items() if key == "*" or str(key).isdigit()}
+        for key, layer in list(overrides.items()):
+            if not isinstance(layer, dict):
+                logger.warning(f"⚠️ {self.override_file}[{key}] debe ser un objeto, se ignora")
+                del overrides[key]
+            elif "rate_limits" in layer:
+                layer["rate_limits"] = self.clean_rate_limits(layer["rate_limits"], f"{self.override_file}[{key}]")
+        previous, self.overrides = self.overrides, overrides
+        self.override_mtime = mtime
+        
+        if previous.get("*") != overrides.get("*"):
+            for key in set(self.snapshots) | set(self.versions):
+                self.versions[key] += 1
+            self.snapshots.clear()
+            self.notify(None, None)
+            logger.info(f"🔄 {self.override_file} recargado: cambio global")
+            return True
+        
+        changed = [key for key in set(previous) | set(overrides) if previous.get(key) != overrides.get(key)]
+        for key in changed:
+            self.changed(key)
+        logger.info(f"🔄 {self.override_file} recargado: {len(changed)} servidores con cambios")
+        return True
+
+# El archivo lo edita el operador y el bot solo lo lee: todas las particiones comparten el mismo
+guild_configs = GuildConfigStore(db, os.getenv("GUILD_CONFIG_FILE", "guild_config.json"))
+guild_configs.subscribe(prefix_dispatcher.invalidate)
+
+# =============================================
+# TEXTOS E IDIOMAS
+# =============================================
+
+class Localizer:
+    """Catálogos de textos por idioma (locales/<idioma>.json) precompilados a plantillas
+
+    Cada catálogo se carga y compila la primera vez que se pide su idioma; el idioma
+    de cada servidor sale de la instantánea de configuración ("language").
+    """
+
+    DEFAULT = "es"
+
+    def __init__(self, directory: str, default: str = DEFAULT):
+        self.directory = directory
+        self.default = default
+        try:
+            self.locales = frozenset(name[:-5] for name in os.listdir(directory) if name.endswith(".json"))
+        except FileNotFoundError:
+            self.locales = frozenset()
+        self.bundles = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def compile(cls, node, prefix: str, bundle: dict) -> dict:
+        """Aplana el catálogo en claves con puntos; las listas son variantes al azar"""
+        for key, value in node.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                cls.compile(value, f"{path}.", bundle)
+            elif isinstance(value, list):
+                bundle[path] = tuple(string.Template(str(item)) for item in value)
+            else:
+                bundle[path] = string.Template(str(value))
+        return bundle
+
+    def load(self, locale: str) -> dict:
+        path = os.path.join(self.directory, f"{locale}.json")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                catalog = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Catálogo de idioma {path} inválido: {e}")
+            return {}
+        bundle = self.compile(catalog, "", {})
+        logger.info(f"🌐 Idioma {locale} cargado ({len(bundle):,} textos)")
+        return bundle
+
+    def bundle(self, locale: str) -> dict:
+        bundle = self.bundles.get(locale)
+        if bundle is None:
+            with self.lock:
+                bundle = self.bundles.get(locale)
+                if bundle is None:
+                    bundle = self.bundles[locale] = self.load(locale)
+        return bundle
+
+    def resolve(self, locale: Optional[str]) -> str:
+        return locale if locale in self.locales else self.default
+
+    def t(self, key: str, locale: str = None, **values) -> str:
+        """Texto traducido; si falta se usa el idioma por defecto y después la propia clave"""
+        locale = self.resolve(locale)
+        template = self.bundle(locale).get(key)
+        if template is None and locale != self.default:
+            template = self.bundle(self.default).get(key)
+        if template is None:
+            return key
+        if isinstance(template, tuple):
+            template = random.choice(template)
+        return template.safe_substitute(values)
+
+    def section(self, prefix: str, locale: str = None) -> list:
+        """[(subclave, plantilla)] bajo un prefijo, en el orden del catálogo"""
+        return [
+            (key[len(prefix):], template)
+            for key, template in self.bundle(self.resolve(locale)).items()
+            if key.startswith(prefix)
+        ]
+
+    def locale_for(self, guild_id) -> str:
+        if guild_id is None:
+            return self.default
+        return self.resolve(guild_configs.get(guild_id).get("language"))
+
+    def text(self, guild: Optional[discord.Guild], key: str, **values) -> str:
+        """Texto en el idioma configurado del servidor (DM: idioma por defecto)"""
+        return self.t(key, self.locale_for(guild.id if guild else None), **values)
+    
+    def for_interaction(self, interaction: discord.Interaction) -> str:
+        """Idioma del cliente de Discord ("en-US" -> "en"); no necesita la configuración cargada"""
+        return self.resolve(str(interaction.locale).split("-")[0])
+
+i18n = Localizer(os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales"))
 
 # =============================================
 # SISTEMA DE EMBEDS PROFESIONALES MORADOS
@@ -629,6 +2297,21 @@ Embeds = ProfessionalEmbeds
 class MinecraftSystem:
     """Sistema de integración con Minecraft mejorado"""
     
+    # Historial del sondeo periódico (24h a un registro cada 5 minutos)
+    history = deque(maxlen=288)
+    last_status = None
+    
+    @staticmethod
+    def record_status(status: Optional[dict]):
+        """Guarda el resultado de un sondeo en el historial"""
+        MinecraftSystem.last_status = status
+        MinecraftSystem.history.append({
+            "timestamp": datetime.datetime.now().isoformat(),
+            "online": bool(status and status["online"]),
+            "players": status["players"] if status else 0,
+            "latency": status["latency"] if status else None
+        })
+    
     @staticmethod
     async def get_server_status(ip: str = BotConfig.MINECRAFT_IP, port: int = 25565):
         """Obtiene el estado del servidor de Minecraft"""
@@ -649,157 +2332,1037 @@ class MinecraftSystem:
             return None
     
     @staticmethod
-    async def create_status_embed(server_ip: str, status: dict):
+    async def create_status_embed(server_ip: str, status: dict, locale: str = None):
         """Crea un embed con el estado del servidor"""
         if not status:
-            return Embeds.error(
-                "❌ Error de Minecraft",
-                f"No se pudo obtener el estado del servidor `{server_ip}`"
-            )
+            return Embeds.error(i18n.t("minecraft.error_title", locale), i18n.t("minecraft.error", locale, ip=server_ip))
         
         if status["online"]:
             embed = Embeds.success(
-                f"🟢 {server_ip} - EN LÍNEA",
-                f"""
-                **🎮 SERVIDOR ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 ACTIVO**
-                
-                **👥 Jugadores conectados:** `{status['players']}/{status['max_players']}`
-                **🛠️ Versión:** `{status['version']}`
-                **⚡ Latencia:** `{status['latency']}ms`
-                **📝 MOTD:** `{status['motd']}`
-                
-                **📍 IP del Servidor:**
-                ```{server_ip}```
-                
-                **¡Conéctate ahora y únete a la aventura!** 🚀
-                """
+                i18n.t("minecraft.online_title", locale, ip=server_ip),
+                i18n.t(
+                    "minecraft.online", locale, players=status['players'], max=status['max_players'],
+                    version=status['version'], latency=status['latency'], motd=status['motd'], ip=server_ip
+                )
             )
         else:
             embed = Embeds.error(
-                f"🔴 {server_ip} - FUERA DE LÍNEA",
-                f"""
-                El servidor **ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱** no está disponible en este momento.
-                
-                **IP:** `{server_ip}`
-                
-                *Por favor, intenta conectarte más tarde.*
-                """
+                i18n.t("minecraft.offline_title", locale, ip=server_ip), i18n.t("minecraft.offline", locale, ip=server_ip)
             )
         
         return embed
 
 # =============================================
-# COMANDOS SLASH (/) - SISTEMA /hc
+# MENSAJES SALIENTES AGRUPADOS
 # =============================================
 
-class SlashCommands(commands.Cog):
-    """Comandos slash modernos y profesionales"""
+class OutboundScheduler:
+    """Cola de avisos por canal que agrupa ráfagas en un solo mensaje
     
-    def __init__(self, bot):
-        self.bot = bot
+    El primer aviso a un canal abre una ventana de OUTBOUND_WINDOW segundos; lo que llegue
+    mientras tanto sale junto (hasta 10 embeds y 2000 caracteres por mensaje). Antes de
+    enviar se consulta el bucket de discord.py de ese canal y, si está agotado, se espera
+    a que se renueve en vez de acumular peticiones detrás de un 429.
+    """
     
-    @app_commands.command(name="hc", description="Muestra todos los sistemas y comandos de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱")
-    async def hc_command(self, interaction: discord.Interaction):
-        """Comando principal /hc"""
-        embed = Embeds.info(
-            "💜 ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 - Sistema de Comandos Completo",
-            """
-            **🎮 SISTEMA MINECRAFT:**
-            `/mcstatus` - Estado del servidor Minecraft
-            `/mcplayers` - Jugadores en línea
-            `/linkmc` - Vincular cuenta Minecraft
-
-            **💻 SISTEMA PROGRAMACIÓN:**
-            `/code` - Formatear código
-            `/langinfo` - Info lenguaje programación
-            `/execute` - Ejecutar código (simulado)
-
-            **🏆 SISTEMA DE NIVELES:**
-            `/level` - Ver tu nivel y progreso
-            `/leaderboard` - Tabla de clasificación
-            `/rank` - Ver tarjeta de rango
-
-            **💰 SISTEMA ECONÓMICO:**
-            `/daily` - Recompensa diaria
-            `/work` - Trabajar por dinero
-            `/balance` - Ver tu balance
-            `/transfer` - Transferir dinero
-
-            **🤖 SISTEMA IA AVANZADO:**
-            `/ai` - Chat con la IA
-            `/ask` - Pregunta anything
-            `/translate` - Traducir texto
-
-            **🔍 SISTEMA DE BÚSQUEDA:**
-            `/search` - Buscar en internet
-            `/weather` - Clima de una ciudad
-            `/wiki` - Buscar en Wikipedia
-
-            **🛡️ SISTEMA DE MODERACIÓN:**
-            `/warn` - Advertir usuario
-            `/clear` - Limpiar mensajes
-            `/mute` - Silenciar usuario
-
-            **📊 SISTEMA DE INFORMACIÓN:**
-            `/serverinfo` - Info del servidor
-            `/userinfo` - Info de usuario
-            `/botinfo` - Info del bot
-
-            **⚙️ COMANDOS TRADICIONALES (!):**
-            `!ayuda` - Sistema de ayuda
-            `!nivel` - Ver nivel
-            `!daily` - Recompensa diaria
-            `!mcstatus` - Estado Minecraft
-            `!ai` - Chat con IA
-            `!search` - Buscar en web
-
-            **💎 IP SERVIDOR MINECRAFT:**
-            ```honducraft.sdlf.fun```
-            """
-        )
-        await interaction.response.send_message(embed=embed)
+    ROUTE_KEY = "POST /channels/{channel_id}/messages"
+    MAX_EMBEDS = 10
+    MAX_EMBED_CHARS = 6000
+    MAX_CONTENT = 2000
     
-    @app_commands.command(name="ai", description="Chat con la IA avanzada de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱")
-    @app_commands.describe(pregunta="Tu pregunta o mensaje para la IA")
-    async def ai_chat(self, interaction: discord.Interaction, pregunta: str):
-        """Chat con IA"""
-        await interaction.response.defer()
-        
-        # Generar respuesta
-        respuesta = await SimpleAI.generate_response(pregunta)
-        
-        # Actualizar estadísticas
-        db.data["statistics"]["ai_interactions"] += 1
-        user_data = db.get_user_data(interaction.user.id, interaction.guild.id)
-        user_data["stats"]["ai_uses"] += 1
-        db.update_user_data(interaction.user.id, interaction.guild.id, user_data)
+    def __init__(self, window: float):
+        self.window = window
+        self.queues = {}
+        self.tasks = {}
+        self.stats = Counter()
+    
+    def send(self, channel: discord.abc.Messageable, content: str = None, embed: discord.Embed = None, delete_after: float = None):
+        """Encola un aviso; no espera a que se envíe"""
+        self.queues.setdefault(channel.id, deque()).append((content[:self.MAX_CONTENT] if content else None, embed, delete_after))
+        self.stats["queued"] += 1
+        if channel.id not in self.tasks:
+            self.tasks[channel.id] = asyncio.create_task(self.drain(channel))
+    
+    def mod_log(self, guild: discord.Guild, embed: discord.Embed) -> bool:
+        """Envía un registro al canal de mod-logs del servidor, si tiene uno"""
+        channel_id = guild_configs.get(guild.id).get("channels", {}).get("mod_logs")
+        channel = guild.get_channel(channel_id) if channel_id else None
+        if not isinstance(channel, discord.TextChannel):
+            return False
+        self.send(channel, embed=embed)
+        return True
+    
+    def bucket_delay(self, channel_id: int) -> float:
+        """Segundos hasta que el bucket de mensajes del canal tenga cupo (0 si ya lo tiene)"""
+        http = bot.http
+        buckets = getattr(http, "_buckets", {})
+        bucket_hash = getattr(http, "_bucket_hashes", {}).get(self.ROUTE_KEY)
+        keys = [f"{self.ROUTE_KEY}:{channel_id}"]
+        if bucket_hash:
+            keys += [f"{bucket_hash}:{channel_id}", f"{bucket_hash}{channel_id}"]
         
-        embed = Embeds.info(
-            "🤖 ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 IA - Asistente Inteligente",
-            f"""
-            **👤 Tu Pregunta:**
-            {pregunta}
+        now = asyncio.get_running_loop().time()
+        for key in keys:
+            ratelimit = buckets.get(key)
+            if ratelimit and ratelimit.remaining <= 0 and ratelimit.expires and ratelimit.expires > now:
+                return ratelimit.expires - now
+        return 0.0
+    
+    def take_batch(self, queue: deque):
+        """Saca de la cola lo que cabe en un mensaje, en orden"""
+        contents, embeds = [], []
+        content_length = embed_chars = 0
+        delete_after = queue[0][2]
+        while queue:
+            content, embed, item_delete_after = queue[0]
+            if item_delete_after != delete_after:
+                break
+            if content and contents and content_length + len(content) + 1 > self.MAX_CONTENT:
+                break
+            if embed and embeds and (len(embeds) >= self.MAX_EMBEDS or embed_chars + len(embed) > self.MAX_EMBED_CHARS):
+                break
+            queue.popleft()
+            if content:
+                contents.append(content)
+                content_length += len(content) + 1
+            if embed:
+                embeds.append(embed)
+                embed_chars += len(embed)
+        return "\n".join(contents) or None, embeds, delete_after
+    
+    async def drain(self, channel: discord.abc.Messageable):
+        queue = self.queues[channel.id]
+        try:
+            await asyncio.sleep(self.window)
+            while queue:
+                global_over = getattr(bot.http, "_global_over", None)
+                if isinstance(global_over, asyncio.Event) and not global_over.is_set():
+                    await global_over.wait()
+                delay = self.bucket_delay(channel.id)
+                if delay:
+                    self.stats["deferred"] += 1
+                    await asyncio.sleep(delay)
+                
+                content, embeds, delete_after = self.take_batch(queue)
+                try:
+                    await channel.send(content=content, embeds=embeds, delete_after=delete_after)
+                    self.stats["sent"] += 1
+                except (discord.Forbidden, discord.NotFound) as e:
+                    self.stats["dropped"] += len(queue) + 1
+                    queue.clear()
+                    logger.warning(f"⚠️ No se pueden enviar avisos a {channel.id}: {e.text or e}")
+                except discord.HTTPException as e:
+                    self.stats["failed"] += 1
+                    logger.error(f"Error enviando avisos a {channel.id}: {e}")
+        finally:
+            self.tasks.pop(channel.id, None)
+            if not queue:
+                self.queues.pop(channel.id, None)
+    
+    async def flush(self, timeout: float = 5):
+        """Envía lo pendiente sin esperar más ventanas (apagado)"""
+        self.window = 0
+        if self.tasks:
+            await asyncio.wait(list(self.tasks.values()), timeout=timeout)
+    
+    def snapshot(self) -> dict:
+        return {
+            "channels_pending": len(self.queues),
+            "pending": sum(len(q) for q in self.queues.values()),
+            **self.stats
+        }
 
-            **💜 Mi Respuesta:**
-            {respuesta}
+outbound = OutboundScheduler(BotConfig.OUTBOUND_WINDOW)
 
-            *💫 Usa `/hc` para ver todos mis sistemas*
-            """
-        )
-        await interaction.followup.send(embed=embed)
+# =============================================
+# SISTEMA DE AUTOMODERACIÓN
+# =============================================
+
+class AutoModSystem:
+    """Automoderación con filtros precompilados por servidor"""
     
-    @app_commands.command(name="search", description="Buscar información en internet")
-    @app_commands.describe(busqueda="Lo que quieres buscar", resultados="Número de resultados (1-5)")
-    async def web_search(self, interaction: discord.Interaction, busqueda: str, resultados: int = 3):
-        """Búsqueda web"""
-        await interaction.response.defer()
+    INVITE_PATTERN = r"(?:https?://)?(?:www\.)?(?:discord(?:app)?\.com/invite|discord\.gg)/[\w-]+"
+    LINK_PATTERN = r"https?://(?P<domain>[^\s/<>:]+)[^\s<>]*"
+    
+    def __init__(self):
+        self.filters = {}
+        self.join_counters = defaultdict(lambda: deque(maxlen=BotConfig.AUTOMOD["raid_joins"]))
+        self.raid_until = {}
+    
+    def get_filter(self, guild_id: int, settings: dict):
+        """Devuelve la regex compilada del servidor; se recompila tras un cambio de configuración"""
+        cached = self.filters.get(guild_id)
+        if cached:
+            return cached
         
-        if resultados > 5:
-            resultados = 5
-        elif resultados < 1:
+        anti_invites = settings.get("anti_invites", False)
+        anti_links = settings.get("anti_links", False)
+        words = settings.get("filter_words", ())
+        whitelist = settings.get("whitelisted_links", ())
+        parts = []
+        if anti_invites:
+            parts.append(f"(?P<invite>{self.INVITE_PATTERN})")
+        if anti_links:
+            parts.append(f"(?P<link>{self.LINK_PATTERN})")
+        if words:
+            alternation = "|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True) if w)
+            if alternation:
+                parts.append(f"(?P<word>\\b(?:{alternation})\\b)")
+        
+        pattern = re.compile("|".join(parts), re.IGNORECASE) if parts else None
+        whitelist = tuple(domain.lower() for domain in whitelist)
+        self.filters[guild_id] = (pattern, whitelist)
+        return pattern, whitelist
+    
+    def invalidate(self, guild_id: Optional[int], snapshot=None):
+        """Suscriptor de guild_configs: descarta la regex del servidor que cambió"""
+        if guild_id is None:
+            self.filters.clear()
+        else:
+            self.filters.pop(guild_id, None)
+    
+    def check_content(self, guild_id: int, settings: dict, content: str) -> Optional[str]:
+        """Revisa el contenido con una sola pasada de la regex del servidor"""
+        pattern, whitelist = self.get_filter(guild_id, settings)
+        if not pattern or not content:
+            return None
+        
+        for match in pattern.finditer(content):
+            if match.lastgroup == "link":
+                domain = match.group("domain").lower()
+                if any(domain == w or domain.endswith("." + w) for w in whitelist):
+                    continue
+            return match.lastgroup
+        return None
+    
+    def check_spam(self, guild_id: int, user_id: int, now: float) -> bool:
+        """Ventana deslizante de mensajes por usuario"""
+        window = cache.message_cache[f"{guild_id}_{user_id}"]
+        window.append(now)
+        return len(window) == window.maxlen and now - window[0] <= BotConfig.AUTOMOD["spam_window"]
+    
+    async def process_message(self, message: discord.Message) -> bool:
+        """Aplica la automoderación; devuelve True si el mensaje fue sancionado"""
+        config = guild_configs.get(message.guild.id)
+        settings = config.get("automod")
+        if not settings or not settings.get("enabled") or not config.get("modules", {}).get("automod", True):
+            return False
+        
+        if message.channel.id in settings.get("ignored_channels", []):
+            return False
+        
+        # El staff (Gestionar mensajes) y los roles permitidos no pasan por la automoderación
+        permissions = getattr(message.author, "guild_permissions", None)
+        if permissions and permissions.manage_messages:
+            return False
+        whitelisted_roles = settings.get("whitelisted_roles")
+        if whitelisted_roles and any(r.id in whitelisted_roles for r in getattr(message.author, "roles", [])):
+            return False
+        
+        violation = None
+        if settings.get("anti_spam") and self.check_spam(message.guild.id, message.author.id, time.time()):
+            violation = "spam"
+        else:
+            violation = self.check_content(message.guild.id, settings, message.content)
+        
+        # Mensaje limpio: salida rápida
+        if not violation:
+            return False
+        
+        await self.punish(message, violation)
+        return True
+    
+    async def punish(self, message: discord.Message, violation: str):
+        """Elimina el mensaje y aplica la sanción correspondiente"""
+        locale = i18n.locale_for(message.guild.id)
+        reason = i18n.t(f"automod.reasons.{violation}", locale)
+        db.data["statistics"]["mod_actions"] += 1
+        
+        try:
+            await message.delete()
+        except (discord.Forbidden, discord.NotFound):
+            pass
+        
+        # Cada infracción es una advertencia; el spam o llegar a max_warns silencian (con su vencimiento)
+        count = moderation.add_warn(message.guild.id, message.author.id, bot.user.id, f"AutoMod: {reason}")
+        max_warns, warn_minutes = moderation.warn_limit(message.guild.id)
+        escalated = bool(max_warns and count >= max_warns)
+        if escalated:
+            minutes, mute_reason = warn_minutes, i18n.t("moderation.auto_mute_reason", locale, count=count, max=max_warns)
+        elif violation == "spam":
+            minutes, mute_reason = BotConfig.AUTOMOD["spam_timeout"], f"AutoMod: {reason}"
+        else:
+            minutes = None
+        if violation == "spam":
+            cache.message_cache.pop(f"{message.guild.id}_{message.author.id}", None)
+        if minutes and isinstance(message.author, discord.Member):
+            try:
+                await moderation.mute(message.guild, message.author.id, bot.user.id, mute_reason, minutes)
+            except discord.HTTPException as e:
+                logger.warning(f"⚠️ AutoMod no pudo silenciar a {message.author.id} en {message.guild.id}: {e}")
+                escalated = False
+            if escalated:
+                await moderation.record_action(
+                    message.guild, "mute", i18n.t("moderation.auto_mute_title", locale), message.author, bot.user, mute_reason
+                )
+        
+        logger.info(f"🛡️ AutoMod ({violation}) en {message.guild.id}: {message.author.id}")
+        if startup.is_ready("search_index"):
+            await asyncio.to_thread(
+                search_index.index_mod_action, message.guild.id, "automod", str(message.author),
+                message.author.id, bot.user.id, f"{reason} — {message.content[:500]}"
+            )
+        notice = i18n.t("automod.notice", locale, user=message.author.mention, reason=reason)
+        outbound.send(message.channel, embed=Embeds.warning(i18n.t("automod.title", locale), notice), delete_after=10)
+        outbound.mod_log(message.guild, Embeds.warning(
+            i18n.t("automod.log_title", locale, reason=reason),
+            i18n.t(
+                "automod.log", locale, user=message.author.mention, user_id=message.author.id,
+                channel=message.channel.mention, content=discord.utils.escape_markdown(message.content[:500]) or "—"
+            )
+        ))
+    
+    def record_join(self, member: discord.Member) -> bool:
+        """Cuenta entradas por servidor; devuelve True si se activa el modo anti-raid"""
+        settings = guild_configs.get(member.guild.id).get("automod", {})
+        if not settings.get("enabled") or not settings.get("anti_raid"):
+            return False
+        
+        now = time.time()
+        joins = self.join_counters[member.guild.id]
+        joins.append(now)
+        if len(joins) < joins.maxlen or now - joins[0] > BotConfig.AUTOMOD["raid_window"]:
+            return False
+        
+        started = self.raid_until.get(member.guild.id, 0) < now
+        self.raid_until[member.guild.id] = now + BotConfig.AUTOMOD["raid_duration"]
+        return started
+    
+    def in_raid_mode(self, guild_id: int) -> bool:
+        return self.raid_until.get(guild_id, 0) > time.time()
+    
+    async def quarantine(self, member: discord.Member) -> bool:
+        """Modo anti-raid: quien entra mientras está activo queda silenciado hasta que termine"""
+        remaining = self.raid_until.get(member.guild.id, 0) - time.time()
+        if member.bot or remaining <= 0:
+            return False
+        try:
+            await moderation.mute(
+                member.guild, member.id, bot.user.id,
+                i18n.text(member.guild, "automod.raid_quarantine"), max(1, math.ceil(remaining / 60)), paced=True
+            )
+        except discord.HTTPException as e:
+            logger.warning(f"⚠️ No se pudo aislar a {member.id} durante el raid en {member.guild.id}: {e}")
+            return False
+        return True
+
+automod = AutoModSystem()
+guild_configs.subscribe(automod.invalidate)
+
+# =============================================
+# ROLES POR REACCIÓN, AUTOMÁTICOS Y POR NIVEL
+# =============================================
+
+class RoleEngine:
+    """Roles por reacción, al entrar y por nivel, aplicados desde una cola compartida
+    
+    Las reacciones se resuelven con un índice (mensaje, emoji) -> rol en memoria, sin
+    pedir el mensaje a Discord. Los cambios se agrupan por servidor: una petición nueva
+    sobre el mismo (usuario, rol) reemplaza a la pendiente, y las llamadas salen a ritmo
+    fijo turnándose entre servidores, así un raid o una subida masiva no satura la API.
+    """
+    
+    def __init__(self, rate: int):
+        self.rate = max(1, rate)
+        self.index = {}
+        self.pending = {}
+        self.ready = deque()
+        self.stats = Counter()
+    
+    @staticmethod
+    def emoji_key(emoji) -> str:
+        """ID para emojis personalizados, el carácter para los unicode"""
+        if isinstance(emoji, str):
+            emoji = discord.PartialEmoji.from_str(emoji.strip())
+        return str(emoji.id) if emoji.id else emoji.name
+    
+    def get_bindings(self) -> dict:
+        return db.data.setdefault("reaction_roles", {})
+    
+    def load_index(self) -> int:
+        self.index = {
+            (int(message_id), key): binding["role_id"]
+            for message_id, entry in self.get_bindings().items() if isinstance(entry, dict)
+            for key, binding in entry.get("roles", {}).items()
+        }
+        return len(self.index)
+    
+    def lookup(self, message_id: int, emoji) -> Optional[int]:
+        return self.index.get((message_id, self.emoji_key(emoji)))
+    
+    def bind(self, guild_id: int, channel_id: int, message_id: int, emoji: str, role_id: int):
+        key = self.emoji_key(emoji)
+        entry = self.get_bindings().setdefault(
+            str(message_id), {"guild_id": guild_id, "channel_id": channel_id, "roles": {}}
+        )
+        entry["roles"][key] = {"role_id": role_id, "emoji": emoji.strip()}
+        self.index[(message_id, key)] = role_id
+        db.dirty = True
+    
+    def unbind(self, message_id: int, emoji: str = None) -> int:
+        """Quita un emoji del mensaje, o todos si no se indica; devuelve cuántos se quitaron"""
+        bindings = self.get_bindings()
+        entry = bindings.get(str(message_id))
+        if not entry:
+            return 0
+        keys = [self.emoji_key(emoji)] if emoji else list(entry["roles"])
+        removed = 0
+        for key in keys:
+            if entry["roles"].pop(key, None):
+                self.index.pop((message_id, key), None)
+                removed += 1
+        if not entry["roles"]:
+            del bindings[str(message_id)]
+        if removed:
+            db.dirty = True
+        return removed
+    
+    def enqueue(self, guild_id: int, user_id: int, role_id: int, add: bool = True, reason: str = None):
+        pending = self.pending.get(guild_id)
+        if pending is None:
+            pending = self.pending[guild_id] = {}
+            self.ready.append(guild_id)
+        if (user_id, role_id) in pending:
+            self.stats["coalesced"] += 1
+        pending[(user_id, role_id)] = (add, reason)
+        self.stats["queued"] += 1
+    
+    async def process(self, budget: int) -> int:
+        """Aplica hasta `budget` cambios, uno por servidor en cada vuelta"""
+        done = 0
+        while self.ready and done < budget:
+            guild_id = self.ready.popleft()
+            pending = self.pending[guild_id]
+            (user_id, role_id), (add, reason) = next(iter(pending.items()))
+            del pending[(user_id, role_id)]
+            if pending:
+                self.ready.append(guild_id)
+            else:
+                del self.pending[guild_id]
+            await self.apply(guild_id, user_id, role_id, add, reason)
+            done += 1
+        return done
+    
+    async def apply(self, guild_id: int, user_id: int, role_id: int, add: bool, reason: str):
+        try:
+            if add:
+                await bot.http.add_role(guild_id, user_id, role_id, reason=reason)
+                db.data["statistics"]["roles_assigned"] = db.data["statistics"].get("roles_assigned", 0) + 1
+            else:
+                await bot.http.remove_role(guild_id, user_id, role_id, reason=reason)
+            self.stats["added" if add else "removed"] += 1
+        except (discord.Forbidden, discord.NotFound) as e:
+            self.stats["failed"] += 1
+            logger.warning(f"⚠️ Rol {role_id} {'no asignado a' if add else 'no retirado de'} {user_id} en {guild_id}: {e.text or e}")
+        except discord.HTTPException as e:
+            self.stats["failed"] += 1
+            logger.error(f"Error aplicando rol {role_id} a {user_id} en {guild_id}: {e}")
+    
+    def on_member_join(self, member: discord.Member) -> int:
+        """Encola los roles automáticos del servidor (y los globales antiguos que existan en él)"""
+        if member.bot:
+            return 0
+        role_ids = list(guild_configs.get(member.guild.id).get("roles", {}).get("auto_roles", ()))
+        role_ids += db.data.get("auto_roles", {}).get("on_join", [])
+        queued = 0
+        for role_id in dict.fromkeys(int(r) for r in role_ids):
+            if member.guild.get_role(role_id):
+                self.enqueue(member.guild.id, member.id, role_id, reason="Rol automático al entrar")
+                queued += 1
+        return queued
+    
+    def on_level_up(self, member: discord.Member, level: int) -> int:
+        """Gancho del sistema de niveles: encola los roles alcanzados que le falten"""
+        level_roles = guild_configs.get(member.guild.id).get("roles", {}).get("level_roles", {})
+        queued = 0
+        for required, role_id in level_roles.items():
+            if int(required) <= level and not member.get_role(role_id) and member.guild.get_role(role_id):
+                self.enqueue(member.guild.id, member.id, role_id, reason=f"Rol de nivel {required}")
+                queued += 1
+        return queued
+    
+    def toggle_auto_role(self, guild_id: int, role_id: int) -> bool:
+        """Activa o quita un rol automático; devuelve True si quedó activo"""
+        auto_roles = list(guild_configs.get(guild_id).get("roles", {}).get("auto_roles", ()))
+        enabled = role_id not in auto_roles
+        if enabled:
+            auto_roles.append(role_id)
+        else:
+            auto_roles.remove(role_id)
+        guild_configs.update(guild_id, {"roles": {"auto_roles": auto_roles}})
+        return enabled
+    
+    def set_level_role(self, guild_id: int, level: int, role_id: Optional[int]):
+        # update() solo fusiona claves, así que quitar un nivel edita la configuración guardada
+        level_roles = db.get_guild_config(guild_id).setdefault("roles", {}).setdefault("level_roles", {})
+        if role_id:
+            level_roles[str(level)] = role_id
+        else:
+            level_roles.pop(str(level), None)
+        db.dirty = True
+        guild_configs.changed(str(guild_id))
+    
+    def snapshot(self) -> dict:
+        return {
+            "bindings": len(self.index),
+            "pending": sum(len(p) for p in self.pending.values()),
+            "guilds_waiting": len(self.pending),
+            **self.stats
+        }
+
+role_engine = RoleEngine(BotConfig.ROLE_QUEUE_RATE)
+
+class RoleCommands(commands.GroupCog, name="roles"):
+    """Configuración de roles por reacción, automáticos y por nivel"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @staticmethod
+    def check_role(interaction: discord.Interaction, role: discord.Role) -> Optional[str]:
+        if role.is_default() or role.managed:
+            return i18n.text(interaction.guild, "roles.errors.unassignable")
+        if role >= interaction.guild.me.top_role:
+            return i18n.text(interaction.guild, "roles.errors.above_bot")
+        # Como en check_target: sin esto, manage_roles bastaría para repartir roles superiores al propio
+        if interaction.user.id != interaction.guild.owner_id and role >= interaction.user.top_role:
+            return i18n.text(interaction.guild, "roles.errors.above_user")
+        return None
+    
+    @app_commands.command(name="reaccion", description="Da un rol al reaccionar a un mensaje")
+    @app_commands.describe(mensaje_id="ID del mensaje", emoji="Emoji de la reacción", rol="Rol a dar", canal="Canal del mensaje (por defecto este)")
+    @app_commands.default_permissions(manage_roles=True)
+    @app_commands.guild_only()
+    async def roles_reaction(self, interaction: discord.Interaction, mensaje_id: str, emoji: str, rol: discord.Role, canal: discord.TextChannel = None):
+        """Vincula emoji y rol en un mensaje"""
+        locale = i18n.locale_for(interaction.guild.id)
+        error = self.check_role(interaction, rol) or (None if mensaje_id.isdigit() else i18n.t("roles.errors.message_id", locale))
+        if error:
+            await interaction.response.send_message(embed=Embeds.error(i18n.t("roles.cannot_bind", locale), error), ephemeral=True)
+            return
+        
+        channel = canal or interaction.channel
+        try:
+            message = await channel.fetch_message(int(mensaje_id))
+            await message.add_reaction(emoji.strip())
+        except discord.NotFound:
+            await interaction.response.send_message(
+                embed=Embeds.error(
+                    i18n.t("roles.message_not_found_title", locale), i18n.t("roles.message_not_found", locale, channel=channel.mention)
+                ),
+                ephemeral=True
+            )
+            return
+        except discord.HTTPException:
+            await interaction.response.send_message(
+                embed=Embeds.error(i18n.t("roles.bad_emoji_title", locale), i18n.t("roles.bad_emoji", locale)), ephemeral=True
+            )
+            return
+        
+        role_engine.bind(interaction.guild.id, channel.id, message.id, emoji, rol.id)
+        await interaction.response.send_message(
+            embed=Embeds.success(
+                i18n.t("roles.reaction_title", locale),
+                i18n.t("roles.reaction", locale, emoji=emoji.strip(), role=rol.mention, url=message.jump_url)
+            ),
+            ephemeral=True
+        )
+    
+    @app_commands.command(name="quitar-reaccion", description="Quita un rol por reacción de un mensaje")
+    @app_commands.describe(mensaje_id="ID del mensaje", emoji="Emoji a quitar (vacío: todos)")
+    @app_commands.default_permissions(manage_roles=True)
+    @app_commands.guild_only()
+    async def roles_unreaction(self, interaction: discord.Interaction, mensaje_id: str, emoji: str = None):
+        """Elimina vínculos de un mensaje"""
+        entry = role_engine.get_bindings().get(mensaje_id)
+        removed = role_engine.unbind(int(mensaje_id), emoji) if entry and entry["guild_id"] == interaction.guild.id else 0
+        locale = i18n.locale_for(interaction.guild.id)
+        if not removed:
+            await interaction.response.send_message(
+                embed=Embeds.warning(i18n.t("roles.unchanged_title", locale), i18n.t("roles.unchanged", locale)), ephemeral=True
+            )
+            return
+        await interaction.response.send_message(
+            embed=Embeds.success(i18n.t("roles.unbound_title", locale), i18n.t("roles.unbound", locale, count=removed)), ephemeral=True
+        )
+    
+    @app_commands.command(name="auto", description="Activa o quita un rol automático para nuevos miembros")
+    @app_commands.default_permissions(manage_roles=True)
+    @app_commands.guild_only()
+    async def roles_auto(self, interaction: discord.Interaction, rol: discord.Role):
+        """Alterna un rol automático"""
+        locale = i18n.locale_for(interaction.guild.id)
+        error = self.check_role(interaction, rol)
+        if error:
+            await interaction.response.send_message(embed=Embeds.error(i18n.t("roles.cannot_use", locale), error), ephemeral=True)
+            return
+        enabled = role_engine.toggle_auto_role(interaction.guild.id, rol.id)
+        description = i18n.t("roles.auto_on" if enabled else "roles.auto_off", locale, role=rol.mention)
+        await interaction.response.send_message(embed=Embeds.success(i18n.t("roles.auto_title", locale), description), ephemeral=True)
+    
+    @app_commands.command(name="nivel", description="Asigna un rol al alcanzar un nivel (sin rol: lo quita)")
+    @app_commands.default_permissions(manage_roles=True)
+    @app_commands.guild_only()
+    async def roles_level(self, interaction: discord.Interaction, nivel: app_commands.Range[int, 1, 1000], rol: discord.Role = None):
+        """Configura un rol de nivel"""
+        locale = i18n.locale_for(interaction.guild.id)
+        error = self.check_role(interaction, rol) if rol else None
+        if error:
+            await interaction.response.send_message(embed=Embeds.error(i18n.t("roles.cannot_use", locale), error), ephemeral=True)
+            return
+        role_engine.set_level_role(interaction.guild.id, nivel, rol.id if rol else None)
+        if rol:
+            description = i18n.t("roles.level", locale, level=nivel, role=rol.mention)
+        else:
+            description = i18n.t("roles.level_cleared", locale, level=nivel)
+        await interaction.response.send_message(embed=Embeds.success(i18n.t("roles.level_title", locale), description), ephemeral=True)
+    
+    @app_commands.command(name="sincronizar", description="Encola los roles de nivel que les falten a los miembros")
+    @app_commands.default_permissions(manage_roles=True)
+    @app_commands.guild_only()
+    async def roles_sync(self, interaction: discord.Interaction):
+        """Aplica los roles de nivel según los niveles guardados"""
+        guild = interaction.guild
+        locale = i18n.locale_for(guild.id)
+        if not guild.chunked:
+            if not self.bot.intents.members:
+                # Perfil lean: sin intent de miembros la lista está vacía y no se puede pedir
+                await interaction.response.send_message(
+                    embed=Embeds.warning(i18n.t("roles.sync_unavailable_title", locale), i18n.t("roles.sync_unavailable", locale)),
+                    ephemeral=True
+                )
+                return
+            await interaction.response.defer(ephemeral=True)
+            await guild.chunk()
+        
+        users = db.data["users"]
+        queued = 0
+        for member in guild.members:
+            profile = users.get(f"{guild.id}_{member.id}")
+            if profile and not member.bot:
+                queued += role_engine.on_level_up(member, profile.get("leveling", {}).get("level", 1))
+        embed = Embeds.success(
+            i18n.t("roles.sync_title", locale), i18n.t("roles.sync", locale, count=f"{queued:,}", rate=role_engine.rate)
+        )
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="lista", description="Muestra la configuración de roles del servidor")
+    @app_commands.default_permissions(manage_roles=True)
+    @app_commands.guild_only()
+    async def roles_list(self, interaction: discord.Interaction):
+        """Resumen de roles configurados"""
+        guild = interaction.guild
+        locale = i18n.locale_for(guild.id)
+        roles = guild_configs.get(guild.id).get("roles", {})
+        reaction_lines = [
+            f"[{message_id}](https://discord.com/channels/{guild.id}/{entry['channel_id']}/{message_id}): "
+            + " ".join(f"{binding['emoji']} <@&{binding['role_id']}>" for binding in entry["roles"].values())
+            for message_id, entry in role_engine.get_bindings().items()
+            if isinstance(entry, dict) and entry.get("guild_id") == guild.id
+        ]
+        level_lines = [
+            i18n.t("roles.level", locale, level=level, role=f"<@&{role_id}>")
+            for level, role_id in sorted(roles.get("level_roles", {}).items(), key=lambda item: int(item[0]))
+        ]
+        queue = role_engine.snapshot()
+        none = i18n.t("roles.none", locale)
+        
+        embed = Embeds.info(i18n.t("roles.list_title", locale), i18n.t("roles.list_queue", locale, pending=f"{queue['pending']:,}"))
+        embed.add_field(name=i18n.t("roles.list_reaction", locale), value="\n".join(reaction_lines)[:1024] or none, inline=False)
+        embed.add_field(name=i18n.t("roles.list_auto", locale), value=" ".join(f"<@&{r}>" for r in roles.get("auto_roles", ())) or none, inline=False)
+        embed.add_field(name=i18n.t("roles.list_level", locale), value="\n".join(level_lines)[:1024] or none, inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+# =============================================
+# ADVERTENCIAS, SILENCIOS Y VENCIMIENTOS
+# =============================================
+
+class ModerationStore:
+    """Advertencias y silencios por servidor con un único programador de vencimientos
+
+    Los registros viven en db.data["warns"][servidor][usuario] (lista) y
+    db.data["mutes"][servidor][usuario]. Toda sanción con fecha de fin entra en un
+    montículo (vence, tipo, servidor, usuario, id) que una sola tarea revisa cada
+    segundo: no hay una espera por sanción. Quitar o renovar una sanción no toca el
+    montículo; al vencer se comprueba que el registro siga existiendo con el mismo id.
+    Al arrancar el montículo se reconstruye desde el almacén.
+    """
+
+    MAX_TIMEOUT = 28 * 24 * 3600 - 60  # límite de Discord para los aislamientos (28 días)
+    BULK_DELETE_AGE = 14 * 24 * 3600   # Discord no borra en bloque mensajes más antiguos
+    BULK_CHUNK = 100
+
+    def __init__(self):
+        self.heap = []
+        self.stats = Counter()
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{time.time_ns() // 1000:x}"
+
+    @staticmethod
+    def section(name: str, guild_id: int) -> dict:
+        return db.data.setdefault(name, {}).setdefault(str(guild_id), {})
+
+    def schedule(self, kind: str, guild_id: int, user_id: int, record: dict):
+        if record.get("expires_at"):
+            heapq.heappush(self.heap, (record["expires_at"], kind, guild_id, user_id, record["id"]))
+
+    def load(self) -> int:
+        """Reconstruye el montículo desde el almacén; lo vencido con el bot apagado sale en el primer ciclo"""
+        heap = []
+        for kind, name in (("warn", "warns"), ("mute", "mutes")):
+            for guild_key, users in db.data.get(name, {}).items():
+                for user_key, value in users.items():
+                    for record in (value if kind == "warn" else [value]):
+                        if isinstance(record, dict) and record.get("expires_at") and record.get("id"):
+                            heap.append((record["expires_at"], kind, int(guild_key), int(user_key), record["id"]))
+        heapq.heapify(heap)
+        self.heap = heap
+        return len(heap)
+
+    # ----- Advertencias -----
+
+    def get_warns(self, guild_id: int, user_id: int) -> list:
+        now = time.time()
+        return [
+            warn for warn in self.section("warns", guild_id).get(str(user_id), [])
+            if not warn.get("expires_at") or warn["expires_at"] > now
+        ]
+
+    def add_warn(self, guild_id: int, user_id: int, moderator_id: int, reason: str) -> int:
+        """Guarda la advertencia; devuelve cuántas activas tiene el usuario"""
+        days = guild_configs.get(guild_id).get("automod", {}).get("warn_expiry_days")
+        record = {
+            "id": self.new_id(),
+            "moderator_id": moderator_id,
+            "reason": reason,
+            "created_at": datetime.datetime.now().isoformat(),
+            "expires_at": time.time() + days * 86400 if days else None
+        }
+        self.section("warns", guild_id).setdefault(str(user_id), []).append(record)
+        self.schedule("warn", guild_id, user_id, record)
+        db.data["statistics"]["warns_issued"] += 1
+        db.dirty = True
+        return len(self.get_warns(guild_id, user_id))
+
+    @staticmethod
+    def warn_limit(guild_id: int) -> tuple:
+        """(max_warns, minutos del silencio automático); 0 desactiva el silencio automático"""
+        settings = guild_configs.get(guild_id).get("automod", {})
+        defaults = db.get_default_guild_config()["automod"]
+        return (
+            settings.get("max_warns", defaults["max_warns"]) or 0,
+            settings.get("warn_mute_minutes", defaults["warn_mute_minutes"]) or 60
+        )
+
+    def clear_warns(self, guild_id: int, user_id: int) -> int:
+        removed = self.section("warns", guild_id).pop(str(user_id), [])
+        db.dirty = True
+        return len(removed)
+
+    def expire_warn(self, guild_id: int, user_id: int, warn_id: str) -> bool:
+        users = self.section("warns", guild_id)
+        warns = users.get(str(user_id), [])
+        remaining = [warn for warn in warns if warn.get("id") != warn_id]
+        if len(remaining) == len(warns):
+            return False
+        if remaining:
+            users[str(user_id)] = remaining
+        else:
+            users.pop(str(user_id))
+        self.stats["warns_expired"] += 1
+        db.dirty = True
+        return True
+
+    # ----- Silencios -----
+
+    def get_mute(self, guild_id: int, user_id: int) -> Optional[dict]:
+        return self.section("mutes", guild_id).get(str(user_id))
+
+    async def mute(self, guild: discord.Guild, user_id: int, moderator_id: int, reason: str,
+                   minutes: int = None, paced: bool = False) -> dict:
+        """Silencia con el rol configurado (roles.muted) o, si no hay, con un aislamiento de Discord
+
+        El rol se da en el momento (un fallo lanza HTTPException); con paced=True va por la
+        cola de roles, para ráfagas como un raid.
+        """
+        role_id = guild_configs.get(guild.id).get("roles", {}).get("muted")
+        now = time.time()
+        if role_id and guild.get_role(role_id):
+            method, duration = "role", minutes * 60 if minutes else None
+            if paced:
+                role_engine.enqueue(guild.id, user_id, role_id, reason=f"Silencio: {reason}")
+            else:
+                await bot.http.add_role(guild.id, user_id, role_id, reason=f"Silencio: {reason}")
+        else:
+            method, duration = "timeout", min(minutes * 60 if minutes else self.MAX_TIMEOUT, self.MAX_TIMEOUT)
+            until = datetime.datetime.fromtimestamp(now + duration, datetime.timezone.utc)
+            await bot.http.edit_member(guild.id, user_id, reason=reason, communication_disabled_until=until.isoformat())
+
+        record = {
+            "id": self.new_id(),
+            "moderator_id": moderator_id,
+            "reason": reason,
+            "method": method,
+            "role_id": role_id if method == "role" else None,
+            "created_at": datetime.datetime.now().isoformat(),
+            "expires_at": now + duration if duration else None
+        }
+        self.section("mutes", guild.id)[str(user_id)] = record
+        self.schedule("mute", guild.id, user_id, record)
+        self.stats["mutes"] += 1
+        db.dirty = True
+        return record
+
+    async def unmute(self, guild_id: int, user_id: int, reason: str) -> Optional[dict]:
+        """Quita el silencio; un aislamiento ya vencido no necesita llamada a la API"""
+        record = self.section("mutes", guild_id).pop(str(user_id), None)
+        if record is None:
+            return None
+        db.dirty = True
+        if record.get("method") == "role":
+            role_engine.enqueue(guild_id, user_id, record["role_id"], add=False, reason=reason)
+        elif not record.get("expires_at") or record["expires_at"] > time.time():
+            try:
+                await bot.http.edit_member(guild_id, user_id, reason=reason, communication_disabled_until=None)
+            except (discord.Forbidden, discord.NotFound) as e:
+                logger.warning(f"⚠️ No se pudo quitar el aislamiento de {user_id} en {guild_id}: {e.text or e}")
+        self.stats["unmutes"] += 1
+        return record
+
+    def on_member_join(self, member: discord.Member) -> bool:
+        """Salir y volver a entrar no quita un silencio por rol"""
+        record = self.get_mute(member.guild.id, member.id)
+        if not record or record.get("method") != "role":
+            return False
+        if record.get("expires_at") and record["expires_at"] <= time.time():
+            return False
+        role_engine.enqueue(member.guild.id, member.id, record["role_id"], reason="Silencio activo al volver a entrar")
+        return True
+
+    # ----- Vencimientos -----
+
+    async def expire_due(self, now: float = None) -> int:
+        """Saca del montículo lo vencido; las entradas obsoletas se descartan sin más"""
+        now = now or time.time()
+        expired = 0
+        while self.heap and self.heap[0][0] <= now:
+            _, kind, guild_id, user_id, record_id = heapq.heappop(self.heap)
+            if kind == "warn":
+                expired += self.expire_warn(guild_id, user_id, record_id)
+                continue
+            record = self.get_mute(guild_id, user_id)
+            if not record or record.get("id") != record_id:
+                continue
+            await self.unmute(guild_id, user_id, "Silencio vencido")
+            expired += 1
+            guild = bot.get_guild(guild_id)
+            if guild:
+                outbound.mod_log(guild, Embeds.info(
+                    i18n.text(guild, "moderation.expired_title"),
+                    i18n.text(guild, "moderation.expired", user=f"<@{user_id}>", reason=record.get('reason') or '—')
+                ))
+        return expired
+
+    # ----- Limpieza de mensajes -----
+
+    async def bulk_clear(self, channel: discord.TextChannel, amount: int, user: discord.abc.User = None, reason: str = None):
+        """Borra con el endpoint de borrado masivo en bloques de 100; devuelve (borrados, demasiado antiguos)"""
+        cutoff = discord.utils.utcnow() - datetime.timedelta(seconds=self.BULK_DELETE_AGE - 60)
+        selected, too_old = [], False
+        async for message in channel.history(limit=amount if user is None else min(amount * 10, 1000)):
+            if message.created_at < cutoff:
+                too_old = True
+                break
+            if user is None or message.author.id == user.id:
+                selected.append(message)
+                if len(selected) >= amount:
+                    break
+
+        for start in range(0, len(selected), self.BULK_CHUNK):
+            await channel.delete_messages(selected[start:start + self.BULK_CHUNK], reason=reason)
+        self.stats["messages_cleared"] += len(selected)
+        return len(selected), too_old
+
+    async def record_action(self, guild: discord.Guild, action: str, title: str, target: Optional[discord.abc.User],
+                            moderator: discord.abc.User, reason: str):
+        """Estadística, índice de búsqueda y mod-log de una acción manual (target None: sin usuario concreto)"""
+        db.data["statistics"]["mod_actions"] += 1
+        logger.info(f"🛡️ {action} en {guild.id}: {target.id if target else '-'} por {moderator.id}")
+        if startup.is_ready("search_index"):
+            await asyncio.to_thread(
+                search_index.index_mod_action, guild.id, action, str(target or moderator),
+                (target or moderator).id, moderator.id, reason
+            )
+        locale = i18n.locale_for(guild.id)
+        lines = [i18n.t("moderation.log_user", locale, user=target.mention, user_id=target.id)] if target else []
+        lines += [
+            i18n.t("moderation.log_moderator", locale, moderator=moderator.mention),
+            i18n.t("moderation.log_reason", locale, reason=reason)
+        ]
+        outbound.mod_log(guild, Embeds.warning(title, "\n".join(lines)))
+
+    def snapshot(self) -> dict:
+        return {
+            "scheduled": len(self.heap),
+            "next_expiry_in": round(max(0.0, self.heap[0][0] - time.time()), 1) if self.heap else None,
+            **self.stats
+        }
+
+moderation = ModerationStore()
+
+# =============================================
+# CONTADORES GLOBALES Y PRESENCIA
+# =============================================
+
+class GlobalCounters:
+    """Totales de servidores y miembros mantenidos por eventos, sin recorrer bot.guilds
+
+    rebuild() hace el recuento completo una vez por sesión (on_ready); después cada
+    entrada o salida de servidor/miembro ajusta los totales en O(1). Sin el intent
+    members (perfil lean) Discord no envía altas/bajas ni actualiza member_count fuera
+    de GUILD_CREATE, así que el total de miembros se oculta en vez de mostrarlo desfasado.
+    """
+
+    GUILDS_SLOT = 1  # posición de la actividad que muestra el número de servidores
+
+    def __init__(self, tracks_members: bool = True):
+        self.tracks_members = tracks_members
+        self.members = {}
+        self.total_members = 0
+        self.activities = []
+        self.presence_guilds = None
+        self.current_activity = None
+
+    @property
+    def guilds(self) -> int:
+        return len(self.members)
+
+    def rebuild(self, guilds) -> dict:
+        self.members = {guild.id: guild.member_count or 0 for guild in guilds}
+        self.total_members = sum(self.members.values())
+        return self.snapshot()
+
+    def guild_join(self, guild: discord.Guild):
+        """Servidor nuevo o que vuelve a estar disponible (reemplaza su recuento, idempotente)"""
+        count = guild.member_count or 0
+        self.total_members += count - self.members.get(guild.id, 0)
+        self.members[guild.id] = count
+
+    def guild_remove(self, guild_id: int):
+        self.total_members -= self.members.pop(guild_id, 0)
+
+    def member_delta(self, guild_id: int, delta: int):
+        if guild_id in self.members:
+            self.members[guild_id] += delta
+            self.total_members += delta
+
+    def guilds_activity(self) -> discord.Activity:
+        self.presence_guilds = self.guilds
+        return discord.Activity(type=discord.ActivityType.watching, name=f"{self.presence_guilds} servidores")
+
+    def build_activities(self) -> list:
+        """Rotación de Rich Presence; se construye una sola vez"""
+        return [
+            discord.Activity(type=discord.ActivityType.playing, name=f"MC: {BotConfig.MINECRAFT_IP}"),
+            self.guilds_activity(),
+            discord.Activity(type=discord.ActivityType.listening, name="/hc commands"),
+            discord.Activity(type=discord.ActivityType.playing, name="with ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 Systems"),
+            discord.Activity(type=discord.ActivityType.watching, name="AI Intelligence"),
+            discord.Activity(type=discord.ActivityType.competing, name="Minecraft Adventures"),
+            discord.Activity(type=discord.ActivityType.streaming, name="Live: honducraft.com", url="https://twitch.tv/honducraft")
+        ]
+
+    def next_activity(self) -> Optional[discord.Activity]:
+        """Actividad al azar de la rotación; None si coincide con la actual (no hace falta enviarla)"""
+        if not self.activities:
+            self.activities = self.build_activities()
+        elif self.presence_guilds != self.guilds:
+            self.activities[self.GUILDS_SLOT] = self.guilds_activity()
+
+        activity = random.choice(self.activities)
+        if activity is self.current_activity:
+            return None
+        self.current_activity = activity
+        return activity
+
+    def snapshot(self) -> dict:
+        return {"guilds": self.guilds, "members": self.total_members if self.tracks_members else None}
+
+    def members_label(self) -> str:
+        return f"{self.total_members:,}" if self.tracks_members else "—"
+
+counters = GlobalCounters(tracks_members=runtime_profile["intents"].members)
+
+# =============================================
+# COMANDOS SLASH (/) - SISTEMA /hc
+# =============================================
+
+class SlashCommands(commands.Cog):
+    """Comandos slash modernos y profesionales"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="hc", description="Muestra todos los sistemas y comandos de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱")
+    async def hc_command(self, interaction: discord.Interaction):
+        """Comando principal /hc"""
+        embed = Embeds.info(
+            i18n.text(interaction.guild, "help.title"),
+            i18n.text(interaction.guild, "help.body", ip=BotConfig.MINECRAFT_IP)
+        )
+        await interaction.response.send_message(embed=embed)
+    
+    @app_commands.command(name="ai", description="Chat con la IA avanzada de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱")
+    @app_commands.describe(pregunta="Tu pregunta o mensaje para la IA")
+    @rate_limited("ai")
+    async def ai_chat(self, interaction: discord.Interaction, pregunta: str):
+        """Chat con IA"""
+        await interaction.response.defer()
+        
+        # Generar respuesta fuera del event loop
+        locale = i18n.locale_for(interaction.guild_id)
+        respuesta = await SimpleAI.generate_response(pregunta, locale=locale)
+        
+        # Actualizar estadísticas
+        db.data["statistics"]["ai_interactions"] += 1
+        user_data = db.get_user_data(interaction.user.id, interaction.guild.id)
+        user_data["stats"]["ai_uses"] += 1
+        db.update_user_data(interaction.user.id, interaction.guild.id, user_data)
+        
+        embed = Embeds.info(
+            i18n.t("ai.title", locale),
+            i18n.t("ai.body", locale, question=pregunta, answer=respuesta)
+        )
+        await interaction.followup.send(embed=embed)
+    
+    @app_commands.command(name="search", description="Buscar información en internet")
+    @app_commands.describe(busqueda="Lo que quieres buscar", resultados="Número de resultados (1-5)")
+    @rate_limited("search")
+    async def web_search(self, interaction: discord.Interaction, busqueda: str, resultados: int = 3):
+        """Búsqueda web"""
+        await interaction.response.defer()
+        
+        if resultados > 5:
+            resultados = 5
+        elif resultados < 1:
             resultados = 1
         
-        # Realizar búsqueda
+        # Realizar búsqueda fuera del event loop
         results = await WebSearch.search_google(busqueda, resultados)
         
         # Actualizar estadísticas
@@ -808,15 +3371,16 @@ class SlashCommands(commands.Cog):
         user_data["stats"]["searches"] += 1
         db.update_user_data(interaction.user.id, interaction.guild.id, user_data)
         
-        description = f"**🔍 Resultados para: `{busqueda}`**\n\n"
+        locale = i18n.locale_for(interaction.guild_id)
+        description = i18n.t("search.header", locale, query=busqueda) + "\n\n"
         
         for i, result in enumerate(results, 1):
             description += f"**{i}. [{result['title']}]({result['url']})**\n"
             description += f"{result['description']}\n\n"
         
-        description += "*💫 Búsqueda realizada por ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 Search System*"
+        description += i18n.t("search.footer", locale)
         
-        embed = Embeds.info("🔍 Sistema de Búsqueda ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱", description)
+        embed = Embeds.info(i18n.t("search.title", locale), description)
         await interaction.followup.send(embed=embed)
     
     @app_commands.command(name="mcstatus", description="Estado del servidor Minecraft ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱")
@@ -825,7 +3389,7 @@ class SlashCommands(commands.Cog):
         await interaction.response.defer()
         
         status = await MinecraftSystem.get_server_status()
-        embed = await MinecraftSystem.create_status_embed(BotConfig.MINECRAFT_IP, status)
+        embed = await MinecraftSystem.create_status_embed(BotConfig.MINECRAFT_IP, status, i18n.locale_for(interaction.guild_id))
         
         await interaction.followup.send(embed=embed)
     
@@ -836,58 +3400,65 @@ class SlashCommands(commands.Cog):
         await interaction.response.defer()
         
         weather = await WebSearch.get_weather(ciudad)
+        locale = i18n.locale_for(interaction.guild_id)
         
         embed = Embeds.info(
-            f"🌤️ Clima en {ciudad.title()}",
-            f"""
-            **🌡️ Temperatura:** `{weather['temp']}°C`
-            **☁️ Condición:** `{weather['condition']}`
-            **💧 Humedad:** `{weather['humidity']}%`
-            
-            **📍 Ciudad:** {ciudad.title()}
-            **🕐 Actualizado:** {datetime.datetime.now().strftime('%H:%M')}
-            
-            *💫 Información meteorológica proporcionada por ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱*
-            """
+            i18n.t("weather.title", locale, city=ciudad.title()),
+            i18n.t(
+                "weather.body", locale, temp=weather['temp'], humidity=weather['humidity'], city=ciudad.title(),
+                condition=i18n.t(f"weather.conditions.{weather['condition']}", locale),
+                time=datetime.datetime.now().strftime('%H:%M')
+            )
         )
         await interaction.followup.send(embed=embed)
     
     @app_commands.command(name="botinfo", description="Información completa del bot ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱")
     async def botinfo_slash(self, interaction: discord.Interaction):
         """Información del bot"""
+        totals = counters.snapshot()
+        stats = db.data['statistics']
         embed = Embeds.info(
-            "💜 ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 - Información del Sistema",
-            f"""
-            **📊 ESTADÍSTICAS GLOBALES:**
-            **• Servidores:** `{len(self.bot.guilds):,}`
-            **• Usuarios:** `{sum(g.member_count for g in self.bot.guilds):,}`
-            **• Comandos usados:** `{db.data['statistics']['commands_used']:,}`
-            **• Interacciones IA:** `{db.data['statistics']['ai_interactions']:,}`
-            **• Búsquedas:** `{db.data['statistics']['searches_performed']:,}`
-
-            **🚀 INFORMACIÓN TÉCNICA:**
-            **• Versión:** `{BotConfig.VERSION}`
-            **• Desarrollador:** `{BotConfig.DEVELOPER}`
-            **• Latencia:** `{round(self.bot.latency * 1000)}ms`
-            **• Uptime:** `{self.get_uptime()}`
-
-            **🎮 SISTEMAS ACTIVOS:**
-            ```
-            ✅ Minecraft Integration
-            ✅ AI Assistant  
-            ✅ Web Search
-            ✅ Level System
-            ✅ Economy System
-            ✅ Moderation Tools
-            ✅ Programming Help
-            ✅ Utility Commands
-            ```
-
-            **📍 SERVIDOR MINECRAFT:**
-            ```{BotConfig.MINECRAFT_IP}```
-
-            **💎 ¡Sistema ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 completamente operativo!**
-            """
+            i18n.text(interaction.guild, "botinfo.title"),
+            i18n.text(
+                interaction.guild, "botinfo.body",
+                guilds=f"{totals['guilds']:,}", members=counters.members_label(),
+                commands=f"{stats['commands_used']:,}", ai=f"{stats['ai_interactions']:,}",
+                searches=f"{stats['searches_performed']:,}", version=BotConfig.VERSION, developer=BotConfig.DEVELOPER,
+                latency=round(self.bot.latency * 1000), uptime=self.get_uptime(), ip=BotConfig.MINECRAFT_IP
+            )
+        )
+        await interaction.response.send_message(embed=embed)
+    
+    @app_commands.command(name="shards", description="Estado y latencia de cada shard")
+    async def shards_slash(self, interaction: discord.Interaction):
+        """Salud de los shards"""
+        locale = i18n.locale_for(interaction.guild_id)
+        lines = []
+        for shard in shard_monitor.snapshot():
+            latency = f"{shard['latency_ms']}ms" if shard['latency_ms'] is not None else "—"
+            lines.append(i18n.t(
+                "shards.line", locale, shard=shard['shard_id'], status=shard['status'], latency=latency,
+                guilds=f"{shard['guilds']:,}", disconnects=shard['disconnects']
+            ))
+        
+        lag = i18n.t(
+            "shards.loop_lag_value", locale,
+            lag=f"{shard_monitor.loop_lag * 1000:.1f}", max=f"{shard_monitor.max_loop_lag * 1000:.1f}"
+        )
+        embed = Embeds.info(
+            i18n.t("shards.title", locale),
+            "\n".join(lines) or i18n.t("shards.empty", locale),
+            fields=[
+                {"name": i18n.t("shards.mode", locale), "value": f"`{shard_settings['mode']}`", "inline": True},
+                {"name": i18n.t("shards.loop_lag", locale), "value": lag, "inline": True},
+                {"name": i18n.t("shards.workers", locale), "value": "\n".join(
+                    i18n.t(
+                        "shards.worker_line", locale, kind=kind, pending=info['pending'],
+                        queue=info['queue_depth'], rejected=info.get('rejected', 0)
+                    )
+                    for kind, info in workers.snapshot().items()
+                ), "inline": False}
+            ]
         )
         await interaction.response.send_message(embed=embed)
     
@@ -913,57 +3484,17 @@ class TraditionalCommands(commands.Cog):
     async def ayuda(self, ctx):
         """Sistema de ayuda tradicional"""
         embed = Embeds.info(
-            "💜 ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 - Comandos Tradicionales (!)",
-            """
-            **🎮 COMANDOS MINECRAFT:**
-            `!mcstatus` - Estado servidor Minecraft
-            `!mcplayers` - Jugadores en línea
-            `!linkmc <usuario>` - Vincular cuenta
-
-            **🤖 COMANDOS IA:**
-            `!ai <pregunta>` - Chat con IA
-            `!ask <pregunta>` - Preguntar anything
-
-            **🔍 COMANDOS BÚSQUEDA:**
-            `!search <texto>` - Buscar en internet
-            `!weather <ciudad>` - Clima de ciudad
-            `!wiki <tema>` - Buscar en Wikipedia
-
-            **🏆 COMANDOS NIVELES:**
-            `!nivel [usuario]` - Ver nivel
-            `!leaderboard` - Tabla clasificación
-            `!rank` - Tarjeta de rango
-
-            **💰 COMANDOS ECONOMÍA:**
-            `!daily` - Recompensa diaria
-            `!work` - Trabajar
-            `!balance [usuario]` - Ver balance
-
-            **📊 COMANDOS INFORMACIÓN:**
-            `!serverinfo` - Info servidor
-            `!userinfo [usuario]` - Info usuario
-            `!botinfo` - Info del bot
-
-            **🛡️ COMANDOS MODERACIÓN:**
-            `!warn <usuario> <razón>` - Advertir
-            `!clear <cantidad>` - Limpiar mensajes
-
-            **💻 COMANDOS PROGRAMACIÓN:**
-            `!code <lenguaje> <código>` - Formatear
-            `!langinfo <lenguaje>` - Info lenguaje
-
-            **📍 IP SERVIDOR MINECRAFT:**
-            ```honducraft.sdlf.fun```
-
-            **💎 Usa `/hc` para ver los comandos slash (/)**
-            """
+            i18n.text(ctx.guild, "help.prefix_title"),
+            i18n.text(ctx.guild, "help.prefix_body", ip=BotConfig.MINECRAFT_IP)
         )
         await ctx.send(embed=embed)
     
     @commands.command(name='ai')
+    @rate_limited("ai")
     async def ai_traditional(self, ctx, *, pregunta: str):
         """IA tradicional"""
-        respuesta = await SimpleAI.generate_response(pregunta)
+        locale = i18n.locale_for(ctx.guild.id)
+        respuesta = await SimpleAI.generate_response(pregunta, locale=locale)
         
         # Actualizar estadísticas
         db.data["statistics"]["ai_interactions"] += 1
@@ -972,18 +3503,13 @@ class TraditionalCommands(commands.Cog):
         db.update_user_data(ctx.author.id, ctx.guild.id, user_data)
         
         embed = Embeds.info(
-            "🤖 ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 IA - Respuesta",
-            f"""
-            **👤 Pregunta de {ctx.author.display_name}:**
-            {pregunta}
-
-            **💜 Respuesta IA:**
-            {respuesta}
-            """
+            i18n.t("ai.prefix_title", locale),
+            i18n.t("ai.prefix_body", locale, author=ctx.author.display_name, question=pregunta, answer=respuesta)
         )
         await ctx.send(embed=embed)
     
     @commands.command(name='search', aliases=['buscar'])
+    @rate_limited("search")
     async def search_traditional(self, ctx, *, busqueda: str):
         """Búsqueda tradicional"""
         results = await WebSearch.search_google(busqueda, 3)
@@ -994,78 +3520,964 @@ class TraditionalCommands(commands.Cog):
         user_data["stats"]["searches"] += 1
         db.update_user_data(ctx.author.id, ctx.guild.id, user_data)
         
-        description = f"**🔍 Resultados para: `{busqueda}`**\n\n"
+        locale = i18n.locale_for(ctx.guild.id)
+        description = i18n.t("search.header", locale, query=busqueda) + "\n\n"
         
         for i, result in enumerate(results, 1):
             description += f"**{i}. {result['title']}**\n"
             description += f"{result['description']}\n"
             description += f"*<{result['url']}>*\n\n"
         
-        embed = Embeds.info("🔍 Búsqueda ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱", description)
+        embed = Embeds.info(i18n.t("search.prefix_title", locale), description)
         await ctx.send(embed=embed)
     
     @commands.command(name='mcstatus')
     async def mcstatus_traditional(self, ctx):
         """Estado Minecraft tradicional"""
         status = await MinecraftSystem.get_server_status()
-        embed = await MinecraftSystem.create_status_embed(BotConfig.MINECRAFT_IP, status)
+        embed = await MinecraftSystem.create_status_embed(BotConfig.MINECRAFT_IP, status, i18n.locale_for(ctx.guild.id if ctx.guild else None))
         await ctx.send(embed=embed)
     
+    @commands.command(name='sync')
+    @commands.is_owner()
+    async def sync_traditional(self, ctx, modo: str = ""):
+        """Sincroniza los comandos slash (usa `!sync force` para forzar)"""
+        results = await command_sync.sync(force=modo.lower() == "force")
+        locale = i18n.locale_for(ctx.guild.id if ctx.guild else None)
+        if results:
+            detail = "\n".join(i18n.t("sync.line", locale, key=key, count=count) for key, count in results.items())
+            await ctx.send(embed=Embeds.success(i18n.t("sync.title", locale), detail))
+        else:
+            await ctx.send(embed=Embeds.info(i18n.t("sync.unchanged_title", locale), i18n.t("sync.unchanged", locale)))
+    
     @commands.command(name='botinfo')
     async def botinfo_traditional(self, ctx):
         """Info del bot tradicional"""
+        totals = counters.snapshot()
         embed = Embeds.info(
-            "💜 ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 - Sistema Avanzado",
-            f"""
-            **🤖 Bot:** ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 Ultra Pro
-            **🚀 Versión:** {BotConfig.VERSION}
-            **📊 Servidores:** {len(self.bot.guilds):,}
-            **👥 Usuarios:** {sum(g.member_count for g in self.bot.guilds):,}
-            **⚡ Latencia:** {round(self.bot.latency * 1000)}ms
-
-            **🎮 IP Minecraft:**
-            ```{BotConfig.MINECRAFT_IP}```
-
-            **💎 Comandos disponibles:**
-            `!ayuda` - Ver todos los comandos
-            `!ai` - Chat con IA
-            `!search` - Búsqueda web
-            `!mcstatus` - Estado Minecraft
-
-            **✨ Usa `/hc` para comandos slash**
-            """
+            i18n.text(ctx.guild, "botinfo.prefix_title"),
+            i18n.text(
+                ctx.guild, "botinfo.prefix_body", version=BotConfig.VERSION, guilds=f"{totals['guilds']:,}",
+                members=counters.members_label(), latency=round(self.bot.latency * 1000), ip=BotConfig.MINECRAFT_IP
+            )
         )
         await ctx.send(embed=embed)
 
 # =============================================
-# EVENTOS Y TAREAS AUTOMÁTICAS
+# SISTEMA DE TICKETS Y TRANSCRIPCIONES
 # =============================================
 
-@bot.event
-async def on_ready():
-    """Evento cuando el bot está listo"""
-    bot.start_time = datetime.datetime.now()
+class TranscriptExporter:
+    """Exporta el historial de un canal en streaming a JSONL o HTML comprimido"""
     
-    print(f"""
-    ╔════════════════════════════════════════════════════╗
-    ║                                                      ║
-    ║              ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 ULTRA PRO 5.0              ║
-    ║              SISTEMA AVANZADO ACTIVADO               ║
-    ║                                                      ║
-    ╚════════════════════════════════════════════════════╝
+    PAGE_SIZE = 100
+    WORD_PATTERN = re.compile(r"\w{4,}", re.UNICODE)
     
-    ✅ Bot conectado como: {bot.user.name}
-    📊 ID: {bot.user.id}
-    🌐 Servidores: {len(bot.guilds):,}
-    👥 Usuarios: {sum(g.member_count for g in bot.guilds):,}
-    🚀 Versión: {BotConfig.VERSION}
-    ⏰ Hora de inicio: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
-    📈 Latencia: {round(bot.latency * 1000)}ms
+    def __init__(self, directory: str = 'data/transcripts/', max_parallel: int = 2, partition: str = None):
+        self.directory = directory
+        # Cada proceso de shards escribe su propio índice (como modsearch y la cache)
+        self.index_file = os.path.join(directory, f'index.{partition}.jsonl' if partition else 'index.jsonl')
+        self.semaphore = asyncio.Semaphore(max_parallel)
+        self.index_lock = asyncio.Lock()
+        # Callbacks async que reciben cada entrada nueva del índice
+        self.listeners = []
     
-    🔧 SISTEMAS CARGADOS:
-    • ✅ IA Avanzada sin API
-    • ✅ Búsqueda Web sin API  
-    • ✅ Sistema Minecraft Mejorado
+    async def iter_pages(self, channel: discord.TextChannel):
+        """Generador asíncrono: el historial página por página, del más antiguo al más nuevo"""
+        after = None
+        while True:
+            page = [m async for m in channel.history(limit=self.PAGE_SIZE, after=after, oldest_first=True)]
+            if not page:
+                return
+            yield page
+            if len(page) < self.PAGE_SIZE:
+                return
+            after = page[-1]
+    
+    @staticmethod
+    def serialize(message: discord.Message) -> dict:
+        return {
+            "id": message.id,
+            "author_id": message.author.id,
+            "author": str(message.author),
+            "created_at": message.created_at.isoformat(),
+            "content": message.content,
+            "attachments": [a.url for a in message.attachments],
+            "embeds": len(message.embeds)
+        }
+    
+    @staticmethod
+    def render_html(record: dict) -> str:
+        attachments = "".join(
+            f'<a href="{html.escape(url)}">{html.escape(url)}</a>' for url in record["attachments"]
+        )
+        return (
+            f'<div class="msg"><span class="author">{html.escape(record["author"])}</span> '
+            f'<time>{record["created_at"]}</time><p>{html.escape(record["content"])}</p>{attachments}</div>\n'
+        )
+    
+    async def export(self, channel: discord.TextChannel, ticket: dict, fmt: str = "jsonl") -> dict:
+        """Exporta la transcripción sin cargar todo el historial en memoria"""
+        async with self.semaphore:
+            started = time.perf_counter()
+            extension = "html.gz" if fmt == "html" else "jsonl.gz"
+            path = os.path.join(self.directory, f"{channel.guild.id}_{channel.id}.{extension}")
+            temp_path = f"{path}.tmp"
+            
+            participants = Counter()
+            terms = Counter()
+            count = 0
+            first_at = last_at = None
+            
+            handle = await asyncio.to_thread(gzip.open, temp_path, 'wt', encoding='utf-8')
+            try:
+                try:
+                    if fmt == "html":
+                        title = html.escape(f"Ticket #{channel.name}")
+                        await asyncio.to_thread(handle.write, f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>{title}</title></head><body>\n")
+                    
+                    async for page in self.iter_pages(channel):
+                        records = [self.serialize(m) for m in page]
+                        for record in records:
+                            participants[record["author_id"]] += 1
+                            terms.update(w.lower() for w in self.WORD_PATTERN.findall(record["content"]))
+                        count += len(records)
+                        first_at = first_at or records[0]["created_at"]
+                        last_at = records[-1]["created_at"]
+                    
+                        if fmt == "html":
+                            chunk = "".join(self.render_html(r) for r in records)
+                        else:
+                            chunk = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+                        # La escritura y compresión se hacen fuera del event loop
+                        await asyncio.to_thread(handle.write, chunk)
+                    
+                    if fmt == "html":
+                        await asyncio.to_thread(handle.write, "</body></html>\n")
+                finally:
+                    await asyncio.to_thread(handle.close)
+                await asyncio.to_thread(os.replace, temp_path, path)
+            except BaseException:
+                # Sin transcripción completa no queda nada a medias en disco
+                await asyncio.to_thread(self.discard, temp_path)
+                raise
+            
+            entry = {
+                "ticket_id": str(channel.id),
+                "guild_id": channel.guild.id,
+                "channel_name": channel.name,
+                "owner_id": ticket.get("user_id"),
+                "type": ticket.get("type"),
+                "file": os.path.basename(path),
+                "format": fmt,
+                "messages": count,
+                "participants": [user_id for user_id, _ in participants.most_common()],
+                "keywords": [term for term, _ in terms.most_common(25)],
+                "first_message_at": first_at,
+                "last_message_at": last_at,
+                "exported_at": datetime.datetime.now().isoformat()
+            }
+            await self.append_index(entry)
+            for listener in self.listeners:
+                await listener(entry)
+            logger.info(f"📝 Transcripción {entry['file']}: {count} mensajes en {time.perf_counter() - started:.2f}s")
+            return entry
+    
+    @staticmethod
+    def discard(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    
+    async def append_index(self, entry: dict):
+        """Agrega la transcripción al índice (una línea JSON por transcripción)"""
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        async with self.index_lock:
+            await asyncio.to_thread(self.write_index_line, line)
+    
+    def write_index_line(self, line: str):
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            f.write(line)
+    
+    def search_index(self, guild_id: int, user_id: int = None, keyword: str = None, limit: int = 10) -> List[dict]:
+        """Busca en el índice sin descomprimir ninguna transcripción"""
+        results = []
+        keyword = keyword.lower() if keyword else None
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry["guild_id"] != guild_id:
+                        continue
+                    if user_id and user_id not in entry["participants"] and user_id != entry["owner_id"]:
+                        continue
+                    if keyword and keyword not in entry["keywords"] and keyword not in entry["channel_name"]:
+                        continue
+                    results.append(entry)
+        except FileNotFoundError:
+            return []
+        return results[-limit:][::-1]
+
+transcripts = TranscriptExporter(partition=db.partition)
+
+class TicketSystem:
+    """Sistema de tickets con canales privados"""
+    
+    DEFAULT_CATEGORIES = {
+        "support": {"emoji": "💼", "name": "Soporte"},
+        "report": {"emoji": "🚨", "name": "Reporte"},
+        "suggestion": {"emoji": "💡", "name": "Sugerencia"}
+    }
+    
+    # Aperturas (guild_id, user_id) y cierres (channel_id) en curso
+    opening = set()
+    closing = set()
+    
+    @staticmethod
+    def get_settings(guild_id: int) -> dict:
+        return guild_configs.get(guild_id).get("tickets", {})
+    
+    @staticmethod
+    def get_tickets() -> dict:
+        return db.data.setdefault("tickets", {})
+    
+    @staticmethod
+    def find_open_ticket(guild_id: int, user_id: int) -> Optional[str]:
+        for channel_id, ticket in TicketSystem.get_tickets().items():
+            if ticket["guild_id"] == guild_id and ticket["user_id"] == user_id and ticket["status"] == "open":
+                return channel_id
+        return None
+    
+    @staticmethod
+    def is_staff(member: discord.Member) -> bool:
+        support_roles = TicketSystem.get_settings(member.guild.id).get("support_roles", [])
+        return member.guild_permissions.manage_channels or any(r.id in support_roles for r in member.roles)
+    
+    @staticmethod
+    async def open_ticket(member: discord.Member, ticket_type: str) -> discord.TextChannel:
+        guild = member.guild
+        settings = TicketSystem.get_settings(guild.id)
+        category_info = settings.get("categories", TicketSystem.DEFAULT_CATEGORIES).get(
+            ticket_type, TicketSystem.DEFAULT_CATEGORIES["support"]
+        )
+        
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False),
+            member: discord.PermissionOverwrite(view_channel=True, send_messages=True, attach_files=True),
+            guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_channels=True)
+        }
+        for role_id in settings.get("support_roles", []):
+            role = guild.get_role(role_id)
+            if role:
+                overwrites[role] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+        
+        category_id = guild_configs.get(guild.id).get("channels", {}).get("tickets_category")
+        category = guild.get_channel(category_id) if category_id else None
+        channel = await guild.create_text_channel(
+            name=f"{ticket_type}-{member.name}"[:90],
+            overwrites=overwrites,
+            category=category if isinstance(category, discord.CategoryChannel) else None,
+            reason=f"Ticket de {member}"
+        )
+        
+        TicketSystem.get_tickets()[str(channel.id)] = {
+            "user_id": member.id,
+            "user_name": member.name,
+            "created_at": datetime.datetime.now().isoformat(),
+            "type": ticket_type,
+            "display_name": category_info["name"],
+            "status": "open",
+            "guild_id": guild.id
+        }
+        db.data["statistics"]["tickets_created"] += 1
+        
+        locale = i18n.locale_for(guild.id)
+        await channel.send(
+            content=member.mention,
+            embed=Embeds.info(
+                i18n.t("tickets.welcome_title", locale, emoji=category_info['emoji'], name=category_info['name']),
+                i18n.t("tickets.welcome", locale)
+            )
+        )
+        return channel
+    
+    @staticmethod
+    async def close_ticket(channel: discord.TextChannel, closed_by: discord.Member) -> dict:
+        ticket = TicketSystem.get_tickets()[str(channel.id)]
+        fmt = TicketSystem.get_settings(channel.guild.id).get("transcript_format", "jsonl")
+        # Si la exportación falla el ticket sigue abierto y se puede reintentar
+        entry = await transcripts.export(channel, ticket, fmt)
+        ticket.update({
+            "status": "closed",
+            "closed_by": closed_by.id,
+            "closed_at": datetime.datetime.now().isoformat(),
+            "closed_by_name": closed_by.name,
+            "transcript": entry["file"]
+        })
+        return entry
+
+class TicketCommands(commands.GroupCog, name="ticket"):
+    """Comandos del sistema de tickets"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="abrir", description="Abre un ticket privado con el staff")
+    @app_commands.describe(tipo="Tipo de ticket")
+    @app_commands.choices(tipo=[
+        app_commands.Choice(name="💼 Soporte", value="support"),
+        app_commands.Choice(name="🚨 Reporte", value="report"),
+        app_commands.Choice(name="💡 Sugerencia", value="suggestion")
+    ])
+    @app_commands.guild_only()
+    async def ticket_open(self, interaction: discord.Interaction, tipo: str = "support"):
+        """Abre un ticket"""
+        locale = i18n.locale_for(interaction.guild.id)
+        if not TicketSystem.get_settings(interaction.guild.id).get("enabled", True):
+            await interaction.response.send_message(
+                embed=Embeds.error(i18n.t("tickets.disabled_title", locale), i18n.t("tickets.disabled", locale)), ephemeral=True
+            )
+            return
+        
+        existing = TicketSystem.find_open_ticket(interaction.guild.id, interaction.user.id)
+        key = (interaction.guild.id, interaction.user.id)
+        if existing or key in TicketSystem.opening:
+            description = i18n.t("tickets.exists", locale, channel=f"<#{existing}>") if existing else i18n.t("tickets.creating", locale)
+            await interaction.response.send_message(
+                embed=Embeds.warning(i18n.t("tickets.exists_title", locale), description), ephemeral=True
+            )
+            return
+        
+        TicketSystem.opening.add(key)
+        try:
+            await interaction.response.defer(ephemeral=True)
+            channel = await TicketSystem.open_ticket(interaction.user, tipo)
+        except discord.Forbidden:
+            await interaction.followup.send(
+                embed=Embeds.error(i18n.t("tickets.no_permission_title", locale), i18n.t("tickets.create_forbidden", locale)),
+                ephemeral=True
+            )
+            return
+        finally:
+            TicketSystem.opening.discard(key)
+        await interaction.followup.send(
+            embed=Embeds.success(i18n.t("tickets.created_title", locale), i18n.t("tickets.created", locale, channel=channel.mention)),
+            ephemeral=True
+        )
+    
+    @app_commands.command(name="cerrar", description="Cierra este ticket y guarda su transcripción")
+    @app_commands.guild_only()
+    async def ticket_close(self, interaction: discord.Interaction):
+        """Cierra el ticket actual"""
+        locale = i18n.locale_for(interaction.guild.id)
+        ticket = TicketSystem.get_tickets().get(str(interaction.channel.id))
+        if not ticket or ticket["status"] != "open":
+            await interaction.response.send_message(
+                embed=Embeds.error(i18n.t("tickets.not_ticket_title", locale), i18n.t("tickets.not_ticket", locale)), ephemeral=True
+            )
+            return
+        if interaction.user.id != ticket["user_id"] and not TicketSystem.is_staff(interaction.user):
+            await interaction.response.send_message(
+                embed=Embeds.error(i18n.t("tickets.no_permission_title", locale), i18n.t("tickets.close_forbidden", locale)), ephemeral=True
+            )
+            return
+        
+        if interaction.channel.id in TicketSystem.closing:
+            await interaction.response.send_message(
+                embed=Embeds.warning(i18n.t("tickets.closing_title", locale), i18n.t("tickets.already_closing", locale)), ephemeral=True
+            )
+            return
+        
+        TicketSystem.closing.add(interaction.channel.id)
+        try:
+            await interaction.response.send_message(
+                embed=Embeds.info(i18n.t("tickets.closing_title", locale), i18n.t("tickets.closing", locale))
+            )
+            entry = await TicketSystem.close_ticket(interaction.channel, interaction.user)
+        except (discord.HTTPException, OSError) as e:
+            logger.error(f"❌ Error cerrando ticket {interaction.channel.id}: {e}", exc_info=e)
+            await interaction.channel.send(embed=Embeds.error(
+                i18n.t("tickets.close_failed_title", locale), i18n.t("tickets.close_failed", locale)
+            ))
+            return
+        finally:
+            TicketSystem.closing.discard(interaction.channel.id)
+        await interaction.channel.send(embed=Embeds.success(
+            i18n.t("tickets.closed_title", locale),
+            i18n.t("tickets.closed", locale, file=entry['file'], messages=entry['messages'])
+        ))
+        await asyncio.sleep(10)
+        try:
+            await interaction.channel.delete(reason=f"Ticket cerrado por {interaction.user}")
+        except (discord.Forbidden, discord.NotFound):
+            pass
+    
+    @app_commands.command(name="transcripciones", description="Busca transcripciones de tickets cerrados")
+    @app_commands.describe(usuario="Participante del ticket", palabra="Palabra clave")
+    @app_commands.guild_only()
+    async def ticket_transcripts(self, interaction: discord.Interaction, usuario: discord.User = None, palabra: str = None):
+        """Busca en el índice de transcripciones"""
+        locale = i18n.locale_for(interaction.guild.id)
+        if not TicketSystem.is_staff(interaction.user):
+            await interaction.response.send_message(
+                embed=Embeds.error(i18n.t("tickets.no_permission_title", locale), i18n.t("tickets.transcripts_forbidden", locale)),
+                ephemeral=True
+            )
+            return
+        
+        results = await asyncio.to_thread(
+            transcripts.search_index, interaction.guild.id, usuario.id if usuario else None, palabra
+        )
+        if not results:
+            await interaction.response.send_message(
+                embed=Embeds.info(i18n.t("tickets.no_results_title", locale), i18n.t("tickets.no_results", locale)), ephemeral=True
+            )
+            return
+        
+        lines = [
+            i18n.t(
+                "tickets.transcript_line", locale,
+                channel=r['channel_name'], file=r['file'], messages=r['messages'], date=r['exported_at'][:10]
+            )
+            for r in results
+        ]
+        await interaction.response.send_message(
+            embed=Embeds.info(i18n.t("tickets.transcripts_title", locale), "\n".join(lines)), ephemeral=True
+        )
+
+# =============================================
+# ÍNDICE DE BÚSQUEDA DE MODERACIÓN
+# =============================================
+
+class ModSearchIndex:
+    """Índice de texto completo (SQLite FTS5) de transcripciones y acciones de moderación"""
+    
+    BATCH_SIZE = 1000
+    COUNT_LIMIT = 1000
+    HTML_MESSAGE = re.compile(
+        r'<div class="msg"><span class="author">(.*?)</span> <time>(.*?)</time><p>(.*?)</p>', re.S
+    )
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = None
+        self.lock = threading.Lock()
+    
+    def connect(self):
+        """Abre la base SQLite y crea el esquema si no existe"""
+        with self.lock:
+            if self.conn:
+                return
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(
+                    content, author, scope,
+                    guild_id UNINDEXED, kind UNINDEXED, source UNINDEXED,
+                    author_id UNINDEXED, created_at UNINDEXED,
+                    tokenize = 'unicode61 remove_diacritics 2'
+                )
+            """)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources (source TEXT PRIMARY KEY, rows INTEGER, indexed_at TEXT)"
+            )
+            self.conn.commit()
+    
+    def close(self):
+        with self.lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+    
+    def is_indexed(self, source: str) -> bool:
+        self.connect()
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM sources WHERE source = ?", (source,)).fetchone() is not None
+    
+    @staticmethod
+    def scope_tokens(guild_id: int, kind: str) -> str:
+        """Tokens indexados para filtrar por servidor y tipo dentro del propio MATCH"""
+        return f"g{guild_id} k{kind.replace('_', '')}"
+    
+    def insert_rows(self, rows: List[tuple], source: str = None):
+        """Inserta filas (content, author, guild_id, kind, source, author_id, created_at) en una transacción"""
+        self.connect()
+        rows = [(r[0], r[1], self.scope_tokens(r[2], r[3])) + tuple(r[2:]) for r in rows]
+        with self.lock:
+            with self.conn:
+                self.conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                if source:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO sources VALUES (?, COALESCE((SELECT rows FROM sources WHERE source = ?), 0) + ?, ?)",
+                        (source, source, len(rows), datetime.datetime.now().isoformat())
+                    )
+    
+    def delete_source(self, source: str):
+        """Borra las filas de una fuente (restos de una indexación interrumpida)"""
+        self.connect()
+        with self.lock:
+            with self.conn:
+                self.conn.execute("DELETE FROM entries WHERE source = ?", (source,))
+    
+    def iter_transcript(self, entry: dict):
+        """Lee una transcripción comprimida en streaming"""
+        path = os.path.join(transcripts.directory, entry["file"])
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            if entry.get("format") == "html":
+                # Cada mensaje termina en "</div>\n" (el contenido va escapado, así que no aparece dentro)
+                buffer = []
+                for line in f:
+                    buffer.append(line)
+                    if not line.endswith("</div>\n"):
+                        continue
+                    for author, created_at, content in self.HTML_MESSAGE.findall("".join(buffer)):
+                        yield html.unescape(content), html.unescape(author), None, created_at
+                    buffer = []
+            else:
+                for line in f:
+                    record = json.loads(line)
+                    yield record["content"], record["author"], record["author_id"], record["created_at"]
+    
+    def index_transcript(self, entry: dict) -> int:
+        """Indexa una transcripción por lotes; se ignora si ya estaba indexada"""
+        source = f"transcript:{entry['file']}"
+        if self.is_indexed(source):
+            return 0
+        # Sin marca en sources puede haber lotes de un intento anterior: se reindexa desde cero
+        self.delete_source(entry["file"])
+        
+        batch = []
+        total = 0
+        for content, author, author_id, created_at in self.iter_transcript(entry):
+            if not content:
+                continue
+            batch.append((content, author, entry["guild_id"], "transcript", entry["file"], author_id, created_at))
+            if len(batch) >= self.BATCH_SIZE:
+                self.insert_rows(batch)
+                total += len(batch)
+                batch = []
+        self.insert_rows(batch, source=source)
+        return total + len(batch)
+    
+    def backfill_transcripts(self) -> int:
+        """Indexa las transcripciones del índice que aún no estén en la base"""
+        total = 0
+        try:
+            with open(transcripts.index_file, 'r', encoding='utf-8') as f:
+                entries = [json.loads(line) for line in f]
+        except FileNotFoundError:
+            return 0
+        for entry in entries:
+            try:
+                total += self.index_transcript(entry)
+            except (OSError, EOFError, json.JSONDecodeError) as e:
+                logger.error(f"Error indexando transcripción {entry.get('file')}: {e}")
+        return total
+    
+    def index_mod_action(self, guild_id: int, action: str, target: str, target_id: int,
+                         moderator_id: int, reason: str, created_at: str = None):
+        """Indexa una acción de moderación (warn, mute, automod...)"""
+        content = f"{action}: {reason}"
+        self.insert_rows([(
+            content, target, guild_id, "mod_action", f"{action}:{moderator_id}",
+            target_id, created_at or datetime.datetime.now().isoformat()
+        )])
+    
+    @staticmethod
+    def build_query(text: str) -> str:
+        """Convierte el texto del usuario en una consulta FTS5 segura"""
+        terms = re.findall(r"\w+", text, re.UNICODE)
+        if not terms:
+            return ""
+        quoted = [f'"{t}"' for t in terms[:-1]]
+        quoted.append(f'"{terms[-1]}"*')
+        return " ".join(quoted)
+    
+    def search(self, guild_id: int, text: str, kind: str = None, page: int = 1, per_page: int = 5):
+        """Búsqueda ordenada por relevancia (BM25); devuelve (resultados, total hasta COUNT_LIMIT)"""
+        query = self.build_query(text)
+        if not query:
+            return [], 0
+        
+        # El filtro de servidor/tipo va dentro del MATCH para usar el índice invertido
+        scope = f'scope:"g{guild_id}"'
+        if kind:
+            scope += f' AND scope:"k{kind.replace("_", "")}"'
+        match = f"{scope} AND ({{content author}}: {query})"
+        
+        self.connect()
+        with self.lock:
+            total = self.conn.execute(
+                "SELECT count(*) FROM (SELECT 1 FROM entries WHERE entries MATCH ? LIMIT ?)",
+                (match, self.COUNT_LIMIT)
+            ).fetchone()[0]
+            rows = self.conn.execute(
+                """SELECT snippet(entries, 0, '**', '**', '…', 16), author, kind, source, created_at, rank
+                   FROM entries WHERE entries MATCH ? ORDER BY rank LIMIT ? OFFSET ?""",
+                (match, per_page, (page - 1) * per_page)
+            ).fetchall()
+        
+        results = [
+            {"snippet": r[0], "author": r[1], "kind": r[2], "source": r[3], "created_at": r[4], "score": r[5]}
+            for r in rows
+        ]
+        return results, total
+    
+    async def on_transcript(self, entry: dict):
+        """Se llama cuando una transcripción termina de exportarse"""
+        try:
+            await asyncio.to_thread(self.index_transcript, entry)
+        except Exception as e:
+            logger.error(f"Error indexando transcripción {entry['file']}: {e}")
+
+search_index = ModSearchIndex(f"data/modsearch.{db.partition}.db" if db.partition else "data/modsearch.db")
+transcripts.listeners.append(search_index.on_transcript)
+
+class ModSearchView(discord.ui.View):
+    """Paginación de resultados de /modsearch"""
+    
+    def __init__(self, author_id: int, guild_id: int, query: str, kind: Optional[str], total: int, per_page: int = 5):
+        super().__init__(timeout=180)
+        self.author_id = author_id
+        self.guild_id = guild_id
+        self.query = query
+        self.kind = kind
+        self.total = total
+        self.per_page = per_page
+        self.page = 1
+        self.pages = max(1, math.ceil(total / per_page))
+        locale = i18n.locale_for(guild_id)
+        self.previous_page.label = i18n.t("modsearch.previous", locale)
+        self.next_page.label = i18n.t("modsearch.next", locale)
+        self.update_buttons()
+    
+    def update_buttons(self):
+        self.previous_page.disabled = self.page <= 1
+        self.next_page.disabled = self.page >= self.pages
+    
+    async def build_embed(self) -> discord.Embed:
+        started = time.perf_counter()
+        results, self.total = await asyncio.to_thread(
+            search_index.search, self.guild_id, self.query, self.kind, self.page, self.per_page
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        
+        locale = i18n.locale_for(self.guild_id)
+        fields = [
+            {
+                "name": f"{i18n.t('modsearch.kinds.' + r['kind'], locale)} • {r['author']} • {(r['created_at'] or '')[:10]}",
+                "value": f"{r['snippet'][:900]}\n*`{r['source']}`*"
+            }
+            for r in results
+        ]
+        total = f"{self.total:,}{'+' if self.total >= ModSearchIndex.COUNT_LIMIT else ''}"
+        return Embeds.info(
+            i18n.t("modsearch.title", locale, query=self.query)[:256],
+            i18n.t("modsearch.summary", locale, total=total, page=self.page, pages=self.pages, ms=f"{elapsed:.0f}"),
+            fields=fields
+        )
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.author_id
+    
+    async def change_page(self, interaction: discord.Interaction, delta: int):
+        self.page = min(max(1, self.page + delta), self.pages)
+        self.update_buttons()
+        await interaction.response.edit_message(embed=await self.build_embed(), view=self)
+    
+    @discord.ui.button(label="◀ Anterior", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.change_page(interaction, -1)
+    
+    @discord.ui.button(label="Siguiente ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.change_page(interaction, 1)
+
+class ModerationCommands(commands.Cog):
+    """Comandos de moderación"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+    
+    @app_commands.command(name="modsearch", description="Busca en transcripciones y registros de moderación")
+    @app_commands.describe(consulta="Texto a buscar", tipo="Dónde buscar")
+    @app_commands.choices(tipo=[
+        app_commands.Choice(name="Todo", value="all"),
+        app_commands.Choice(name="Transcripciones", value="transcript"),
+        app_commands.Choice(name="Acciones de moderación", value="mod_action")
+    ])
+    @app_commands.default_permissions(manage_messages=True)
+    @app_commands.guild_only()
+    async def modsearch(self, interaction: discord.Interaction, consulta: str, tipo: str = "all"):
+        """Búsqueda de texto completo para el staff"""
+        if not startup.is_ready("search_index"):
+            await interaction.response.send_message(
+                embed=Embeds.warning(i18n.text(interaction.guild, "modsearch.loading_title"), i18n.text(interaction.guild, "modsearch.loading")),
+                ephemeral=True
+            )
+            return
+        
+        kind = None if tipo == "all" else tipo
+        view = ModSearchView(interaction.user.id, interaction.guild.id, consulta, kind, total=0)
+        embed = await view.build_embed()
+        view.pages = max(1, math.ceil(view.total / view.per_page))
+        view.update_buttons()
+        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+    
+    @app_commands.command(name="modlog", description="Canal donde se registran AutoMod, raids y sanciones")
+    @app_commands.describe(canal="Canal de registros (vacío: desactivar)")
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.guild_only()
+    async def modlog(self, interaction: discord.Interaction, canal: discord.TextChannel = None):
+        """Configura el canal de mod-logs"""
+        guild_configs.update(interaction.guild.id, {"channels": {"mod_logs": canal.id if canal else None}})
+        locale = i18n.locale_for(interaction.guild.id)
+        if canal:
+            outbound.send(canal, embed=Embeds.info(
+                i18n.t("moderation.modlog_notice_title", locale), i18n.t("moderation.modlog_notice", locale, user=interaction.user.mention)
+            ))
+            description = i18n.t("moderation.modlog_on", locale, channel=canal.mention)
+        else:
+            description = i18n.t("moderation.modlog_off", locale)
+        await interaction.response.send_message(embed=Embeds.success(i18n.t("moderation.modlog_title", locale), description), ephemeral=True)
+    
+    @app_commands.command(name="idioma", description="Idioma de las respuestas del bot en este servidor")
+    @app_commands.describe(idioma="Idioma del servidor")
+    @app_commands.choices(idioma=[
+        app_commands.Choice(name="Español", value="es"),
+        app_commands.Choice(name="English", value="en")
+    ])
+    @app_commands.default_permissions(manage_guild=True)
+    @app_commands.guild_only()
+    async def idioma(self, interaction: discord.Interaction, idioma: app_commands.Choice[str]):
+        """Cambia el idioma del servidor"""
+        if idioma.value not in i18n.locales:
+            await interaction.response.send_message(
+                embed=Embeds.error(i18n.text(interaction.guild, "language.title"), i18n.text(
+                    interaction.guild, "language.unknown", options=", ".join(sorted(i18n.locales))
+                )), ephemeral=True
+            )
+            return
+        guild_configs.update(interaction.guild.id, {"language": idioma.value})
+        embed = Embeds.success(
+            i18n.t("language.title", idioma.value),
+            i18n.t("language.changed", idioma.value, name=i18n.t("meta.name", idioma.value))
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @staticmethod
+    def check_target(interaction: discord.Interaction, member: discord.Member) -> Optional[str]:
+        if member.bot:
+            return i18n.text(interaction.guild, "moderation.errors.bot")
+        if member.id == interaction.user.id:
+            return i18n.text(interaction.guild, "moderation.errors.self")
+        if member.id == interaction.guild.owner_id or (
+            interaction.user.id != interaction.guild.owner_id and member.top_role >= interaction.user.top_role
+        ):
+            return i18n.text(interaction.guild, "moderation.errors.higher")
+        return None
+    
+    @app_commands.command(name="warn", description="Advertir a un usuario")
+    @app_commands.describe(usuario="Usuario a advertir", razon="Motivo de la advertencia")
+    @app_commands.default_permissions(moderate_members=True)
+    @app_commands.guild_only()
+    async def warn(self, interaction: discord.Interaction, usuario: discord.Member, razon: str):
+        """Advertencia con silencio automático al llegar a max_warns"""
+        locale = i18n.locale_for(interaction.guild.id)
+        error = self.check_target(interaction, usuario)
+        if error:
+            await interaction.response.send_message(embed=Embeds.error(i18n.t("moderation.cannot_warn", locale), error), ephemeral=True)
+            return
+        
+        count = moderation.add_warn(interaction.guild.id, usuario.id, interaction.user.id, razon)
+        max_warns, minutes = moderation.warn_limit(interaction.guild.id)
+        description = i18n.t("moderation.warn", locale, user=usuario.mention, count=count, reason=razon)
+        await interaction.response.send_message(embed=Embeds.warning(i18n.t("moderation.warn_title", locale), description))
+        await moderation.record_action(
+            interaction.guild, "warn", i18n.t("moderation.warn_log_title", locale, count=count, max=max_warns or '∞'),
+            usuario, interaction.user, razon
+        )
+        
+        if max_warns and count >= max_warns:
+            reason = i18n.t("moderation.auto_mute_reason", locale, count=count, max=max_warns)
+            try:
+                await moderation.mute(interaction.guild, usuario.id, self.bot.user.id, reason, minutes)
+            except discord.HTTPException as e:
+                logger.warning(f"⚠️ Silencio automático fallido para {usuario.id} en {interaction.guild.id}: {e}")
+                return
+            title = i18n.t("moderation.auto_mute_title", locale)
+            outbound.send(interaction.channel, embed=Embeds.error(
+                title, i18n.t("moderation.auto_mute", locale, user=usuario.mention, minutes=minutes, reason=reason)
+            ))
+            await moderation.record_action(interaction.guild, "mute", title, usuario, self.bot.user, reason)
+    
+    @app_commands.command(name="warnings", description="Advertencias activas de un usuario")
+    @app_commands.describe(usuario="Usuario a consultar", limpiar="Borrar todas sus advertencias")
+    @app_commands.default_permissions(moderate_members=True)
+    @app_commands.guild_only()
+    async def warnings(self, interaction: discord.Interaction, usuario: discord.Member, limpiar: bool = False):
+        """Lista (o borra) las advertencias"""
+        locale = i18n.locale_for(interaction.guild.id)
+        if limpiar:
+            removed = moderation.clear_warns(interaction.guild.id, usuario.id)
+            await interaction.response.send_message(
+                embed=Embeds.success(
+                    i18n.t("moderation.warns_cleared_title", locale),
+                    i18n.t("moderation.warns_cleared", locale, count=removed, user=usuario.mention)
+                ),
+                ephemeral=True
+            )
+            if removed:
+                await moderation.record_action(
+                    interaction.guild, "unwarn", i18n.t("moderation.warns_cleared_log_title", locale), usuario, interaction.user,
+                    i18n.t("moderation.warns_cleared_log", locale, count=removed)
+                )
+            return
+        
+        warns = moderation.get_warns(interaction.guild.id, usuario.id)
+        lines = [
+            i18n.t("moderation.warning_line", locale, index=i, reason=warn['reason'], moderator=f"<@{warn['moderator_id']}>")
+            + (i18n.t("moderation.warning_expires", locale, when=f"<t:{int(warn['expires_at'])}:R>") if warn.get("expires_at") else "")
+            for i, warn in enumerate(warns, 1)
+        ]
+        mute = moderation.get_mute(interaction.guild.id, usuario.id)
+        if mute:
+            until = f"<t:{int(mute['expires_at'])}:R>" if mute.get("expires_at") else i18n.t("moderation.indefinite", locale)
+            lines.append("\n" + i18n.t("moderation.muted_line", locale, until=until, reason=mute['reason']))
+        embed = Embeds.info(
+            i18n.t("moderation.warnings_title", locale, user=usuario.display_name),
+            "\n".join(lines)[:4000] or i18n.t("moderation.no_warnings", locale)
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="mute", description="Silenciar a un usuario")
+    @app_commands.describe(usuario="Usuario a silenciar", minutos="Duración (vacío: indefinido con rol de silencio, 28 días con aislamiento)", razon="Motivo")
+    @app_commands.default_permissions(moderate_members=True)
+    @app_commands.guild_only()
+    async def mute(self, interaction: discord.Interaction, usuario: discord.Member,
+                   minutos: app_commands.Range[int, 1, 525600] = None, razon: str = "Sin motivo"):
+        """Silencia con rol o aislamiento y programa el fin"""
+        locale = i18n.locale_for(interaction.guild.id)
+        error = self.check_target(interaction, usuario)
+        if error:
+            await interaction.response.send_message(embed=Embeds.error(i18n.t("moderation.cannot_mute", locale), error), ephemeral=True)
+            return
+        
+        try:
+            record = await moderation.mute(interaction.guild, usuario.id, interaction.user.id, razon, minutos)
+        except discord.HTTPException as e:
+            await interaction.response.send_message(
+                embed=Embeds.error(i18n.t("moderation.cannot_mute", locale), i18n.t("moderation.mute_rejected", locale, error=e.text or e)),
+                ephemeral=True
+            )
+            return
+        
+        until = f"<t:{int(record['expires_at'])}:R>" if record.get("expires_at") else i18n.t("moderation.indefinite", locale)
+        await interaction.response.send_message(embed=Embeds.warning(
+            i18n.t("moderation.muted_title", locale), i18n.t("moderation.muted", locale, user=usuario.mention, until=until, reason=razon)
+        ))
+        await moderation.record_action(interaction.guild, "mute", i18n.t("moderation.mute_log_title", locale), usuario, interaction.user, razon)
+    
+    @app_commands.command(name="unmute", description="Quitar el silencio a un usuario")
+    @app_commands.describe(usuario="Usuario a quitar el silencio")
+    @app_commands.default_permissions(moderate_members=True)
+    @app_commands.guild_only()
+    async def unmute(self, interaction: discord.Interaction, usuario: discord.Member):
+        """Quita el silencio antes de tiempo"""
+        locale = i18n.locale_for(interaction.guild.id)
+        reason = i18n.t("moderation.unmute_reason", locale, user=interaction.user)
+        record = await moderation.unmute(interaction.guild.id, usuario.id, reason)
+        if record is None and usuario.is_timed_out():
+            # Aislamiento puesto fuera del bot
+            try:
+                await usuario.timeout(None, reason=reason)
+            except discord.Forbidden:
+                await interaction.response.send_message(
+                    embed=Embeds.error(i18n.t("moderation.no_permission_title", locale), i18n.t("moderation.unmute_forbidden", locale)),
+                    ephemeral=True
+                )
+                return
+        elif record is None:
+            await interaction.response.send_message(
+                embed=Embeds.info(i18n.t("moderation.not_muted_title", locale), i18n.t("moderation.not_muted", locale, user=usuario.mention)),
+                ephemeral=True
+            )
+            return
+        title = i18n.t("moderation.unmuted_title", locale)
+        await interaction.response.send_message(embed=Embeds.success(title, i18n.t("moderation.unmuted", locale, user=usuario.mention)))
+        await moderation.record_action(interaction.guild, "unmute", title, usuario, interaction.user, i18n.t("moderation.unmuted_log", locale))
+    
+    @app_commands.command(name="clear", description="Borrar mensajes recientes del canal")
+    @app_commands.describe(cantidad="Mensajes a borrar (1-500)", usuario="Solo los de este usuario")
+    @app_commands.default_permissions(manage_messages=True)
+    @app_commands.guild_only()
+    async def clear(self, interaction: discord.Interaction, cantidad: app_commands.Range[int, 1, 500], usuario: discord.Member = None):
+        """Borrado masivo en bloques de 100 (solo mensajes de menos de 14 días)"""
+        locale = i18n.locale_for(interaction.guild.id)
+        await interaction.response.defer(ephemeral=True)
+        try:
+            deleted, too_old = await moderation.bulk_clear(interaction.channel, cantidad, usuario, reason=f"/clear por {interaction.user}")
+        except discord.Forbidden:
+            await interaction.followup.send(
+                embed=Embeds.error(i18n.t("moderation.no_permission_title", locale), i18n.t("moderation.clear_forbidden", locale)),
+                ephemeral=True
+            )
+            return
+        
+        description = i18n.t("moderation.cleared", locale, count=deleted)
+        if too_old:
+            description += "\n" + i18n.t("moderation.too_old", locale)
+        await interaction.followup.send(embed=Embeds.success(i18n.t("moderation.clear_title", locale), description), ephemeral=True)
+        if deleted:
+            await moderation.record_action(
+                interaction.guild, "clear", i18n.t("moderation.clear_log_title", locale, count=deleted), usuario, interaction.user,
+                i18n.t("moderation.clear_log", locale, channel=interaction.channel.mention)
+            )
+
+# =============================================
+# EVENTOS Y TAREAS AUTOMÁTICAS
+# =============================================
+
+@bot.event
+async def on_ready():
+    """Evento cuando el bot está listo"""
+    if shard_settings["mode"] == "none":
+        shard_monitor.record(None, "ready")
+    
+    # Recuento completo una vez por sesión; después lo mantienen los eventos
+    totals = counters.rebuild(bot.guilds)
+    
+    # on_ready se repite tras reconexiones: no se reinicia nada
+    if getattr(bot, 'start_time', None):
+        logger.info(f"🔁 Reconectado como {bot.user} ({totals['guilds']:,} servidores)")
+        start_background_tasks()
+        return
+    
+    bot.start_time = datetime.datetime.now()
+    
+    print(f"""
+    ╔════════════════════════════════════════════════════╗
+    ║                                                      ║
+    ║              ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 ULTRA PRO 5.0              ║
+    ║              SISTEMA AVANZADO ACTIVADO               ║
+    ║                                                      ║
+    ╚════════════════════════════════════════════════════╝
+    
+    ✅ Bot conectado como: {bot.user.name}
+    📊 ID: {bot.user.id}
+    🌐 Servidores: {totals['guilds']:,}
+    👥 Usuarios: {counters.members_label()}
+    🚀 Versión: {BotConfig.VERSION}
+    ⏰ Hora de inicio: {datetime.datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
+    📈 Latencia: {round(bot.latency * 1000)}ms
+    🧠 Perfil: {runtime_profile['name']} ({get_rss_mb():.1f} MB RSS)
+    
+    🔧 SISTEMAS CARGADOS:
+    • ✅ IA Avanzada sin API
+    • ✅ Búsqueda Web sin API  
+    • ✅ Sistema Minecraft Mejorado
     • ✅ Comandos Slash (/hc)
     • ✅ Comandos Tradicionales (!)
     • ✅ Base de Datos Avanzada
@@ -1075,17 +4487,19 @@ async def on_ready():
     • ✅ Estadísticas en Tiempo Real
     """)
     
-    # Sincronizar comandos slash
-    try:
-        synced = await bot.tree.sync()
-        print(f"✅ {len(synced)} comandos slash sincronizados")
-    except Exception as e:
-        print(f"❌ Error sincronizando comandos slash: {e}")
+    logger.info(
+        f"📏 Perfil {runtime_profile['name']}: {get_rss_mb():.1f} MB RSS tras conectar "
+        f"({runtime_profile['rss_at_start']:.1f} MB al iniciar)"
+    )
+    
+    if "gateway" in startup.stages and not startup.is_ready("gateway"):
+        startup.finish("gateway")
+    
+    # Sincronizar comandos slash solo si cambiaron
+    await command_sync.sync(force=os.getenv("FORCE_COMMAND_SYNC") == "1")
     
     # Iniciar tareas automáticas
-    update_presence.start()
-    cleanup_cache.start()
-    save_data_auto.start()
+    start_background_tasks()
     
     # Estado épico inicial
     await bot.change_presence(
@@ -1103,95 +4517,699 @@ async def on_message(message: discord.Message):
     if message.author.bot:
         return
     
+    # Durante el apagado no se aceptan comandos nuevos
+    if lifecycle.shutting_down:
+        return
+    
+    # Los mensajes esperan a que la base de datos termine de cargar
+    if not startup.is_ready("database"):
+        await startup.wait_ready("database")
+    
     # Actualizar estadísticas
     db.data["statistics"]["messages_processed"] += 1
     
-    # Procesar comandos tradicionales
-    await bot.process_commands(message)
+    # Automoderación (los mensajes limpios salen de inmediato)
+    if message.guild and await automod.process_message(message):
+        return
+    
+    # Procesar comandos tradicionales (el chat normal no construye contexto)
+    if prefix_dispatcher.match(message.content, message.guild.id if message.guild else None):
+        await bot.process_commands(message)
+
+@bot.event
+async def on_shard_connect(shard_id: int):
+    shard_monitor.record(shard_id, "connected")
+
+@bot.event
+async def on_shard_ready(shard_id: int):
+    shard_monitor.record(shard_id, "ready")
+
+@bot.event
+async def on_shard_disconnect(shard_id: int):
+    shard_monitor.record(shard_id, "disconnected")
+
+@bot.event
+async def on_shard_resumed(shard_id: int):
+    shard_monitor.record(shard_id, "resumed")
+
+@bot.event
+async def on_connect():
+    if shard_settings["mode"] == "none":
+        shard_monitor.record(None, "connected")
+
+@bot.event
+async def on_disconnect():
+    if shard_settings["mode"] == "none":
+        shard_monitor.record(None, "disconnected")
+
+@bot.event
+async def on_resumed():
+    if shard_settings["mode"] == "none":
+        shard_monitor.record(None, "resumed")
+
+@bot.event
+async def on_guild_join(guild: discord.Guild):
+    counters.guild_join(guild)
+
+@bot.event
+async def on_guild_available(guild: discord.Guild):
+    counters.guild_join(guild)
+
+@bot.event
+async def on_guild_remove(guild: discord.Guild):
+    counters.guild_remove(guild.id)
+
+@bot.event
+async def on_member_remove(member: discord.Member):
+    counters.member_delta(member.guild.id, -1)
+
+@bot.event
+async def on_member_join(member: discord.Member):
+    """Evento cuando un miembro entra al servidor"""
+    counters.member_delta(member.guild.id, 1)
+    if automod.record_join(member):
+        logger.warning(f"🚨 Posible raid en {member.guild.name} ({member.guild.id}): modo anti-raid activado")
+        outbound.mod_log(member.guild, Embeds.error(
+            i18n.text(member.guild, "automod.raid_title"),
+            i18n.text(
+                member.guild, "automod.raid", joins=BotConfig.AUTOMOD["raid_joins"],
+                window=BotConfig.AUTOMOD["raid_window"], minutes=BotConfig.AUTOMOD["raid_duration"] // 60
+            )
+        ))
+    
+    if not startup.is_ready("database"):
+        await startup.wait_ready("database")
+    if automod.in_raid_mode(member.guild.id):
+        await automod.quarantine(member)
+    role_engine.on_member_join(member)
+    moderation.on_member_join(member)
+
+@bot.event
+async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
+    """Roles por reacción: búsqueda en el índice, sin pedir el mensaje"""
+    if payload.guild_id is None or payload.user_id == bot.user.id or (payload.member and payload.member.bot):
+        return
+    if not startup.is_ready("database"):
+        await startup.wait_ready("database")
+    role_id = role_engine.lookup(payload.message_id, payload.emoji)
+    if role_id:
+        role_engine.enqueue(payload.guild_id, payload.user_id, role_id, reason="Rol por reacción")
+
+@bot.event
+async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
+    if payload.guild_id is None or payload.user_id == bot.user.id:
+        return
+    if not startup.is_ready("database"):
+        await startup.wait_ready("database")
+    role_id = role_engine.lookup(payload.message_id, payload.emoji)
+    if role_id:
+        role_engine.enqueue(payload.guild_id, payload.user_id, role_id, add=False, reason="Rol por reacción retirado")
+
+@bot.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    """Un mensaje borrado deja de dar roles"""
+    if payload.guild_id and startup.is_ready("database") and role_engine.unbind(payload.message_id):
+        logger.info(f"🎭 Roles por reacción del mensaje {payload.message_id} eliminados con el mensaje")
+
+@bot.event
+async def on_command_error(ctx: commands.Context, error: commands.CommandError):
+    """Manejo de errores de comandos tradicionales"""
+    if isinstance(error, commands.CommandNotFound):
+        return
+    
+    if isinstance(error, commands.CommandOnCooldown):
+        embed = Embeds.warning(
+            i18n.text(ctx.guild, "errors.cooldown_title"),
+            i18n.text(ctx.guild, "errors.cooldown", seconds=f"{error.retry_after:.1f}")
+        )
+        await ctx.send(embed=embed, delete_after=min(error.retry_after, 10))
+        return
+    
+    if isinstance(error, commands.CommandInvokeError) and isinstance(error.original, (WorkerPoolBusy, asyncio.TimeoutError)):
+        await ctx.send(embed=Embeds.warning(i18n.text(ctx.guild, "errors.busy_title"), i18n.text(ctx.guild, "errors.busy")))
+        return
+    
+    logger.error(f"Error en comando {ctx.command}: {error}", exc_info=getattr(error, "original", error))
+    try:
+        await ctx.send(embed=Embeds.error(i18n.text(ctx.guild, "errors.generic_title"), i18n.text(ctx.guild, "errors.generic")))
+    except discord.HTTPException:
+        pass
+
+@bot.tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    """Manejo de errores de comandos slash"""
+    if isinstance(error, app_commands.CommandOnCooldown):
+        embed = Embeds.warning(
+            i18n.text(interaction.guild, "errors.cooldown_title"),
+            i18n.text(interaction.guild, "errors.cooldown", seconds=f"{error.retry_after:.1f}")
+        )
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+    
+    if isinstance(error, app_commands.CommandInvokeError) and isinstance(error.original, (WorkerPoolBusy, asyncio.TimeoutError)):
+        embed = Embeds.warning(i18n.text(interaction.guild, "errors.busy_title"), i18n.text(interaction.guild, "errors.busy"))
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+        return
+    
+    logger.error(
+        f"Error en comando slash {interaction.command.name if interaction.command else None}: {error}",
+        exc_info=getattr(error, "original", error)
+    )
+    # Sin respuesta un comando diferido se queda en "pensando..."
+    embed = Embeds.error(i18n.text(interaction.guild, "errors.generic_title"), i18n.text(interaction.guild, "errors.generic"))
+    try:
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+    except discord.HTTPException:
+        pass
 
 # =============================================
 # TAREAS AUTOMÁTICAS MEJORADAS
 # =============================================
 
+def start_background_tasks():
+    """Inicia las tareas automáticas que no estén corriendo"""
+    loops = [update_presence, cleanup_cache, save_data_auto, measure_loop_lag, watch_guild_config, process_role_queue, expire_punishments]
+    if dashboard.token:
+        loops.append(refresh_dashboard)
+    for task in loops:
+        if not task.is_running():
+            task.start()
+
 @tasks.loop(minutes=2)
 async def update_presence():
     """Actualiza el estado del bot con Rich Presence épico"""
-    activities = [
-        discord.Activity(type=discord.ActivityType.playing, name=f"MC: {BotConfig.MINECRAFT_IP}"),
-        discord.Activity(type=discord.ActivityType.watching, name=f"{len(bot.guilds)} servidores"),
-        discord.Activity(type=discord.ActivityType.listening, name="/hc commands"),
-        discord.Activity(type=discord.ActivityType.playing, name="with ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 Systems"),
-        discord.Activity(type=discord.ActivityType.watching, name="AI Intelligence"),
-        discord.Activity(type=discord.ActivityType.competing, name="Minecraft Adventures"),
-        discord.Activity(type=discord.ActivityType.streaming, name="Live: honducraft.com", url="https://twitch.tv/honducraft")
-    ]
-    
-    # Estado más épico cada 2 minutos
-    current_activity = random.choice(activities)
-    await bot.change_presence(activity=current_activity)
+    # Estado más épico cada 2 minutos (rotación precompilada en counters)
+    activity = counters.next_activity()
+    if activity is not None:
+        await bot.change_presence(activity=activity)
+
+@tasks.loop(seconds=5)
+async def measure_loop_lag():
+    """Mide cuánto se retrasa el event loop"""
+    start = time.perf_counter()
+    await asyncio.sleep(0.5)
+    shard_monitor.record_loop_lag(max(0.0, time.perf_counter() - start - 0.5))
+
+@tasks.loop(minutes=5)
+async def minecraft_poller():
+    """Sondea el servidor de Minecraft y guarda el historial"""
+    status = await MinecraftSystem.get_server_status()
+    MinecraftSystem.record_status(status)
 
 @tasks.loop(minutes=10)
 async def cleanup_cache():
     """Limpia la cache periódicamente"""
     cache.cleanup_old_cache()
 
+@tasks.loop(seconds=5)
+async def watch_guild_config():
+    """Recarga en caliente el archivo de configuración y guarda los cambios pendientes"""
+    guild_configs.load_overrides()
+    await db.flush()
+
+@tasks.loop(seconds=1)
+async def process_role_queue():
+    """Aplica la cola de roles a ritmo fijo (ROLE_QUEUE_RATE cambios por segundo)"""
+    await role_engine.process(role_engine.rate)
+
+@tasks.loop(seconds=1)
+async def expire_punishments():
+    """Quita silencios y advertencias vencidos (un solo montículo para todos los servidores)"""
+    expired = await moderation.expire_due()
+    if expired:
+        logger.info(f"⏳ {expired} sanciones vencidas")
+
 @tasks.loop(minutes=15)
 async def save_data_auto():
-    """Guarda datos automáticamente"""
-    db.save_data()
+    """Guarda datos automáticamente (con backup)"""
+    await asyncio.to_thread(db.save_data, True, db.copy_sections())
 
 # =============================================
 # INICIALIZACIÓN Y EJECUCIÓN
 # =============================================
 
-async def main():
-    """Función principal de inicialización"""
-    # Añadir COGs
-    await bot.add_cog(TraditionalCommands(bot))
-    await bot.add_cog(SlashCommands(bot))
+# =============================================
+# CICLO DE VIDA Y APAGADO SEGURO
+# =============================================
+
+class LifecycleManager:
+    """Apagado ordenado: señales, drenado de comandos y guardado final"""
     
-    # Iniciar el bot
-    try:
-        TOKEN = os.getenv("DISCORD_TOKEN") or "MTQ0MTE0ODY4NDUxNDM2MTQ2Ng.GYgx6k.iB6KitwmumRQYhI2QUMZAT4Lc3HuKXW4b_MdrAS"
+    DRAIN_TIMEOUT = 15
+    
+    def __init__(self):
+        self.in_flight = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.shutting_down = False
+        self.shutdown_task = None
+        self.web_runner = None
+        self.cache_file = f"data/cache.{db.partition}.json" if db.partition else "data/cache.json"
+    
+    def command_started(self):
+        self.in_flight += 1
+        self.idle.clear()
+    
+    def command_finished(self):
+        self.in_flight = max(0, self.in_flight - 1)
+        if not self.in_flight:
+            self.idle.set()
+    
+    def install_signal_handlers(self):
+        """SIGTERM/SIGINT inician el apagado ordenado"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.request_shutdown, sig.name)
+            except NotImplementedError:
+                # Windows: sin soporte de señales en el loop
+                signal.signal(sig, lambda *_: loop.call_soon_threadsafe(self.request_shutdown, "señal"))
+    
+    def request_shutdown(self, reason: str = "manual") -> asyncio.Task:
+        """Inicia el apagado una sola vez y devuelve la tarea"""
+        if not self.shutdown_task:
+            self.shutdown_task = asyncio.create_task(self.shutdown(reason))
+        return self.shutdown_task
+    
+    async def shutdown(self, reason: str):
+        logger.info(f"⏹️ Apagando ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 ({reason})...")
+        self.shutting_down = True
         
-        if not TOKEN or TOKEN == "TU_TOKEN_AQUI":
-            print("❌ ERROR: Debes configurar tu token de Discord")
-            print("💡 Configura la variable de entorno DISCORD_TOKEN")
-            return
+        # 1. Detener tareas automáticas
+        for task in (update_presence, cleanup_cache, save_data_auto, measure_loop_lag, minecraft_poller, refresh_dashboard, watch_guild_config, process_role_queue, expire_punishments):
+            task.cancel()
+        for task in startup.tasks:
+            task.cancel()
         
-        logger.info("🚀 Iniciando ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 Ultra Pro 5.0...")
-        await bot.start(TOKEN)
+        # 2. Esperar a los comandos en curso
+        if self.in_flight:
+            logger.info(f"⏳ Esperando {self.in_flight} comandos en curso...")
+            try:
+                await asyncio.wait_for(self.idle.wait(), self.DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ {self.in_flight} comandos no terminaron en {self.DRAIN_TIMEOUT}s")
+        await outbound.flush()
+        workers.shutdown()
         
-    except discord.LoginFailure:
-        logger.error("❌ Error de autenticación: Token inválido")
-    except KeyboardInterrupt:
-        logger.info("⏹️ Bot detenido por el usuario")
+        # 3. Cerrar gateway y sesión HTTP de discord.py
+        if not bot.is_closed():
+            await bot.close()
+        
+        # 4. Guardado final atómico (solo si los datos llegaron a cargarse)
+        if '_data' in db.__dict__:
+            await asyncio.to_thread(db.save_data)
+        try:
+            cache.save_to_disk(self.cache_file)
+        except OSError as e:
+            logger.error(f"Error guardando cache: {e}")
+        
+        await asyncio.to_thread(search_index.close)
+        
+        # 5. Cerrar el servidor web
+        if self.web_runner:
+            await self.web_runner.cleanup()
+            self.web_runner = None
+        
+        logger.info("✅ Apagado completo, datos guardados")
+
+lifecycle = LifecycleManager()
+
+@bot.before_invoke
+async def before_any_command(ctx: commands.Context):
+    ctx.started_at = time.perf_counter()
+    lifecycle.command_started()
+
+@bot.after_invoke
+async def after_any_command(ctx: commands.Context):
+    lifecycle.command_finished()
+    logger.info("Comando ejecutado", extra={
+        "command": ctx.command.qualified_name,
+        "guild": ctx.guild.id if ctx.guild else None,
+        "user": ctx.author.id,
+        "latency_ms": round((time.perf_counter() - ctx.started_at) * 1000, 1)
+    })
+
+@bot.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    latency = discord.utils.utcnow() - interaction.created_at
+    logger.info("Comando slash ejecutado", extra={
+        "command": command.qualified_name,
+        "guild": interaction.guild_id,
+        "user": interaction.user.id,
+        "latency_ms": round(latency.total_seconds() * 1000, 1)
+    })
+
+# =============================================
+# API DEL PANEL DE ADMINISTRACIÓN (SOLO LECTURA)
+# =============================================
+
+class DashboardAPI:
+    """Instantáneas JSON precalculadas para el panel, servidas con ETag, Last-Modified y gzip"""
+    
+    REFRESH_SECONDS = int(os.getenv("DASHBOARD_REFRESH", "30"))
+    TOP_LIMIT = 25
+    
+    def __init__(self, token: Optional[str]):
+        # Sin DASHBOARD_TOKEN la API queda desactivada
+        self.token = token
+        self.snapshots = {}
+        self.stale = {}
+        self.top_users = {}
+        self.refreshed_at = None
+    
+    @staticmethod
+    @worker_job("thread", timeout=30)
+    def encode(payload, previous: dict = None) -> dict:
+        """JSON + gzip + ETag; si el contenido no cambió se conserva la versión anterior"""
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if previous and previous["etag"] == etag:
+            return previous
+        return {
+            "body": body,
+            "gzip": gzip.compress(body, compresslevel=6),
+            "etag": etag,
+            "last_modified": datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+        }
+    
+    @staticmethod
+    @worker_job("thread", timeout=30)
+    def build_rankings(users: list, limit: int) -> tuple:
+        """Totales por servidor y top de usuarios por nivel/XP, en una sola pasada"""
+        totals = defaultdict(lambda: {"tracked_users": 0, "messages": 0, "xp": 0})
+        heaps = defaultdict(list)
+        
+        for key, profile in users:
+            guild_id, _, user_id = key.partition("_")
+            leveling = profile.get("leveling", {})
+            entry = (
+                leveling.get("level", 1), leveling.get("xp", 0), user_id,
+                leveling.get("messages", 0), profile.get("economy", {}).get("wallet", 0)
+            )
+            guild_totals = totals[guild_id]
+            guild_totals["tracked_users"] += 1
+            guild_totals["messages"] += entry[3]
+            guild_totals["xp"] += entry[1]
+            
+            heap = heaps[guild_id]
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+        
+        def rows(entries, guild_id):
+            return [
+                {"guild_id": guild_id, "user_id": user_id, "level": level, "xp": xp, "messages": messages, "wallet": wallet}
+                for level, xp, user_id, messages, wallet in entries
+            ]
+        
+        tops = {guild_id: rows(sorted(heap, reverse=True), guild_id) for guild_id, heap in heaps.items()}
+        best = heapq.nlargest(limit, ((entry, guild_id) for guild_id, heap in heaps.items() for entry in heap))
+        tops["global"] = [row for entry, guild_id in best for row in rows([entry], guild_id)]
+        return dict(totals), tops
+    
+    def build_health(self) -> dict:
+        try:
+            db_size = os.path.getsize(db.store_path)
+        except OSError:
+            db_size = None
+        start_time = getattr(bot, 'start_time', None)
+        return {
+            "version": BotConfig.VERSION,
+            "uptime_seconds": int((datetime.datetime.now() - start_time).total_seconds()) if start_time else None,
+            "rss_mb": round(get_rss_mb(), 1),
+            "loop_lag_ms": {"avg": round(shard_monitor.loop_lag * 1000, 1), "max": round(shard_monitor.max_loop_lag * 1000, 1)},
+            "stages": startup.report(),
+            "shards": shard_monitor.snapshot(),
+            "workers": workers.snapshot(),
+            "roles": role_engine.snapshot(),
+            "outbound": outbound.snapshot(),
+            "counters": counters.snapshot(),
+            "moderation": moderation.snapshot(),
+            "database": {
+                "file": db.store_path,
+                "format": db.format,
+                "size_bytes": db_size,
+                "servers": len(db.data["servers"]),
+                "users": len(db.data["users"]),
+                "last_updated": db.data["metadata"].get("last_updated"),
+                "last_backup": db.data["metadata"].get("last_backup")
+            },
+            "cache": {
+                "user_profiles": len(cache.user_profiles),
+                "guild_configs": len(guild_configs.snapshots),
+                "web_cache": len(cache.web_cache),
+                "cooldowns": len(cache.cooldowns),
+                "message_cache": len(cache.message_cache)
+            }
+        }
+    
+    async def store(self, name: str, payload):
+        self.snapshots[name] = await workers.submit(DashboardAPI.encode, payload, self.snapshots.get(name))
+    
+    async def refresh(self):
+        """Recalcula las instantáneas; lo pesado va al pool de hilos"""
+        await asyncio.to_thread(db.resolve, "users")
+        users = list(db.data["users"].items())
+        totals, tops = await workers.submit(DashboardAPI.build_rankings, users, self.TOP_LIMIT)
+        
+        empty = {"tracked_users": 0, "messages": 0, "xp": 0}
+        guilds = sorted((
+            {"id": str(g.id), "name": g.name, "members": g.member_count, "shard_id": g.shard_id, **totals.get(str(g.id), empty)}
+            for g in bot.guilds
+        ), key=lambda g: g["tracked_users"], reverse=True)
+        
+        await self.store("stats", {
+            "version": BotConfig.VERSION,
+            "guilds": len(guilds),
+            "members": sum(g["members"] or 0 for g in guilds),
+            "tracked_users": len(users),
+            "statistics": dict(db.data["statistics"]),
+            "per_guild": guilds
+        })
+        await self.store("health", self.build_health())
+        await self.store("minecraft", {
+            "server": BotConfig.MINECRAFT_IP,
+            "last_status": MinecraftSystem.last_status,
+            "history": list(MinecraftSystem.history)
+        })
+        
+        # Los tops por servidor se codifican al pedirlos; se guarda la versión anterior para su ETag
+        self.stale = {key: value for key, value in self.snapshots.items() if key.startswith("top-users:")}
+        for key in self.stale:
+            del self.snapshots[key]
+        self.top_users = tops
+        self.refreshed_at = time.time()
+    
+    def build_top_users(self, guild: str):
+        key = f"top-users:{guild}"
+        if key not in self.snapshots and guild in self.top_users:
+            self.snapshots[key] = DashboardAPI.encode(
+                {"guild_id": None if guild == "global" else guild, "users": self.top_users[guild]},
+                self.stale.pop(key, None)
+            )
+        return key
+    
+    def authorized(self, request) -> bool:
+        header = request.headers.get("Authorization", "")
+        # Solo por cabecera: un ?token= acaba en logs de proxies y en el historial del navegador
+        if not header.startswith("Bearer "):
+            return False
+        supplied = header[7:]
+        return hmac.compare_digest(supplied.encode(), self.token.encode())
+    
+    def respond(self, request, name: str, build=None) -> web.Response:
+        """Sirve una instantánea con validación condicional y gzip"""
+        if not self.token:
+            return web.json_response({"error": "Panel desactivado: configura DASHBOARD_TOKEN"}, status=403)
+        if not self.authorized(request):
+            return web.json_response({"error": "Token inválido"}, status=401, headers={"WWW-Authenticate": "Bearer"})
+        
+        if build:
+            name = build()
+        snapshot = self.snapshots.get(name)
+        if not snapshot:
+            if self.refreshed_at:
+                return web.json_response({"error": "No encontrado"}, status=404)
+            return web.json_response({"error": "Instantánea no disponible todavía"}, status=503, headers={"Retry-After": "5"})
+        
+        headers = {
+            "ETag": snapshot["etag"],
+            "Last-Modified": email.utils.format_datetime(snapshot["last_modified"], usegmt=True),
+            "Cache-Control": f"private, max-age={self.REFRESH_SECONDS}",
+            "Vary": "Accept-Encoding, Authorization"
+        }
+        
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if "*" in tags or snapshot["etag"] in tags:
+                return web.Response(status=304, headers=headers)
+        elif request.if_modified_since and snapshot["last_modified"] <= request.if_modified_since:
+            return web.Response(status=304, headers=headers)
+        
+        body = snapshot["body"]
+        if "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = snapshot["gzip"]
+            headers["Content-Encoding"] = "gzip"
+        return web.Response(body=body, content_type="application/json", charset="utf-8", headers=headers)
+
+dashboard = DashboardAPI(os.getenv("DASHBOARD_TOKEN"))
+
+@tasks.loop(seconds=DashboardAPI.REFRESH_SECONDS)
+async def refresh_dashboard():
+    """Recalcula las instantáneas del panel"""
+    try:
+        await dashboard.refresh()
     except Exception as e:
-        logger.error(f"❌ Error crítico: {e}")
-        traceback.print_exc()
+        logger.error(f"Error actualizando el panel: {e}")
+
+async def handle_api_stats(request):
+    return dashboard.respond(request, "stats")
+
+async def handle_api_top_users(request):
+    guild = request.query.get("guild", "global")
+    if guild != "global" and not guild.isdigit():
+        return web.json_response({"error": "guild debe ser un ID numérico"}, status=400)
+    return dashboard.respond(request, None, build=lambda: dashboard.build_top_users(guild))
+
+async def handle_api_health(request):
+    return dashboard.respond(request, "health")
+
+async def handle_api_minecraft(request):
+    return dashboard.respond(request, "minecraft")
 
 # Servidor para Render
 async def handle(request):
     return web.Response(text="Honducraft Bot está vivo 🚀")
 
+async def handle_health(request):
+    """Estado del proceso y tiempos de arranque por etapa"""
+    return web.json_response({
+        "status": "ok",
+        "version": BotConfig.VERSION,
+        "stages": startup.report(),
+        "workers": workers.snapshot()
+    })
+
+async def handle_ready(request):
+    """Listo cuando el gateway y la base de datos están disponibles"""
+    ready = startup.is_ready("gateway") and startup.is_ready("database")
+    return web.json_response({"ready": ready, "stages": startup.report()}, status=200 if ready else 503)
+
 async def start_web_server():
     app = web.Application()
     app.router.add_get("/", handle)
+    app.router.add_get("/health", handle_health)
+    app.router.add_get("/ready", handle_ready)
+    app.router.add_get("/api/stats", handle_api_stats)
+    app.router.add_get("/api/top-users", handle_api_top_users)
+    app.router.add_get("/api/health", handle_api_health)
+    app.router.add_get("/api/minecraft", handle_api_minecraft)
     runner = web.AppRunner(app)
     await runner.setup()
     site = web.TCPSite(runner, "0.0.0.0", 10000)
     await site.start()
     print("🌐 Servidor web iniciado en puerto 10000")
+    return runner
+
+@bot.event
+async def setup_hook():
+    """Registro de cogs justo antes de conectar al gateway"""
+    await bot.add_cog(TraditionalCommands(bot))
+    await bot.add_cog(SlashCommands(bot))
+    await bot.add_cog(TicketCommands(bot))
+    await bot.add_cog(ModerationCommands(bot))
+    await bot.add_cog(RoleCommands(bot))
+
+async def warm_database():
+    # La primera lectura de db.data carga el almacén; se hace fuera del event loop junto con
+    # las secciones que usa el arranque (users se decodifica en su primer acceso)
+    await asyncio.to_thread(db.resolve, *db.STARTUP_SECTIONS)
+    cache.load_from_disk(lifecycle.cache_file)
+    guild_configs.load_overrides()
+    if role_engine.load_index():
+        logger.info(f"🎭 {len(role_engine.index):,} roles por reacción indexados")
+    if moderation.load():
+        logger.info(f"⏳ {len(moderation.heap):,} sanciones con vencimiento programadas")
+
+async def warm_knowledge():
+    SimpleAI.build_index(i18n.default)
+
+async def warm_search_index():
+    await asyncio.to_thread(search_index.connect)
+    indexed = await asyncio.to_thread(search_index.backfill_transcripts)
+    if indexed:
+        logger.info(f"🔎 {indexed:,} mensajes de transcripciones indexados")
+
+async def warm_minecraft():
+    await minecraft_poller()
+    minecraft_poller.start()
+
+@minecraft_poller.before_loop
+async def delay_minecraft_poller():
+    """warm_minecraft ya hizo el primer sondeo: la primera vuelta del bucle espera un intervalo"""
+    await asyncio.sleep(minecraft_poller.minutes * 60)
+
+def start_warmup_tasks() -> List[asyncio.Task]:
+    """Lanza en segundo plano los subsistemas pesados"""
+    tasks_started = [
+        asyncio.create_task(startup.run_stage("database", warm_database)),
+        asyncio.create_task(startup.run_stage("knowledge", warm_knowledge)),
+        asyncio.create_task(startup.run_stage("minecraft", warm_minecraft)),
+        asyncio.create_task(startup.run_stage("search_index", warm_search_index))
+    ]
+    startup.tasks.extend(tasks_started)
+    return tasks_started
 
 async def main():
-    # Iniciar servidor web junto al bot
-    await start_web_server()
+    """Función principal de inicialización"""
+    TOKEN = os.getenv("DISCORD_TOKEN")
+    if not TOKEN or TOKEN == "TU_TOKEN_AQUI":
+        print("❌ ERROR: Debes configurar tu token de Discord")
+        print("💡 Configura la variable de entorno DISCORD_TOKEN")
+        return
 
-    # Aquí cargas tus cogs y demás
-    await bot.add_cog(SlashCommands(bot))
+    lifecycle.install_signal_handlers()
+
+    # 1. Endpoint de salud primero, para que el host vea el proceso vivo
+    startup.begin("health")
+    lifecycle.web_runner = await start_web_server()
+    startup.finish("health")
+
+    # Memoria antes de conectar, para comparar perfiles
+    runtime_profile["rss_at_start"] = get_rss_mb()
+    logger.info(f"🧠 Perfil {runtime_profile['name']}: {runtime_profile['rss_at_start']:.1f} MB RSS al iniciar")
+
+    # 2. Subsistemas pesados en segundo plano mientras conecta el gateway
+    start_warmup_tasks()
+
+    # 3. Conexión al gateway (termina en on_ready)
+    try:
+        logger.info("🚀 Iniciando ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 Ultra Pro 5.0...")
+        startup.begin("gateway")
+        await bot.start(TOKEN)
+    except discord.LoginFailure:
+        logger.error("❌ Error de autenticación: Token inválido")
+    except Exception as e:
+        logger.error(f"❌ Error crítico: {e}")
+        traceback.print_exc()
+    finally:
+        # Garantiza el guardado final aunque el bot termine por error
+        await lifecycle.request_shutdown("fin del proceso")
 
-    # Iniciar el bot
-    await bot.start(os.getenv("DISCORD_TOKEN"))
+# Tiempo de importación del módulo
+startup.begin("imports", started_at=IMPORT_STARTED_AT)
+startup.finish("imports")
 
 if __name__ == "__main__":
     asyncio.run(main())
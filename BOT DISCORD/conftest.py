@@ -0,0 +1,33 @@
+"""Configuración de pytest: bot.py se importa desde un directorio temporal
+
+Al importarse, bot.py crea la base de datos, los backups y el log en el directorio
+actual; así las pruebas nunca tocan los archivos de datos del repositorio.
+"""
+
+import copy
+import os
+import sys
+import tempfile
+
+import pytest
+
+os.chdir(tempfile.mkdtemp(prefix="honducraft-tests-"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bot  # noqa: E402
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Copia aislada de db.data para cada prueba"""
+    data = copy.deepcopy(bot.db.data)
+    monkeypatch.setattr(bot.db, "data", data)
+    return data
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj controlado: clock[0] es lo que devuelve time.time()"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(bot.time, "time", lambda: now[0])
+    return now
@@ -0,0 +1,609 @@
+"""Prueba de carga de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 contra un Discord simulado (sin conexión real)
+
+Levanta en local un gateway y una API REST falsos, conecta el bot real contra
+ellos y reproduce tráfico sintético de MESSAGE_CREATE e INTERACTION_CREATE a
+ritmo creciente. Mide latencia de respuesta, lag del event loop y memoria para
+encontrar el punto de saturación.
+
+Uso:
+    python loadtest.py --rates 10,50,100,200 --duration 20 --output carga.json
+    python loadtest.py --rates 100 --guilds 100 --users 5000 --profile lean
+    python loadtest.py --rates 50 --mix chat=5,prefix_ai=3,slash_ai=2 --no-rate-limits
+"""
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import yarl
+from aiohttp import web
+
+from benchmarks import git_commit, load_bot, summarize
+
+# Todas las respuestas del bot que se pueden medir incluyen este marcador
+TOKEN_RE = re.compile(r"lt\d+")
+ID_RE = re.compile(r"\d{6,}")
+DISCORD_EPOCH = 1420070400000
+
+# Tráfico por defecto: peso relativo de cada escenario
+DEFAULT_MIX = {
+    "chat": 50,
+    "prefix_ai": 10,
+    "prefix_search": 10,
+    "slash_ai": 10,
+    "slash_search": 10,
+    "slash_mcstatus": 5,
+    "slash_hc": 5
+}
+
+CHAT_LINES = [
+    "hola a todos", "alguien para jugar minecraft?", "que tal el server hoy",
+    "gg", "ya subí de nivel", "cuál es la ip del servidor", "jajaja", "buenas noches"
+]
+QUESTIONS = ["hola", "que puedes hacer", "minecraft", "como subo de nivel", "quien eres"]
+QUERIES = ["minecraft", "python", "discord", "honducraft", "recetas de baleadas"]
+
+
+def json_response(data) -> web.Response:
+    """discord.py solo decodifica JSON si el content-type es exactamente application/json"""
+    return web.Response(body=json.dumps(data).encode(), headers={"Content-Type": "application/json"})
+
+
+class FakeDiscord:
+    """Gateway y API REST de Discord simulados en un hilo con su propio event loop"""
+
+    def __init__(self, guilds: int, channels: int, users: int, seed: int = 7):
+        self.rng = random.Random(seed)
+        self.counter = itertools.count(1)
+        self.tokens = itertools.count(1)
+        self.bot_user = self.user_payload(self.snowflake(), bot=True)
+        self.application_id = self.snowflake()
+        self.bot_role_id = self.snowflake()
+
+        self.guilds = {}
+        for _ in range(guilds):
+            guild_id = self.snowflake()
+            self.guilds[guild_id] = [self.snowflake() for _ in range(channels)]
+        guild_ids = list(self.guilds)
+        self.users = [(self.snowflake(), guild_ids[i % len(guild_ids)]) for i in range(users)]
+
+        self.loop = None
+        self.thread = None
+        self.runner = None
+        self.port = None
+        self.ws = None
+        self.seq = 0
+        self.identified = None
+        self.routes = Counter()
+
+        self.pending = {}
+        self.stage = None
+
+    # ----- Payloads -----
+
+    def snowflake(self) -> int:
+        return (int(time.time() * 1000) - DISCORD_EPOCH) << 22 | next(self.counter) & 0x3FFFFF
+
+    @staticmethod
+    def now_iso() -> str:
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def user_payload(self, user_id: int, bot: bool = False) -> dict:
+        return {
+            "id": str(user_id),
+            "username": f"{'honducraft' if bot else 'usuario'}{user_id % 100000}",
+            "discriminator": "0",
+            "global_name": None,
+            "avatar": None,
+            "bot": bot
+        }
+
+    def member_payload(self, user_id: int = None) -> dict:
+        payload = {"roles": [], "joined_at": self.now_iso(), "deaf": False, "mute": False, "flags": 0}
+        if user_id:
+            payload["user"] = self.user_payload(user_id)
+        return payload
+
+    def guild_payload(self, guild_id: int) -> dict:
+        bot_member = self.member_payload()
+        bot_member["user"] = self.bot_user
+        bot_member["roles"] = [str(self.bot_role_id)]
+        return {
+            "id": str(guild_id),
+            "name": f"Servidor {guild_id % 10000}",
+            "icon": None,
+            "owner_id": str(self.users[0][0]),
+            "member_count": max(1, len(self.users) // len(self.guilds)),
+            "large": False,
+            "unavailable": False,
+            "preferred_locale": "es-ES",
+            "joined_at": self.now_iso(),
+            "features": [],
+            "emojis": [],
+            "stickers": [],
+            "threads": [],
+            "presences": [],
+            "voice_states": [],
+            "stage_instances": [],
+            "guild_scheduled_events": [],
+            "roles": [
+                {"id": str(guild_id), "name": "@everyone", "permissions": "68608", "position": 0,
+                 "color": 0, "hoist": False, "managed": False, "mentionable": False},
+                {"id": str(self.bot_role_id), "name": "ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱", "permissions": "8", "position": 1,
+                 "color": 0, "hoist": False, "managed": True, "mentionable": False}
+            ],
+            "channels": [
+                {"id": str(channel_id), "type": 0, "name": f"general-{i}", "position": i,
+                 "permission_overwrites": [], "nsfw": False, "parent_id": None, "topic": None}
+                for i, channel_id in enumerate(self.guilds[guild_id])
+            ],
+            "members": [bot_member]
+        }
+
+    def ready_payload(self) -> dict:
+        return {
+            "v": 10,
+            "user": self.bot_user,
+            "guilds": [{"id": str(guild_id), "unavailable": True} for guild_id in self.guilds],
+            "session_id": "loadtest",
+            "resume_gateway_url": self.gateway_url,
+            "shard": [0, 1],
+            "application": {"id": str(self.application_id), "flags": 0}
+        }
+
+    def message_payload(self, channel_id: int, body: dict, author: dict = None) -> dict:
+        return {
+            "id": str(self.snowflake()),
+            "channel_id": str(channel_id),
+            "author": author or self.bot_user,
+            "content": body.get("content") or "",
+            "timestamp": self.now_iso(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": body.get("embeds") or [],
+            "pinned": False,
+            "type": 0
+        }
+
+    # ----- Servidor -----
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self.port}/api/v10"
+
+    @property
+    def gateway_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}/gateway"
+
+    def start(self):
+        """Arranca el servidor en un hilo aparte para no cargar el loop del bot"""
+        started = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(started,), name="fake-discord", daemon=True)
+        self.thread.start()
+        if not started.wait(10):
+            raise RuntimeError("El Discord simulado no arrancó")
+
+    def _run(self, started: threading.Event):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.identified = asyncio.Event()
+        self.loop.run_until_complete(self._serve())
+        started.set()
+        self.loop.run_forever()
+
+    async def _serve(self):
+        app = web.Application(client_max_size=8 * 1024 * 1024)
+        app.router.add_get("/gateway", self.handle_gateway)
+        app.router.add_route("*", "/api/v10/{path:.*}", self.handle_rest)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def call(self, coro, timeout: float = None):
+        """Ejecuta una corrutina en el hilo del servidor y espera su resultado"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self):
+        if not self.loop:
+            return
+        try:
+            self.call(self.runner.cleanup(), timeout=5)
+        finally:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(5)
+
+    # ----- Gateway -----
+
+    async def send(self, op: int, data, event: str = None):
+        if event:
+            self.seq += 1
+        await self.ws.send_str(json.dumps({"op": op, "d": data, "s": self.seq if event else None, "t": event}))
+
+    async def handle_gateway(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        self.ws = ws
+        await self.send(10, {"heartbeat_interval": 41250})
+
+        async for msg in ws:
+            payload = json.loads(msg.data)
+            if payload["op"] == 1:
+                await self.send(11, None)
+            elif payload["op"] == 2:
+                await self.send(0, self.ready_payload(), "READY")
+                for guild_id in self.guilds:
+                    await self.send(0, self.guild_payload(guild_id), "GUILD_CREATE")
+                self.identified.set()
+            elif payload["op"] == 8:
+                # Perfil full: el chunking recibe una lista vacía y sigue
+                await self.send(0, {
+                    "guild_id": payload["d"]["guild_id"], "members": [], "chunk_index": 0,
+                    "chunk_count": 1, "nonce": payload["d"].get("nonce")
+                }, "GUILD_MEMBERS_CHUNK")
+        return ws
+
+    # ----- API REST -----
+
+    async def handle_rest(self, request):
+        received_at = time.perf_counter()
+        path = request.match_info["path"]
+        body_text = await request.text() if request.can_read_body else ""
+        try:
+            body = json.loads(body_text) if body_text else {}
+        except ValueError:
+            body = {}
+        self.routes[f"{request.method} /{ID_RE.sub('{id}', TOKEN_RE.sub('{token}', path))}"] += 1
+        parts = path.split("/")
+
+        if path == "users/@me":
+            return json_response(self.bot_user)
+        if path == "oauth2/applications/@me":
+            return json_response({
+                "id": str(self.application_id), "name": "ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱", "description": "", "icon": None,
+                "bot_public": False, "bot_require_code_grant": False, "verify_key": "",
+                "owner": self.user_payload(self.users[0][0]), "flags": 0
+            })
+        if path in ("gateway", "gateway/bot"):
+            return json_response({
+                "url": self.gateway_url, "shards": 1,
+                "session_start_limit": {"total": 1000, "remaining": 1000, "reset_after": 0, "max_concurrency": 1}
+            })
+        if parts[0] == "applications" and parts[-1] == "commands" and request.method == "PUT":
+            return json_response([
+                dict(command, id=str(self.snowflake()), application_id=str(self.application_id), version="1")
+                for command in body
+            ])
+        if parts[0] == "interactions" and parts[-1] == "callback":
+            # Tipo 4 responde directamente; tipo 5 (defer) espera al followup
+            self.record(parts[2], body_text, received_at, final=body.get("type") == 4)
+            return web.Response(status=204)
+        if parts[0] == "webhooks" and request.method == "POST":
+            self.record(parts[2], body_text, received_at, final=True)
+            return json_response(self.message_payload(0, body))
+        if parts[0] == "channels" and parts[-1] == "messages" and request.method == "POST":
+            match = TOKEN_RE.search(body_text)
+            self.record(match.group() if match else None, body_text, received_at, final=True)
+            return json_response(self.message_payload(int(parts[1]), body))
+        if parts[0] == "guilds" and len(parts) == 4 and parts[2] == "members" and request.method == "PATCH":
+            payload = self.member_payload(int(parts[3]))
+            payload["communication_disabled_until"] = body.get("communication_disabled_until")
+            return json_response(payload)
+        if request.method == "DELETE":
+            return web.Response(status=204)
+        return json_response({})
+
+    def record(self, token: str, body_text: str, received_at: float, final: bool):
+        """Relaciona una respuesta del bot con el evento que la provocó"""
+        if not self.stage:
+            return
+        limited = "Vas muy rápido" in body_text
+        entry = self.pending.get(token)
+        if not entry:
+            self.stage["rate_limited" if limited else "unmatched"] += 1
+            return
+
+        scenario, sent_at = entry
+        latency = (received_at - sent_at) * 1000
+        if limited:
+            self.stage["rate_limited"] += 1
+            del self.pending[token]
+            return
+        if not final:
+            self.stage["ack_latencies"].setdefault(scenario, []).append(latency)
+            return
+        self.stage["latencies"].setdefault(scenario, []).append(latency)
+        del self.pending[token]
+
+    # ----- Tráfico sintético -----
+
+    def build_event(self, scenario: str):
+        """Devuelve (evento, payload, token esperado o None)"""
+        user_id, guild_id = self.rng.choice(self.users)
+        channel_id = self.rng.choice(self.guilds[guild_id])
+        token = f"lt{next(self.tokens)}"
+
+        if scenario.startswith("slash_"):
+            name = scenario[6:]
+            options = []
+            if name == "ai":
+                options = [{"name": "pregunta", "type": 3, "value": f"{self.rng.choice(QUESTIONS)} {token}"}]
+            elif name == "search":
+                options = [{"name": "busqueda", "type": 3, "value": f"{self.rng.choice(QUERIES)} {token}"}]
+            member = self.member_payload(user_id)
+            member["permissions"] = "68608"
+            return "INTERACTION_CREATE", {
+                "id": str(self.snowflake()),
+                "application_id": str(self.application_id),
+                "type": 2,
+                "token": token,
+                "version": 1,
+                "guild_id": str(guild_id),
+                "channel_id": str(channel_id),
+                "channel": {"id": str(channel_id), "type": 0},
+                "member": member,
+                "app_permissions": "8",
+                "locale": "es-ES",
+                "guild_locale": "es-ES",
+                "data": {"id": str(self.snowflake()), "name": name, "type": 1, "options": options}
+            }, token
+
+        if scenario == "prefix_ai":
+            content, expected = f"!ai {self.rng.choice(QUESTIONS)} {token}", token
+        elif scenario == "prefix_search":
+            content, expected = f"!search {self.rng.choice(QUERIES)} {token}", token
+        else:
+            content, expected = f"{self.rng.choice(CHAT_LINES)} {token}", None
+
+        payload = self.message_payload(channel_id, {"content": content}, author=self.user_payload(user_id))
+        payload["guild_id"] = str(guild_id)
+        payload["member"] = self.member_payload()
+        return "MESSAGE_CREATE", payload, expected
+
+    async def run_stage(self, rate: float, duration: float, mix: dict, drain: float, processed=None) -> dict:
+        """Envía eventos a `rate` por segundo durante `duration` segundos
+
+        `processed` devuelve cuántos MESSAGE_CREATE procesó el bot en la etapa; el chat
+        no genera respuesta, así que sin él el drenaje no puede esperar a esos mensajes.
+        """
+        scenarios = list(mix)
+        weights = [mix[name] for name in scenarios]
+        self.pending.clear()
+        self.stage = {
+            "sent": Counter(), "latencies": {}, "ack_latencies": {},
+            "rate_limited": 0, "unmatched": 0, "behind_ms": 0.0
+        }
+
+        total = int(rate * duration)
+        start = time.perf_counter()
+        for i in range(total):
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.stage["behind_ms"] = max(self.stage["behind_ms"], -delay * 1000)
+
+            scenario = self.rng.choices(scenarios, weights)[0]
+            event, payload, expected = self.build_event(scenario)
+            if expected:
+                self.pending[expected] = (scenario, time.perf_counter())
+            await self.send(0, payload, event)
+            self.stage["sent"][scenario] += 1
+        send_seconds = time.perf_counter() - start
+
+        # Esperar a las respuestas pendientes y a que on_message procese todos los mensajes
+        messages = sum(count for name, count in self.stage["sent"].items() if not name.startswith("slash_"))
+        deadline = time.perf_counter() + drain
+        while time.perf_counter() < deadline:
+            if not self.pending and (processed is None or processed() >= messages):
+                break
+            await asyncio.sleep(0.05)
+
+        stage, self.stage = self.stage, None
+        stage["lost"] = Counter(scenario for scenario, _ in self.pending.values())
+        stage["send_seconds"] = send_seconds
+        stage["elapsed_seconds"] = time.perf_counter() - start
+        return stage
+
+
+async def sample_bot_loop(bot, stop: asyncio.Event, interval: float = 0.05) -> dict:
+    """Mide el lag del event loop del bot y su memoria mientras dura una etapa"""
+    lags = []
+    rss = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - start - interval) * 1000)
+        rss.append(bot.get_rss_mb())
+    return {
+        "loop_lag": summarize(lags or [0.0]),
+        "rss_mb": {"start": rss[0] if rss else None, "max": max(rss) if rss else None, "end": rss[-1] if rss else None}
+    }
+
+
+def summarize_stage(rate: float, stage: dict, loop_stats: dict, messages_processed: int, max_p95_ms: float) -> dict:
+    sent = sum(stage["sent"].values())
+    all_latencies = [value for values in stage["latencies"].values() for value in values]
+    lost = sum(stage["lost"].values())
+    expected = sent - stage["sent"].get("chat", 0)
+
+    result = {
+        "target_rate": rate,
+        "sent": sent,
+        "achieved_rate": round(sent / stage["send_seconds"], 1) if stage["send_seconds"] else None,
+        "messages_processed": messages_processed,
+        "responses": len(all_latencies),
+        "rate_limited": stage["rate_limited"],
+        "lost": lost,
+        "unmatched": stage["unmatched"],
+        "generator_behind_ms": round(stage["behind_ms"], 1),
+        "latency": summarize(all_latencies) if all_latencies else None,
+        "by_scenario": {
+            scenario: {
+                "sent": stage["sent"][scenario],
+                "lost": stage["lost"].get(scenario, 0),
+                "latency": summarize(stage["latencies"][scenario]) if stage["latencies"].get(scenario) else None,
+                "ack_latency": summarize(stage["ack_latencies"][scenario]) if stage["ack_latencies"].get(scenario) else None
+            }
+            for scenario in stage["sent"]
+        },
+        **loop_stats
+    }
+
+    # Saturado: no se sostiene el ritmo, se pierden respuestas o el p95 se dispara
+    reasons = []
+    if result["achieved_rate"] and result["achieved_rate"] < rate * 0.9:
+        reasons.append("el generador no sostiene el ritmo")
+    if expected and lost / expected > 0.01:
+        reasons.append(f"{lost} respuestas perdidas")
+    if result["latency"] and result["latency"]["p95_ms"] > max_p95_ms:
+        reasons.append(f"p95 {result['latency']['p95_ms']:.0f}ms > {max_p95_ms:.0f}ms")
+    if messages_processed < sent - sum(count for name, count in stage["sent"].items() if name.startswith("slash_")):
+        reasons.append("on_message no procesó todos los mensajes")
+    result["saturated"] = reasons
+    return result
+
+
+def parse_mix(value: str) -> dict:
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"escenario desconocido: {name} (usa {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run_loadtest(args) -> dict:
+    os.environ["HONDUCRAFT_PROFILE"] = args.profile
+    os.environ["HONDUCRAFT_SHARDING"] = "none"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        bot = load_bot(workdir)
+        import discord
+
+        if args.no_rate_limits:
+            for budgets in bot.BotConfig.RATE_LIMITS.values():
+                for scope in budgets:
+                    budgets[scope] = [0, 1]
+
+        fake = FakeDiscord(args.guilds, args.channels, args.users)
+        fake.start()
+        # REST y gateway de discord.py apuntan al servidor simulado
+        discord.http.Route.BASE = fake.api_base
+        discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(fake.gateway_url)
+
+        results = {
+            "meta": {
+                "commit": git_commit(),
+                "profile": args.profile,
+                "guilds": args.guilds,
+                "channels_per_guild": args.channels,
+                "users": args.users,
+                "duration": args.duration,
+                "mix": args.mix,
+                "rate_limits": not args.no_rate_limits,
+                "timestamp": datetime.datetime.now().isoformat()
+            },
+            "stages": []
+        }
+
+        # Mismo arranque que main(), sin servidor web ni señales
+        bot.runtime_profile["rss_at_start"] = bot.get_rss_mb()
+        bot.start_warmup_tasks()
+        bot.startup.begin("gateway")
+        bot_task = asyncio.create_task(bot.bot.start("loadtest"))
+        try:
+            if not await bot.startup.wait_ready("gateway", timeout=60):
+                raise RuntimeError("El bot no terminó de conectar al gateway simulado")
+            await bot.startup.wait_ready("database", timeout=60)
+            results["meta"]["rss_after_ready_mb"] = bot.get_rss_mb()
+
+            for rate in args.rates:
+                processed_before = bot.db.data["statistics"]["messages_processed"]
+                stop = asyncio.Event()
+                sampler = asyncio.create_task(sample_bot_loop(bot, stop))
+                stage = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(
+                    fake.run_stage(
+                        rate, args.duration, args.mix, args.drain,
+                        processed=lambda: bot.db.data["statistics"]["messages_processed"] - processed_before
+                    ),
+                    fake.loop
+                ))
+                stop.set()
+                processed = bot.db.data["statistics"]["messages_processed"] - processed_before
+                result = summarize_stage(rate, stage, await sampler, processed, args.max_p95_ms)
+                results["stages"].append(result)
+
+                latency = result["latency"] or {"p50_ms": 0, "p95_ms": 0}
+                print(
+                    f"{rate:>8.1f} ev/s  enviados {result['sent']:>6}  p50 {latency['p50_ms']:>9.1f}ms  "
+                    f"p95 {latency['p95_ms']:>9.1f}ms  lag p95 {result['loop_lag']['p95_ms']:>7.1f}ms  "
+                    f"RSS {result['rss_mb']['max'] or 0:>7.1f}MB  perdidos {result['lost']:>4}  "
+                    f"{'❌ ' + '; '.join(result['saturated']) if result['saturated'] else '✅'}",
+                    file=sys.stderr
+                )
+                if result["saturated"] and args.stop_on_saturation:
+                    break
+        finally:
+            await bot.lifecycle.request_shutdown("fin de la prueba de carga")
+            await asyncio.gather(bot_task, return_exceptions=True)
+            fake.stop()
+            os.chdir(os.path.dirname(workdir))
+
+        saturated = [stage["target_rate"] for stage in results["stages"] if stage["saturated"]]
+        results["saturation_rate"] = saturated[0] if saturated else None
+        results["rest_routes"] = dict(fake.routes.most_common())
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱 con Discord simulado")
+    parser.add_argument("--rates", default="10,25,50,100", help="Eventos por segundo de cada etapa")
+    parser.add_argument("--duration", type=float, default=15, help="Segundos por etapa")
+    parser.add_argument("--drain", type=float, default=10, help="Segundos de espera por respuestas al final de cada etapa")
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--channels", type=int, default=3, help="Canales de texto por servidor")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--mix", type=parse_mix, default=None, help="Pesos por escenario, p. ej. chat=5,slash_ai=2")
+    parser.add_argument("--profile", default="standard", choices=["lean", "standard", "full"])
+    parser.add_argument("--no-rate-limits", action="store_true", help="Desactiva el limitador para medir solo el bot")
+    parser.add_argument("--max-p95-ms", type=float, default=1000, help="p95 a partir del cual se considera saturado")
+    parser.add_argument("--stop-on-saturation", action="store_true")
+    parser.add_argument("--output", help="Guarda los resultados en este JSON")
+    args = parser.parse_args()
+
+    args.rates = [float(rate) for rate in args.rates.split(",")]
+    args.mix = args.mix or dict(DEFAULT_MIX)
+    output = os.path.abspath(args.output) if args.output else None
+
+    results = asyncio.run(run_loadtest(args))
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if results["saturation_rate"]:
+        print(f"⚠️ Saturación a partir de {results['saturation_rate']:.1f} eventos/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Migración de los archivos de datos antiguos al almacén actual de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱
+
+Fusiona data.json, honducraft_data.json y honducraft_ultra.json en
+honducraft_pro.json (o en el archivo de la partición de SHARD_IDS). Repetirla es
+seguro: lo que ya existe en el almacén nunca se sobrescribe.
+
+Uso:
+    python migrate.py --dry-run
+    python migrate.py
+    python migrate.py --sources data.json,honducraft_ultra.json --output informe.json
+    python migrate.py --export-json exportado.json   # con DATA_FORMAT=snapshot
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_bot(workdir: str):
+    """Importa bot.py usando el directorio de los datos como directorio de trabajo"""
+    os.chdir(workdir)
+    if BOT_DIR not in sys.path:
+        sys.path.insert(0, BOT_DIR)
+    import bot
+    logging.getLogger().setLevel(logging.WARNING)
+    return bot
+
+
+def print_report(report: dict):
+    mode = "SIMULACIÓN" if report["dry_run"] else "MIGRACIÓN"
+    print(f"{mode} ({report['streaming']}) en {report['total_ms']:.1f}ms")
+    for entry in report["sources"]:
+        print(f"\n📄 {entry['file']}: {entry['status']}")
+        if "versions" not in entry:
+            continue
+        print(
+            f"   versión {' → '.join(entry['versions'])} | {entry['bytes']:,} bytes | "
+            f"lectura {entry['parse_ms']:.1f}ms, actualización {entry['upgrade_ms']:.1f}ms, "
+            f"fusión {entry['merge_ms']:.1f}ms"
+        )
+        for section, counts in sorted(entry["sections"].items()):
+            print(
+                f"   {section:<16} {counts['records']:>8} registros  "
+                f"{counts['new']:>8} nuevos  {counts['updated']:>8} completados"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migración de datos de ℌ𝔬𝔫𝔡𝔲ℭ𝔯𝔞𝔣𝔱")
+    parser.add_argument("--dry-run", action="store_true", help="Solo muestra el informe, no guarda nada")
+    parser.add_argument("--dir", default=BOT_DIR, help="Directorio con los archivos de datos")
+    parser.add_argument("--sources", help="Archivos a fusionar separados por comas (por defecto los antiguos)")
+    parser.add_argument("--output", help="Guarda el informe en este JSON")
+    parser.add_argument("--export-json", help="Solo exporta el almacén actual con la estructura JSON clásica")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output) if args.output else None
+    export = os.path.abspath(args.export_json) if args.export_json else None
+    bot = load_bot(os.path.abspath(args.dir))
+    if export:
+        print(f"📤 {bot.db.store_path} exportado a {bot.db.export_json(export)}")
+        return
+
+    sources = args.sources.split(",") if args.sources else list(bot.DataMigrator.LEGACY_FILES)
+    sources = [path for path in sources if os.path.abspath(path) != os.path.abspath(bot.db.file_path)]
+
+    owns_guild = bot.db.owns_guild if bot.db.partition else None
+    report = bot.migrator.migrate(bot.db.data, sources, dry_run=args.dry_run, owns_guild=owns_guild)
+    if not args.dry_run:
+        bot.db.save_data()
+
+    print_report(report)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    sys.exit(1 if any(entry["status"].startswith("error") for entry in report["sources"]) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Pruebas de la configuración por servidor y del guardado que la persiste"""
+
+import json
+import os
+
+import pytest
+
+import bot
+
+
+@pytest.fixture
+def configs(store, tmp_path):
+    return bot.GuildConfigStore(bot.db, str(tmp_path / "guild_config.json"))
+
+
+def write_overrides(path, overrides, mtime):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(overrides if isinstance(overrides, str) else json.dumps(overrides))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_get_returns_immutable_snapshot_without_writing(configs, monkeypatch):
+    monkeypatch.setattr(bot.db, "dirty", False)
+    snapshot = configs.get(123)
+
+    assert snapshot["prefix"] == "!"
+    assert "123" not in bot.db.data["servers"]
+    assert not bot.db.dirty
+    with pytest.raises(TypeError):
+        snapshot["prefix"] = "?"
+    assert configs.get(123) is snapshot
+
+
+def test_update_bumps_version_and_notifies(configs, monkeypatch):
+    monkeypatch.setattr(bot.db, "dirty", False)
+    seen = []
+    configs.subscribe(lambda guild_id, snapshot: seen.append((guild_id, snapshot)))
+
+    snapshot = configs.update(123, {"prefix": "?"})
+
+    assert configs.version(123) == 1
+    assert configs.version(456) == 0
+    assert seen == [(123, snapshot)]
+    assert snapshot["prefix"] == "?"
+    assert bot.db.data["servers"]["123"]["prefix"] == "?"
+    assert bot.db.dirty
+
+
+def test_hot_reload_applies_layers_and_keeps_last_good_file(configs):
+    path = configs.override_file
+    seen = []
+    configs.subscribe(lambda guild_id, snapshot: seen.append(guild_id))
+
+    write_overrides(path, {"*": {"prefix": "$"}, "123": {"prefix": "%"}}, 1_000)
+    assert configs.load_overrides()
+    assert configs.get(123)["prefix"] == "%"
+    assert configs.get(456)["prefix"] == "$"
+    assert seen == [None]
+    assert not configs.load_overrides()
+
+    write_overrides(path, {"*": {"prefix": "$"}, "123": {"prefix": "&"}}, 2_000)
+    assert configs.load_overrides()
+    assert configs.get(123)["prefix"] == "&"
+    assert seen == [None, 123]
+
+    write_overrides(path, "{roto", 3_000)
+    assert not configs.load_overrides()
+    assert configs.get(123)["prefix"] == "&"
+
+
+@pytest.fixture
+def store_files(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(bot.db, "file_path", str(tmp_path / "honducraft_pro.json"))
+    monkeypatch.setattr(bot.db, "snapshot_path", str(tmp_path / "honducraft_pro.snap"))
+    return tmp_path
+
+
+def test_failed_save_restores_dirty(store_files, monkeypatch):
+    emergencies = []
+    monkeypatch.setattr(bot.db, "emergency_save", lambda: emergencies.append(True))
+
+    def broken_write(*args, **kwargs):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(bot, "atomic_write_json", broken_write)
+    monkeypatch.setattr(bot, "atomic_write_bytes", broken_write)
+    monkeypatch.setattr(bot.db, "dirty", True)
+
+    assert not bot.db.save_data(backup=False)
+    assert bot.db.dirty
+    assert emergencies == [True]
+
+
+def test_successful_save_clears_dirty(store_files, monkeypatch):
+    monkeypatch.setattr(bot.db, "dirty", True)
+
+    assert bot.db.save_data(backup=False)
+    assert not bot.db.dirty
+    assert os.path.exists(bot.db.store_path)
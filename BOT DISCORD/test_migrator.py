@@ -0,0 +1,112 @@
+"""Pruebas del migrador: cada esquema antiguo llega al actual y repetir no cambia nada"""
+
+import copy
+import json
+
+import pytest
+
+import bot
+
+LEGACY = {
+    "1.0.0": {
+        "warns": {"1": {"10": [{"reason": "spam"}]}},
+        "mutes": {},
+        "tickets": {"t1": {"guild_id": 1}},
+        "config": {"prefix": "!"}
+    },
+    "2.0.0": {
+        "user_profiles": {"1_10": {"xp": 5}, "10": {"xp": 1}},
+        "server_config": {"1": {"prefix": "?"}},
+        "reaction_roles": {},
+        "economy": {"10": 50}
+    },
+    "3.0.0": {
+        "user_profiles": {"1_10": {"xp": 5}},
+        "server_config": {"1": {"prefix": "?"}},
+        "auto_roles": {"on_join": [5], "reaction_roles": {"99": {"👍": 6}}},
+        "moderation_settings": {"max_warns": 7}
+    },
+    "4.0.0": {
+        "metadata": {"version": "4.0.0"},
+        "servers": {"1": {"prefix": "?"}},
+        "users": {"1_10": {"xp": 5}},
+        "config": {"prefix": "!"},
+        "automod": {"max_warns": 7}
+    }
+}
+
+
+@pytest.mark.parametrize("version", sorted(LEGACY))
+def test_upgrade_reaches_current_schema_and_is_idempotent(version):
+    doc, chain = bot.migrator.upgrade(copy.deepcopy(LEGACY[version]))
+
+    assert bot.migrator.detect_version(LEGACY[version]) == version
+    assert chain[0] == version
+    assert chain[-1] == bot.BotConfig.VERSION
+    assert doc["metadata"]["version"] == bot.BotConfig.VERSION
+    for section in bot.DataMigrator.COLLECTIONS:
+        assert section in doc
+    assert not {"config", "automod", "server_config", "moderation_settings"} & set(doc)
+
+    again, chain = bot.migrator.upgrade(copy.deepcopy(doc))
+    assert chain == [bot.BotConfig.VERSION]
+    assert again == doc
+
+
+def test_upgrade_moves_settings_and_profiles():
+    v1, _ = bot.migrator.upgrade(copy.deepcopy(LEGACY["1.0.0"]))
+    assert v1["settings"]["config"] == {"prefix": "!"}
+    assert v1["warns"] == LEGACY["1.0.0"]["warns"]
+
+    v2, _ = bot.migrator.upgrade(copy.deepcopy(LEGACY["2.0.0"]))
+    assert v2["servers"]["1"]["prefix"] == "?"
+    assert v2["users"] == {"1_10": {"xp": 5}}
+    assert v2["user_profiles"] == {"10": {"xp": 1}}
+
+    v3, _ = bot.migrator.upgrade(copy.deepcopy(LEGACY["3.0.0"]))
+    assert v3["settings"]["automod"]["max_warns"] == 7
+    assert v3["reaction_roles"] == {"99": {"👍": 6}}
+    assert v3["auto_roles"] == {"on_join": [5]}
+
+
+def test_merge_twice_adds_nothing_new():
+    doc, _ = bot.migrator.upgrade(copy.deepcopy(LEGACY["3.0.0"]))
+    data = {"servers": {"1": {"prefix": "!"}}, "statistics": {"commands_used": 3}}
+
+    first = bot.migrator.merge(data, doc)
+    snapshot = copy.deepcopy(data)
+    second = bot.migrator.merge(data, doc)
+
+    assert first["users"]["new"] == 1
+    assert data["servers"]["1"]["prefix"] == "!"
+    assert data == snapshot
+    assert all(counts["new"] == 0 and counts["updated"] == 0 for counts in second.values())
+
+
+def test_migrate_file_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, "ijson", None)
+    path = tmp_path / "honducraft_ultra.json"
+    path.write_text(json.dumps(LEGACY["3.0.0"], ensure_ascii=False, indent=2), encoding="utf-8")
+    data = {"metadata": {}}
+
+    report = bot.migrator.migrate(data, [str(path)])
+    assert report["streaming"] == "raw_decode"
+    assert report["sources"][0]["status"] == "migrado"
+    assert report["sources"][0]["versions"][0] == "3.0.0"
+    assert data["metadata"]["migrations"]["honducraft_ultra.json"]["from_version"] == "3.0.0"
+
+    migrated = copy.deepcopy(data)
+    report = bot.migrator.migrate(data, [str(path)])
+    assert report["sources"][0]["status"] == "ya migrado"
+    assert data == migrated
+
+
+def test_raw_decode_reader_matches_json(tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, "ijson", None)
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps(LEGACY["1.0.0"]), encoding="utf-8")
+    assert bot.migrator.read(str(path)) == LEGACY["1.0.0"]
+
+    path.write_text(json.dumps(LEGACY["1.0.0"]) + " {}", encoding="utf-8")
+    with pytest.raises(ValueError):
+        bot.migrator.read(str(path))
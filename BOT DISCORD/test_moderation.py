@@ -0,0 +1,71 @@
+"""Pruebas del almacén de moderación: orden de vencimientos, reconstrucción y límites"""
+
+import asyncio
+
+import pytest
+
+import bot
+
+
+@pytest.fixture
+def moderation(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, "guild_configs", bot.GuildConfigStore(bot.db, str(tmp_path / "guild_config.json")))
+    return bot.ModerationStore()
+
+
+def warn(warn_id, expires_at):
+    return {"id": warn_id, "reason": "prueba", "expires_at": expires_at}
+
+
+def test_load_rebuilds_heap_and_expires_in_order(store, moderation):
+    store["warns"] = {"1": {
+        "10": [warn("a", 300), warn("b", 100)],
+        "11": [warn("c", 200)],
+        "12": [warn("d", None)]
+    }}
+    assert moderation.load() == 3
+    assert moderation.heap[0][0] == 100
+
+    assert asyncio.run(moderation.expire_due(now=150)) == 1
+    assert [w["id"] for w in store["warns"]["1"]["10"]] == ["a"]
+    assert "11" in store["warns"]["1"]
+
+    assert asyncio.run(moderation.expire_due(now=250)) == 1
+    assert "11" not in store["warns"]["1"]
+
+    # Quitar las advertencias no toca el montículo: la entrada obsoleta se descarta al vencer
+    moderation.clear_warns(1, 10)
+    assert asyncio.run(moderation.expire_due(now=400)) == 0
+    assert not moderation.heap
+    assert store["warns"]["1"] == {"12": [warn("d", None)]}
+    assert moderation.stats["warns_expired"] == 2
+
+
+def test_replaced_mute_is_not_lifted_by_old_entry(store, moderation):
+    store["mutes"] = {"1": {"10": {"id": "new", "method": "timeout", "expires_at": None}}}
+    moderation.schedule("mute", 1, 10, {"id": "old", "expires_at": 50})
+
+    assert asyncio.run(moderation.expire_due(now=100)) == 0
+    assert moderation.get_mute(1, 10)["id"] == "new"
+
+
+def test_add_warn_schedules_expiry(store, moderation, clock):
+    store.setdefault("statistics", {}).setdefault("warns_issued", 0)
+
+    assert moderation.add_warn(1, 10, 99, "spam") == 1
+    assert moderation.add_warn(1, 10, 99, "spam") == 2
+    assert len(moderation.heap) == 2
+    assert moderation.heap[0][0] == clock[0] + 30 * 86400
+
+    clock[0] += 30 * 86400 + 1
+    assert moderation.get_warns(1, 10) == []
+
+
+def test_warn_limit_falls_back_to_legacy_max_warns(store, moderation):
+    store["settings"] = {"automod": {"max_warns": 7}}
+    store["servers"]["2"] = {"automod": {"enabled": True}}
+    store["servers"]["3"] = {"automod": {"max_warns": 0}}
+
+    assert moderation.warn_limit(1) == (7, 60)
+    assert moderation.warn_limit(2) == (7, 60)
+    assert moderation.warn_limit(3) == (0, 60)
@@ -0,0 +1,60 @@
+"""Pruebas del limitador GCRA y de la validación de límites por servidor"""
+
+import json
+
+import bot
+
+
+def test_allows_up_to_burst_then_denies(clock):
+    limiter = bot.RateLimiter({})
+    # "ai": 3 usos cada 30 s por usuario -> un uso nuevo cada 10 s
+    for _ in range(3):
+        assert limiter.hit("ai", 1, None, None) is None
+
+    denied = limiter.hit("ai", 1, None, None)
+    assert denied is not None
+    retry_after, scope, budget = denied
+    assert scope == "user"
+    assert budget == (3, 30)
+    assert retry_after == 10
+
+    clock[0] += 9.99
+    assert limiter.hit("ai", 1, None, None) is not None
+    clock[0] += 0.01
+    assert limiter.hit("ai", 1, None, None) is None
+
+
+def test_denied_hit_consumes_nothing(clock, monkeypatch):
+    monkeypatch.setitem(bot.BotConfig.RATE_LIMITS, "test", {"user": [2, 10], "channel": [3, 10]})
+    limiter = bot.RateLimiter({})
+
+    assert limiter.hit("test", 1, 100, None) is None
+    assert limiter.hit("test", 1, 100, None) is None
+    assert limiter.hit("test", 1, 100, None)[1] == "user"
+
+    # El intento denegado no gastó cupo del canal
+    assert limiter.hit("test", 2, 100, None) is None
+    assert limiter.hit("test", 3, 100, None)[1] == "channel"
+
+
+def test_invalid_overrides_are_dropped(tmp_path, monkeypatch):
+    path = tmp_path / "guild_config.json"
+    path.write_text(json.dumps({
+        "*": {"rate_limits": {"ai": {"user": [1, 10], "channel": [0, 5], "bogus": [1, 1], "guild": "x"}}},
+        "5": [1],
+        "7": {"rate_limits": [1, 2]},
+        "8": {"rate_limits": {"search": {"user": [2, 5, 9], "channel": [True, 5]}}}
+    }), encoding="utf-8")
+    configs = bot.GuildConfigStore(bot.db, str(path))
+
+    assert configs.load_overrides()
+    assert configs.overrides == {
+        "*": {"rate_limits": {"ai": {"user": [1, 10]}}},
+        "7": {"rate_limits": {}},
+        "8": {"rate_limits": {}}
+    }
+
+    monkeypatch.setattr(bot, "guild_configs", configs)
+    budgets = bot.rate_limiter.get_budgets("ai", 5)
+    assert tuple(budgets["user"]) == (1, 10)
+    assert budgets["channel"] == bot.BotConfig.RATE_LIMITS["ai"]["channel"]
@@ -0,0 +1,80 @@
+"""Pruebas del formato snapshot: ida y vuelta, lectura perezosa y checksums"""
+
+import pytest
+
+import bot
+
+DATA = {
+    "metadata": {"version": "5.0.0"},
+    "users": {"1_10": {"xp": 5, "name": "Ñandú"}, "1_11": {"xp": 0}},
+    "warns": {"1": {"10": [{"id": "a", "expires_at": None}]}},
+    "statistics": {"commands_used": 42}
+}
+
+
+@pytest.fixture
+def snapshot_file(tmp_path):
+    path = tmp_path / "honducraft_pro.snap"
+    path.write_bytes(bot.snapshot_codec.encode(DATA))
+    return path
+
+
+def test_round_trip_decodes_sections_lazily(snapshot_file):
+    snapshot = bot.snapshot_codec.open(str(snapshot_file))
+
+    assert list(snapshot) == list(DATA)
+    assert set(snapshot.pending) == set(DATA)
+    assert snapshot["users"] == DATA["users"]
+    assert "users" not in snapshot.pending
+    assert "warns" in snapshot.pending
+    assert snapshot.copy() == DATA
+    assert not snapshot.pending
+
+
+def test_unread_sections_are_saved_unchanged(snapshot_file):
+    original = snapshot_file.read_bytes()
+    snapshot = bot.snapshot_codec.open(str(snapshot_file))
+    assert snapshot["metadata"]["version"] == "5.0.0"
+
+    assert bot.snapshot_codec.encode(snapshot) == original
+
+    snapshot["statistics"] = {"commands_used": 43}
+    reopened_path = snapshot_file.with_suffix(".new")
+    reopened_path.write_bytes(bot.snapshot_codec.encode(snapshot))
+    reopened = bot.snapshot_codec.open(str(reopened_path))
+    assert reopened.copy() == {**DATA, "statistics": {"commands_used": 43}}
+    snapshot.resolve_all()
+
+
+def test_corrupted_section_is_rejected(snapshot_file):
+    raw = bytearray(snapshot_file.read_bytes())
+    raw[-1] ^= 0xFF
+    snapshot_file.write_bytes(bytes(raw))
+
+    with pytest.raises(bot.SnapshotError, match="checksum"):
+        bot.snapshot_codec.open(str(snapshot_file))
+
+
+@pytest.mark.parametrize("damage", ["magic", "truncated"])
+def test_damaged_header_is_rejected(snapshot_file, damage):
+    raw = snapshot_file.read_bytes()
+    raw = b"XX" + raw[2:] if damage == "magic" else raw[:-10]
+    snapshot_file.write_bytes(raw)
+
+    with pytest.raises(bot.SnapshotError):
+        bot.snapshot_codec.open(str(snapshot_file))
+
+
+def test_copy_sections_keeps_unread_blocks_as_bytes(store, snapshot_file, monkeypatch):
+    snapshot = bot.snapshot_codec.open(str(snapshot_file))
+    snapshot["metadata"]
+    monkeypatch.setattr(bot.db, "data", snapshot)
+
+    sections, pending = bot.db.copy_sections()
+    snapshot.resolve_all()
+
+    assert set(pending) == {"users", "warns", "statistics"}
+    assert all(isinstance(entry[0], bytes) for entry in pending.values())
+    assert sections["metadata"] == DATA["metadata"]
+    assert sections["metadata"] is not snapshot["metadata"]
+    assert bot.snapshot_codec.encode(sections, pending) == snapshot_file.read_bytes()
@@ -0,0 +1,71 @@
+"""Pruebas del pool de trabajos: registro con @worker_job, contrapresión y timeouts"""
+
+import asyncio
+import threading
+
+import pytest
+
+import bot
+
+
+@bot.worker_job("process", timeout=5)
+def square(value):
+    return value * value
+
+
+@bot.worker_job("thread", timeout=0.05)
+def wait_for(event):
+    event.wait(5)
+    return "done"
+
+
+def test_process_jobs_cannot_live_in_bot():
+    def job():
+        return None
+    job.__module__ = bot.__name__
+
+    with pytest.raises(ValueError):
+        bot.worker_job("process")(job)
+    assert bot.worker_job("thread")(job).job_kind == "thread"
+
+
+def test_unknown_kind_and_unmarked_function_are_rejected():
+    with pytest.raises(ValueError):
+        bot.worker_job("gpu")
+
+    pool = bot.WorkerPool(processes=0, threads=1, max_pending=1)
+    with pytest.raises(TypeError):
+        asyncio.run(pool.submit(len, "abc"))
+    pool.shutdown()
+
+
+def test_process_job_runs_in_threads_without_processes():
+    pool = bot.WorkerPool(processes=0, threads=1, max_pending=1)
+    assert asyncio.run(pool.submit(square, 7)) == 49
+    assert "process" not in pool.executors
+    assert pool.snapshot()["thread"]["completed"] == 1
+    pool.shutdown()
+
+
+def test_full_queue_rejects_and_timeouts_are_counted():
+    pool = bot.WorkerPool(processes=0, threads=1, max_pending=1)
+    event = threading.Event()
+
+    async def scenario():
+        first = asyncio.create_task(pool.submit(wait_for, event))
+        await asyncio.sleep(0)
+        with pytest.raises(bot.WorkerPoolBusy):
+            await pool.submit(wait_for, event)
+        with pytest.raises(asyncio.TimeoutError):
+            await first
+        event.set()
+        # El contador baja cuando el trabajo termina de verdad, no al expirar
+        while pool.pending["thread"]:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    stats = pool.snapshot()["thread"]
+    assert stats["rejected"] == 1
+    assert stats["timeouts"] == 1
+    assert stats["pending"] == 0
+    pool.shutdown()